@@ -0,0 +1,400 @@
+"""
+Análise de prontuários: extração, detecção e pontuação, individual ou em lote.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .config import ProcessingConfig, ProcessingStatus, QualityLevel, SeverityLevel, severity_label
+from .dedup import NearDuplicateIndex
+from .expanded_lexicon import ExpandedViolenceLexicon
+from .extractor import EnhancedTextExtractor, ExtractionError
+from .longitudinal import PatientIndex
+from .manifest import ProcessingManifest
+from .metrics import RunMetrics
+from .models import AnalysisResult, PatientIdentifier, StageMetrics, TextContent, ViolencePatterns
+from .normalize import NormalizedText, ensure_normalized
+from .utils import hash_text
+from .writers import ResultWriter
+
+if TYPE_CHECKING:
+    from .compact import ResultBatch
+    from .scoring import TermCountMatrixBuilder
+
+class ReusableResult(NamedTuple):
+    """Entrada do índice de quase-duplicatas: resultado sem o texto, hash e posições no texto normalizado"""
+    result: AnalysisResult
+    text_digest: str
+    spans: List[Tuple[int, int]]  # Intervalo de cada detecção no texto normalizado
+
+class ViolenceAnalyzer:
+    """Orquestra extração, detecção e pontuação de um prontuário"""
+
+    def __init__(self, config: ProcessingConfig, lexicon: Optional[ExpandedViolenceLexicon] = None):
+        self.config = config
+        self.lexicon = lexicon or ExpandedViolenceLexicon.from_config(config)
+        self.extractor = EnhancedTextExtractor(config)
+        self.duplicates: Optional[NearDuplicateIndex[ReusableResult]] = None
+        if config.enable_near_duplicates:
+            self.duplicates = NearDuplicateIndex(config.near_duplicate_threshold,
+                                                 max_entries=config.near_duplicate_max_entries)
+
+    def analyze_file(self, pdf_path: Path) -> AnalysisResult:
+        """Analisa um PDF; falhas viram um resultado com o status correspondente"""
+        started = time.perf_counter()
+        metrics = StageMetrics()
+        try:
+            with metrics.timed("extraction"):
+                text_content = self.extractor.extract_from_pdf(pdf_path, metrics)
+        except Exception as e:
+            return self.failed_result(pdf_path, e, started, metrics)
+        return self.analyze_extracted(pdf_path, text_content, started, metrics)
+
+    def analyze_extracted(self, pdf_path: Path, text_content: TextContent, started: Optional[float] = None,
+                          metrics: Optional[StageMetrics] = None) -> AnalysisResult:
+        """Pontua o texto já extraído de um PDF (etapas separadas no pipeline assíncrono)"""
+        started = started if started is not None else time.perf_counter()
+        patient_id = self._build_patient_identifier(pdf_path, text_content.text)
+        try:
+            patient_id.document_hash = hashlib.sha256(text_content.text.encode('utf-8')).hexdigest()
+            return self.analyze_text(text_content, patient_id, started, metrics)
+        except Exception as e:
+            return self.failed_result(pdf_path, e, started, metrics)
+
+    def reuse_extracted(self, pdf_path: Path, text_content: TextContent, original: ReusableResult,
+                        similarity: float, started: Optional[float] = None,
+                        metrics: Optional[StageMetrics] = None) -> AnalysisResult:
+        """Como analyze_extracted, reaproveitando as detecções de um documento com o mesmo texto normalizado"""
+        patient_id = self._build_patient_identifier(pdf_path, text_content.text)
+        patient_id.document_hash = hashlib.sha256(text_content.text.encode('utf-8')).hexdigest()
+        return self.reuse_result(original, ensure_normalized(text_content.text), text_content, patient_id,
+                                 similarity, started, metrics)
+
+    def failed_result(self, pdf_path: Path, error: Exception, started: float,
+                      metrics: Optional[StageMetrics] = None) -> AnalysisResult:
+        """Resultado de falha com o status da ExtractionError (ou erro de processamento)"""
+        status = error.status if isinstance(error, ExtractionError) else ProcessingStatus.PROCESSING_ERROR
+        result = self._failed_result(self._build_patient_identifier(pdf_path), status, str(error), started)
+        if metrics is not None:
+            result.metrics = metrics
+        return result
+
+    def analyze_raw_text(self, text: str, name: str = "texto") -> AnalysisResult:
+        """Pontua um texto puro (ex.: já extraído por outro sistema), identificado por `name`"""
+        started = time.perf_counter()
+        text_content = self.extractor.from_text(text)
+        patient_id = self._build_patient_identifier(Path(name), text_content.text)
+        patient_id.document_hash = hashlib.sha256(text_content.text.encode('utf-8')).hexdigest()
+        return self.analyze_text(text_content, patient_id, started)
+
+    def analyze_text(self, text_content: TextContent, patient_id: PatientIdentifier,
+                     started: Optional[float] = None, metrics: Optional[StageMetrics] = None) -> AnalysisResult:
+        """Pontua um texto já extraído"""
+        started = started if started is not None else time.perf_counter()
+        metrics = metrics if metrics is not None else StageMetrics()
+        with metrics.timed("normalize"):
+            normalized = ensure_normalized(text_content.text)
+
+        signature = match = None
+        if self.duplicates is not None:
+            with metrics.timed("dedup"):
+                signature = self.duplicates.signature(normalized.text)
+                match = self.duplicates.query(signature)
+                original = self.duplicates.get(match[0]) if match is not None else None
+            if original is not None and original.text_digest == hash_text(normalized.text):
+                return self.reuse_result(original, normalized, text_content, patient_id, match[1], started, metrics)
+
+        negated_terms: List[Tuple[str, str]] = []
+        violence_patterns = ViolencePatterns()
+        detections = self.lexicon.find_detections(
+            normalized, self.config.context_window_chars, negated_terms, metrics,
+            violence_patterns if self.config.enable_pattern_analysis else None
+        )
+        for detection in detections:
+            detection.document_date = text_content.document_metadata.document_date
+            detection.page_number = text_content.page_number_at(detection.position_start)
+
+        category_scores: Dict[str, float] = defaultdict(float)
+        category_counts: Dict[str, int] = Counter()
+        for detection in detections:
+            category_scores[detection.category] += detection.adjusted_weight
+            category_counts[detection.category] += 1
+
+        base_score = sum(detection.base_weight for detection in detections)
+        total_score = sum(category_scores.values()) + violence_patterns.pattern_severity_score
+
+        context_phrases = []
+        if self.config.include_context_phrases:
+            context_phrases = [d.context_phrase for d in detections[:self.config.max_phrases_per_document]]
+
+        result = AnalysisResult(
+            patient_id=patient_id,
+            text_content=text_content,
+            total_score=round(total_score, 2),
+            base_score=round(base_score, 2),
+            contextual_bonus=round(total_score - base_score, 2),
+            severity_level=self.classify_severity(total_score).value,
+            detections=detections,
+            violence_patterns=violence_patterns,
+            category_scores=dict(category_scores),
+            category_counts=dict(category_counts),
+            context_phrases=context_phrases,
+            processing_time_ms=int((time.perf_counter() - started) * 1000),
+            status=ProcessingStatus.SUCCESS.value,
+            negated_terms=negated_terms,
+            lexicon_version=self.lexicon.version,
+            metrics=metrics
+        )
+        if match is not None:
+            self.mark_near_duplicate(result, *match)
+        if signature is not None:
+            self.duplicates.add(patient_id.document_hash, signature, self.reusable_entry(result, normalized))
+        return result
+
+    @staticmethod
+    def mark_near_duplicate(result: AnalysisResult, original_hash: str, similarity: float):
+        """Documento quase idêntico a outro, mas com texto diferente: analisado por inteiro e apenas vinculado"""
+        result.duplicate_of = original_hash
+        result.duplicate_similarity = round(similarity, 3)
+        if result.metrics is not None:
+            result.metrics.count("near_duplicates")
+
+    @staticmethod
+    def reusable_entry(result: AnalysisResult, normalized: NormalizedText) -> ReusableResult:
+        """Entrada do índice de quase-duplicatas, sem o texto do documento"""
+        return ReusableResult(
+            result=replace(result, text_content=None, violence_patterns=replace(result.violence_patterns),
+                           metrics=None),
+            text_digest=hash_text(normalized.text),
+            spans=[(normalized.to_normalized(detection.position_start),
+                    normalized.to_normalized(detection.position_end)) for detection in result.detections]
+        )
+
+    def reuse_result(self, original: ReusableResult, normalized: NormalizedText, text_content: TextContent,
+                     patient_id: PatientIdentifier, similarity: float, started: Optional[float] = None,
+                     metrics: Optional[StageMetrics] = None) -> AnalysisResult:
+        """
+        Resultado de um documento com o mesmo texto normalizado de `original`: escores, negações e
+        padrões são os mesmos; posições, contexto e páginas são recalculados para este documento
+        """
+        started = started if started is not None else time.perf_counter()
+        metrics = metrics if metrics is not None else StageMetrics()
+        metrics.count("duplicates_reused")
+        context_chars = self.config.context_window_chars
+        document_date = text_content.document_metadata.document_date
+
+        detections = []
+        for detection, (start, end) in zip(original.result.detections, original.spans):
+            position_start, position_end = normalized.to_original(start, end)
+            context_start = max(0, position_start - context_chars)
+            detections.append(replace(
+                detection,
+                position_start=position_start,
+                position_end=position_end,
+                context_phrase=normalized.original[context_start:position_end + context_chars].strip(),
+                page_number=text_content.page_number_at(position_start),
+                document_date=document_date
+            ))
+
+        context_phrases = []
+        if self.config.include_context_phrases:
+            context_phrases = [d.context_phrase for d in detections[:self.config.max_phrases_per_document]]
+
+        return replace(
+            original.result,
+            patient_id=patient_id,
+            text_content=text_content,
+            detections=detections,
+            violence_patterns=replace(original.result.violence_patterns),
+            category_scores=dict(original.result.category_scores),
+            category_counts=dict(original.result.category_counts),
+            context_phrases=context_phrases,
+            negated_terms=list(original.result.negated_terms),
+            processing_time_ms=int((time.perf_counter() - started) * 1000),
+            metrics=metrics,
+            duplicate_of=original.result.patient_id.document_hash,
+            duplicate_similarity=round(similarity, 3)
+        )
+
+    @staticmethod
+    def classify_severity(total_score: float) -> SeverityLevel:
+        """Classifica a severidade a partir do escore total (limites em src.config.SEVERITY_THRESHOLDS)"""
+        return SeverityLevel(severity_label(total_score))
+
+    def _build_patient_identifier(self, pdf_path: Path, text: str = "") -> PatientIdentifier:
+        """
+        Identifica o paciente pelo código no documento (RGHC, prontuário), de modo que documentos
+        com nomes diferentes do mesmo paciente se agrupem; sem código, usa o nome do arquivo
+        """
+        patient_id = self.extractor.metadata_extractor.extract_patient_code(text) or pdf_path.stem
+        if self.config.anonymize_identifiers:
+            patient_id = hashlib.sha256(patient_id.encode('utf-8')).hexdigest()[:16]
+        return PatientIdentifier(patient_id=patient_id, document_hash="", filename=pdf_path.name)
+
+    def _failed_result(self, patient_id: PatientIdentifier, status: ProcessingStatus,
+                       error_message: str, started: float) -> AnalysisResult:
+        return AnalysisResult(
+            patient_id=patient_id,
+            text_content=TextContent(
+                text="", page_count=0, extraction_method="", quality_level=QualityLevel.POOR.value,
+                char_count=0, word_count=0
+            ),
+            total_score=0.0,
+            base_score=0.0,
+            contextual_bonus=0.0,
+            severity_level=SeverityLevel.NONE.value,
+            detections=[],
+            violence_patterns=ViolencePatterns(),
+            category_scores={},
+            category_counts={},
+            context_phrases=[],
+            processing_time_ms=int((time.perf_counter() - started) * 1000),
+            status=status.value,
+            error_message=error_message,
+            lexicon_version=self.lexicon.version
+        )
+
+_worker_analyzer: Optional[ViolenceAnalyzer] = None
+
+def _init_batch_worker(config: ProcessingConfig):
+    """Compila o léxico uma única vez em cada processo do pool"""
+    global _worker_analyzer
+    _worker_analyzer = ViolenceAnalyzer(config)
+
+def _analyze_in_worker(pdf_path: Path) -> AnalysisResult:
+    return _worker_analyzer.analyze_file(pdf_path)
+
+class BatchProcessor:
+    """
+    Processa uma pasta de PDFs, em paralelo quando habilitado na configuração.
+
+    Em série, o analisador reaproveita as detecções de cópias com texto normalizado idêntico.
+    No pool, cada worker extrai e pontua o documento inteiro; o índice de quase-duplicatas
+    fica no processo principal e só vincula as cópias entre todos os workers, sem economia
+    de pontuação (para reaproveitar entre workers, use o StagedPipeline).
+    """
+
+    def __init__(self, config: ProcessingConfig, max_workers: Optional[int] = None):
+        self.config = config
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger("BatchProcessor")
+        self.run_metrics = RunMetrics()
+        self.patient_index = PatientIndex.from_config(config) if config.patient_index_path else None
+        self.term_counts: Optional["TermCountMatrixBuilder"] = None
+        if config.term_counts_path:
+            from .scoring import TermCountMatrixBuilder  # NumPy só é carregado por quem grava a matriz
+            self.term_counts = TermCountMatrixBuilder(ExpandedViolenceLexicon.version_for(config))
+        self.duplicates: Optional[NearDuplicateIndex[ReusableResult]] = None
+        if config.enable_near_duplicates:
+            self.duplicates = NearDuplicateIndex(config.near_duplicate_threshold,
+                                                 max_entries=config.near_duplicate_max_entries)
+
+    def process_folder(self, folder_path: Path, manifest: Optional[ProcessingManifest] = None,
+                       output_location: Optional[str] = None,
+                       writer: Optional[ResultWriter] = None) -> List[AnalysisResult]:
+        """Processa a pasta; com manifesto, ignora arquivos inalterados já pontuados com o léxico atual"""
+        return list(self.iter_folder(folder_path, manifest, output_location, writer))
+
+    def process_folder_compact(self, folder_path: Path, manifest: Optional[ProcessingManifest] = None,
+                               output_location: Optional[str] = None,
+                               writer: Optional[ResultWriter] = None) -> "ResultBatch":
+        """Como process_folder, mas sem manter textos e detecções em dataclasses na memória"""
+        from .compact import ResultBatch  # NumPy só é carregado por quem usa o lote compacto
+
+        batch = ResultBatch()
+        for result in self.iter_folder(folder_path, manifest, output_location, writer):
+            batch.add(result)
+        return batch
+
+    def iter_folder(self, folder_path: Path, manifest: Optional[ProcessingManifest] = None,
+                    output_location: Optional[str] = None,
+                    writer: Optional[ResultWriter] = None) -> Iterator[AnalysisResult]:
+        """
+        Produz os resultados gravando e registrando no manifesto a cada batch_size arquivos;
+        ao concluir a pasta, compacta o manifesto e grava a matriz documento × termo
+        """
+        pdf_paths = sorted(p for p in Path(folder_path).iterdir() if p.suffix.lower() == '.pdf')
+
+        lexicon_version = None
+        if manifest is not None:
+            lexicon_version = ExpandedViolenceLexicon.version_for(self.config)
+            pending = [p for p in pdf_paths if manifest.needs_processing(p, lexicon_version)]
+            self.logger.info("%d inalterados ignorados, %d a processar", len(pdf_paths) - len(pending), len(pending))
+            pdf_paths = pending
+
+        batch = []
+        for pdf_path, result in zip(pdf_paths, self.iter_results(pdf_paths)):
+            batch.append((pdf_path, result))
+            if len(batch) >= self.config.batch_size:
+                yield from self._commit_batch(batch, manifest, lexicon_version, output_location, writer)
+                batch = []
+        if batch:
+            yield from self._commit_batch(batch, manifest, lexicon_version, output_location, writer)
+        if manifest is not None:
+            manifest.compact()
+        if self.term_counts is not None:
+            self.term_counts.save(self.config.term_counts_path)
+
+    def _commit_batch(self, batch: List[Tuple[Path, AnalysisResult]], manifest: Optional[ProcessingManifest],
+                      lexicon_version: Optional[str], output_location: Optional[str],
+                      writer: Optional[ResultWriter]) -> Iterator[AnalysisResult]:
+        """Grava o lote e só então o registra no manifesto, para que uma queda não perca resultados"""
+        started = time.perf_counter()
+        if self.patient_index is not None:
+            for _, result in batch:
+                self.patient_index.add_result(result)
+        if self.term_counts is not None:
+            for _, result in batch:
+                if result.status == ProcessingStatus.SUCCESS.value:
+                    self.term_counts.add_result(result)
+        if writer is not None:
+            writer.write_batch(result for _, result in batch)
+        if self.patient_index is not None:
+            self.patient_index.flush()
+        if manifest is not None:
+            for pdf_path, result in batch:
+                manifest.record(pdf_path, result.status, lexicon_version, output_location)
+        self.run_metrics.add_time("write", time.perf_counter() - started)
+        for _, result in batch:
+            self.run_metrics.add_result(result)
+            yield result
+
+    def iter_results(self, pdf_paths: List[Path]) -> Iterator[AnalysisResult]:
+        """Produz os resultados na ordem dos arquivos de entrada"""
+        if not self.config.enable_parallel_processing or self.max_workers <= 1 or len(pdf_paths) <= 1:
+            analyzer = ViolenceAnalyzer(self.config)
+            for pdf_path in pdf_paths:
+                yield analyzer.analyze_file(pdf_path)
+            return
+
+        workers = min(self.max_workers, len(pdf_paths))
+        # Lotes de até batch_size arquivos, sem deixar processos ociosos em pastas pequenas
+        chunksize = max(1, min(self.config.batch_size, -(-len(pdf_paths) // workers)))
+
+        worker_config = replace(self.config, enable_near_duplicates=False)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(worker_config,)) as pool:
+            for pdf_path, result in zip(pdf_paths, pool.map(_analyze_in_worker, pdf_paths, chunksize=chunksize)):
+                if result.status != ProcessingStatus.SUCCESS.value:
+                    self.logger.warning(f"{pdf_path.name}: {result.status} - {result.error_message}")
+                elif self.duplicates is not None:
+                    self._link_duplicate(result)
+                yield result
+
+    def _link_duplicate(self, result: AnalysisResult):
+        """Vincula o resultado de um worker a uma cópia já vista por qualquer worker"""
+        with result.metrics.timed("dedup"):
+            normalized = ensure_normalized(result.text_content.text)
+            signature = self.duplicates.signature(normalized.text)
+            match = self.duplicates.query(signature)
+        if match is not None:
+            ViolenceAnalyzer.mark_near_duplicate(result, *match)
+        self.duplicates.add(result.patient_id.document_hash, signature,
+                            ViolenceAnalyzer.reusable_entry(result, normalized))
@@ -0,0 +1,108 @@
+"""
+Artefato compilado e versionado do léxico.
+
+A etapa de build converte o léxico em JSON no autômato de `TermMatcher` e o
+serializa em disco junto com o hash de versão; processos e workers carregam o
+artefato pronto em vez de recompilar o léxico a cada inicialização. O artefato
+do motor completo (ExpandedViolenceLexicon) inclui as pistas de padrões e
+registra a mesma versão gravada em cada resultado.
+
+Uso: python -m src.artifact data/lexicon/violence_terms.json lexicon.artifact
+"""
+
+import argparse
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from .matcher import PatternCue, TermMatcher
+from .utils import hash_text
+
+ARTIFACT_FORMAT = 2
+
+class LexiconArtifact(NamedTuple):
+    version: str
+    lexicon: Dict[str, Dict[str, Any]]
+    matcher: TermMatcher
+
+# Artefatos já carregados neste processo, por (caminho, mtime)
+_loaded: Dict[Tuple[str, int], LexiconArtifact] = {}
+
+Cues = Iterable[Tuple[str, PatternCue]]
+
+def lexicon_version(lexicon: Dict[str, Dict[str, Any]], cues: Cues = ()) -> str:
+    """Hash curto do léxico (e das pistas auxiliares, se houver), estável em relação à ordem das chaves"""
+    cues = [[term, list(cue)] for term, cue in cues]
+    definition = {"lexicon": lexicon, "cues": cues} if cues else lexicon
+    return hash_text(json.dumps(definition, sort_keys=True, ensure_ascii=False))[:12]
+
+def build_artifact(lexicon: Dict[str, Dict[str, Any]], output_path, cues: Cues = (),
+                   version: Optional[str] = None) -> LexiconArtifact:
+    """
+    Compila o léxico (com as pistas auxiliares no mesmo autômato) e grava o artefato de forma atômica.
+    `version` substitui o hash do léxico quando quem compila tem uma definição mais ampla (ex.: o motor).
+    """
+    cues = list(cues)
+    version = version or lexicon_version(lexicon, cues)
+    artifact = LexiconArtifact(version, lexicon, TermMatcher.from_lexicon(lexicon, cues))
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(
+                {"format": ARTIFACT_FORMAT, **artifact._asdict()},
+                file, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return artifact
+
+def load_artifact(path) -> LexiconArtifact:
+    """Carrega o artefato uma única vez por processo (recarrega se o arquivo mudar)"""
+    path = Path(path).resolve()
+    key = (str(path), path.stat().st_mtime_ns)
+    artifact = _loaded.get(key)
+    if artifact is None:
+        with open(path, "rb") as file:
+            data = pickle.load(file)
+        if data.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Formato de artefato não suportado: {data.get('format')}")
+        artifact = LexiconArtifact(data["version"], data["lexicon"], data["matcher"])
+        _loaded[key] = artifact
+    return artifact
+
+def load_or_build(lexicon: Dict[str, Dict[str, Any]], artifact_path, cues: Cues = (),
+                  version: Optional[str] = None) -> LexiconArtifact:
+    """Reaproveita o artefato se ele corresponde ao léxico; caso contrário, recompila e regrava"""
+    cues = list(cues)
+    version = version or lexicon_version(lexicon, cues)
+    try:
+        artifact = load_artifact(artifact_path)
+        if artifact.version == version:
+            return artifact
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        pass  # Artefato ausente, corrompido ou de outro formato
+    return build_artifact(lexicon, artifact_path, cues, version)
+
+def main(argv=None):
+    from .expanded_lexicon import ExpandedViolenceLexicon  # O motor importa este módulo
+
+    parser = argparse.ArgumentParser(description="Compila o léxico em JSON em um artefato versionado")
+    parser.add_argument("lexicon_json")
+    parser.add_argument("output")
+    args = parser.parse_args(argv)
+
+    # Mesmas pistas e mesma versão que o motor usa ao carregar o artefato
+    engine = ExpandedViolenceLexicon(args.lexicon_json, compile_matcher=False)
+    artifact = build_artifact(engine.categories, args.output, engine.pattern_cues(), engine.version)
+    print(f"{args.output}: {len(artifact.matcher)} termos, versão {artifact.version}")
+
+if __name__ == "__main__":
+    main()
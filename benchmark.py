@@ -0,0 +1,221 @@
+"""
+Benchmark reprodutível do motor de detecção sobre prontuários sintéticos.
+
+Mede cada etapa (extração por backend, normalização, termos, negação, contexto,
+padrões e gravação) para vários tamanhos de documento e de léxico e grava os
+tempos em JSON, para comparar execuções e detectar regressões.
+
+Uso: python -m src.benchmark --output bench.json [--baseline anterior.json]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .analyzer import ViolenceAnalyzer
+from .config import ProcessingConfig
+from .expanded_lexicon import ExpandedViolenceLexicon
+from .extractor import EnhancedTextExtractor, _load_backend
+from .models import ViolenceDetection
+from .normalize import normalize_text
+from .synthetic import SyntheticNoteGenerator, write_pdf
+from .writers import CsvResultWriter, JsonlResultWriter
+
+DEFAULT_SIZES = (2_000, 20_000, 200_000)
+DEFAULT_LEXICON_SCALES = (0.25, 1.0, 4.0)
+
+def _time(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return {"seconds_median": statistics.median(timings), "seconds_min": min(timings), "repeat": repeat}
+
+def scale_lexicon(lexicon: Dict[str, Dict[str, Any]], scale: float, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Subamostra (scale < 1) ou amplia com variantes sintéticas (scale > 1) os termos de cada categoria"""
+    rng = random.Random(seed)
+    scaled = {}
+    for category, info in lexicon.items():
+        terms = list(info["terms"])
+        if scale < 1:
+            terms = rng.sample(terms, max(1, round(len(terms) * scale)))
+        else:
+            extra = round(len(terms) * (scale - 1))
+            terms += [f"{rng.choice(info['terms'])} grau {i}" for i in range(extra)]
+        scaled[category] = {**info, "terms": terms}
+    return scaled
+
+def _text_cases(lexicon: ExpandedViolenceLexicon, text: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Tempos das etapas de detecção sobre um texto já extraído"""
+    normalized = normalize_text(text)
+    buffer = normalized.text
+    hits = lexicon._scan_terms(buffer)
+    negation_index = lexicon.build_negation_index(buffer)
+    detections = [
+        ViolenceDetection(term=term, category=category, base_weight=1.0, adjusted_weight=1.0,
+                          context_phrase="", position_start=start, position_end=end)
+        for term, category, start, end in (
+            (term, category, *normalized.to_original(start, end)) for term, category, start, end in hits
+        )
+    ]
+
+    def negation():
+        index = lexicon.build_negation_index(buffer)
+        for _, _, start, end in hits:
+            lexicon.detect_negation_context(buffer, start, end, index)
+
+    def context():
+        context_index = lexicon._scan(buffer).context_index
+        for detection in detections:
+            lexicon.analyze_contextual_intensity(normalized, detection, context_index)
+
+    return {
+        "normalize": _time(lambda: normalize_text(text), repeat),
+        "terms": _time(lambda: lexicon._scan_terms(buffer), repeat),
+        "negation": _time(negation, repeat),
+        "context": _time(context, repeat),
+        "patterns": _time(lambda: lexicon.detect_violence_patterns(normalized), repeat),
+        "find_detections": _time(lambda: lexicon.find_detections(normalized), repeat),
+        "_counts": {"hits": len(hits), "negation_cues": len(negation_index.cue_starts)},
+    }
+
+def _extraction_cases(text: str, workdir: Path, repeat: int) -> List[Dict[str, Any]]:
+    """Extração de PDFs com camada de texto e digitalizados, separada por backend"""
+    extractor = EnhancedTextExtractor(ProcessingConfig())
+    methods = dict(extractor._extraction_methods())
+    cases = []
+    for variant, scanned in (("text_layer", False), ("scanned", True)):
+        pdf_path = write_pdf(text, workdir / f"{variant}_{len(text)}.pdf", scanned=scanned)
+        for backend in ("fitz", "pdfplumber", "ocr"):
+            case = {"stage": "extraction", "backend": backend, "variant": variant, "doc_chars": len(text)}
+            if backend not in methods:
+                case["skipped"] = "backend indisponível"
+            elif backend == "ocr" and not scanned:
+                continue  # OCR só é usado nas páginas sem camada de texto
+            else:
+                case.update(_time(lambda: methods[backend](pdf_path, None), 1 if backend == "ocr" else repeat))
+            cases.append(case)
+    return cases
+
+def run_benchmark(sizes: Sequence[int] = DEFAULT_SIZES,
+                  lexicon_scales: Sequence[float] = DEFAULT_LEXICON_SCALES,
+                  repeat: int = 3, seed: int = 0, include_pdf: bool = True) -> Dict[str, Any]:
+    """Executa todas as medições e retorna o relatório (serializável em JSON)"""
+    base_lexicon = ExpandedViolenceLexicon()
+    generator = SyntheticNoteGenerator(base_lexicon.categories, seed=seed)
+    notes = {size: generator.note(size) for size in sizes}
+    cases: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+
+        for scale in lexicon_scales:
+            lexicon_path = workdir / f"lexicon_{scale}.json"
+            lexicon_path.write_text(
+                json.dumps(scale_lexicon(base_lexicon.categories, scale, seed), ensure_ascii=False),
+                encoding="utf-8"
+            )
+            started = time.perf_counter()
+            lexicon = ExpandedViolenceLexicon(str(lexicon_path))
+            compile_seconds = time.perf_counter() - started
+            lexicon_terms = len(lexicon.matcher)
+            cases.append({"stage": "compile", "lexicon_terms": lexicon_terms, "seconds_median": compile_seconds,
+                          "seconds_min": compile_seconds, "repeat": 1})
+
+            analyzer = ViolenceAnalyzer(ProcessingConfig(), lexicon)
+            for size, note in notes.items():
+                stage_times = _text_cases(lexicon, note.text, repeat)
+                counts = stage_times.pop("_counts")
+                for stage, timing in stage_times.items():
+                    cases.append({"stage": stage, "doc_chars": len(note.text), "lexicon_terms": lexicon_terms,
+                                  **counts, **timing})
+
+                results = [analyzer.analyze_raw_text(note.text, f"sintetico_{size}")]
+                cases.append({"stage": "analyze_total", "doc_chars": len(note.text), "lexicon_terms": lexicon_terms,
+                              **_time(lambda: analyzer.analyze_raw_text(note.text), repeat)})
+
+                for writer_class in (JsonlResultWriter, CsvResultWriter):
+                    output_dir = workdir / f"out_{writer_class.__name__}"
+                    with writer_class(output_dir) as writer:
+                        cases.append({"stage": "output", "backend": writer_class.__name__,
+                                      "doc_chars": len(note.text), "lexicon_terms": lexicon_terms,
+                                      **_time(lambda: writer.write_batch(results), repeat)})
+
+        if include_pdf and _load_backend("fitz") is None:
+            cases.append({"stage": "extraction", "skipped": "PyMuPDF não instalado (necessário para gerar os PDFs)"})
+        elif include_pdf:
+            for size, note in notes.items():
+                cases.extend(_extraction_cases(note.text, workdir, repeat))
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "seed": seed,
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "documents": {
+            str(size): {"chars": len(note.text), "planted_terms": len(note.planted_terms),
+                        "negated_terms": len(note.negated_terms), "context_sentences": note.context_sentences}
+            for size, note in notes.items()
+        },
+        "cases": cases,
+    }
+
+def _case_key(case: Dict[str, Any]):
+    return tuple(case.get(name) for name in ("stage", "backend", "variant", "doc_chars", "lexicon_terms"))
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """Casos que ficaram mais de `tolerance` (fração) mais lentos que no relatório de referência"""
+    previous = {_case_key(case): case for case in baseline["cases"] if "seconds_min" in case}
+    regressions = []
+    for case in report["cases"]:
+        old = previous.get(_case_key(case))
+        if old is None or "seconds_min" not in case or old["seconds_min"] <= 0:
+            continue
+        ratio = case["seconds_min"] / old["seconds_min"]
+        if ratio > 1 + tolerance:
+            regressions.append({**case, "baseline_seconds_min": old["seconds_min"], "ratio": round(ratio, 3)})
+    return regressions
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do motor NUVE com prontuários sintéticos")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--lexicon-scales", default=",".join(map(str, DEFAULT_LEXICON_SCALES)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-pdf", action="store_true")
+    parser.add_argument("--baseline", help="relatório anterior; falha se algum caso regredir")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        lexicon_scales=[float(scale) for scale in args.lexicon_scales.split(",")],
+        repeat=args.repeat, seed=args.seed, include_pdf=not args.no_pdf
+    )
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"{len(report['cases'])} medições gravadas em {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        for case in regressions:
+            print(f"REGRESSÃO {case['stage']} {case.get('backend') or ''} {case.get('doc_chars')} chars: "
+                  f"{case['baseline_seconds_min']:.4f}s -> {case['seconds_min']:.4f}s (x{case['ratio']})")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
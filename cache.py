@@ -0,0 +1,96 @@
+"""
+Cache persistente, endereçado por conteúdo, para resultados de extração de texto.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .utils import hash_file, hash_text
+
+
+class ExtractionCache:
+    """Armazena em disco payloads JSON com remoção LRU limitada por tamanho."""
+
+    SUFFIX = ".json.gz"
+
+    def __init__(self, cache_dir, max_size_mb: int = 2048):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._size_bytes = sum(path.stat().st_size for path in self._entries())
+
+    @staticmethod
+    def make_key(pdf_path, version: str, settings: Optional[Dict[str, Any]] = None) -> str:
+        """Chave derivada do SHA-256 do arquivo, da versão do extrator e da configuração"""
+        settings_repr = json.dumps(settings or {}, sort_keys=True)
+        return hash_text(f"{hash_file(pdf_path)}:{version}:{settings_repr}")
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.SUFFIX}"
+
+    def _entries(self):
+        return self.cache_dir.glob(f"*/*{self.SUFFIX}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path_for(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Atualiza o horário de acesso usado na remoção LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: Dict[str, Any]):
+        path = self._path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        previous_size = path.stat().st_size if path.exists() else 0
+
+        # Escrita atômica: vários processos podem compartilhar o mesmo diretório
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as file:
+                file.write(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+            os.replace(temp_name, path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+
+        self._size_bytes += path.stat().st_size - previous_size
+        if self._size_bytes > self.max_size_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Remove as entradas usadas há mais tempo até voltar ao limite de tamanho"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self._size_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size_bytes <= self.max_size_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size_bytes -= size
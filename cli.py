@@ -0,0 +1,166 @@
+"""
+Linha de comando do sistema NUVE (python -m src).
+
+    python -m src texto nota.txt            # pontua texto já extraído (ou "-" para stdin)
+    python -m src arquivo prontuario.pdf    # analisa um único PDF
+    python -m src pasta PASTA --saida DIR   # processa uma pasta em lotes, com manifesto
+    python -m src pacientes pacientes.jsonl # histórico por paciente (cronicidade, escalada)
+    python -m src servidor --port 8765      # serviço HTTP local (ou --socket /tmp/nuve.sock)
+
+Os comandos `texto` e `arquivo` escrevem um AnalysisResult em JSON por linha.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from collections import Counter
+from pathlib import Path
+
+from .config import ProcessingConfig
+
+def _build_config(args) -> ProcessingConfig:
+    config = ProcessingConfig(
+        lexicon_path=args.lexicon,
+        lexicon_artifact_path=args.artifact,
+        extraction_cache_dir=getattr(args, "cache_dir", None),
+        patient_index_path=getattr(args, "patients", None),
+        term_counts_path=getattr(args, "term_counts", None),
+        enable_near_duplicates=getattr(args, "dedup", False),
+    )
+    if getattr(args, "formats", None):
+        config.output_formats = args.formats.split(",")
+    if getattr(args, "ocr_workers", None):
+        config.ocr_workers = args.ocr_workers
+    if (getattr(args, "workers", 0) or 0) > 1:
+        config.enable_parallel_processing = True
+    return config
+
+def _print_result(result, include_text: bool):
+    from .writers import result_to_dict
+
+    print(json.dumps(result_to_dict(result, include_text), ensure_ascii=False))
+
+def _run_text(args) -> int:
+    from .analyzer import ViolenceAnalyzer
+
+    analyzer = ViolenceAnalyzer(_build_config(args))
+    for path in args.paths:
+        if path == "-":
+            result = analyzer.analyze_raw_text(sys.stdin.read(), "stdin")
+        else:
+            result = analyzer.analyze_raw_text(Path(path).read_text(encoding="utf-8"), Path(path).name)
+        _print_result(result, args.include_text)
+    return 0
+
+def _run_file(args) -> int:
+    from .analyzer import ViolenceAnalyzer
+
+    analyzer = ViolenceAnalyzer(_build_config(args))
+    failed = 0
+    for path in args.paths:
+        result = analyzer.analyze_file(Path(path))
+        failed += result.status != "sucesso"
+        _print_result(result, args.include_text)
+    return 1 if failed else 0
+
+def _run_folder(args) -> int:
+    from .analyzer import BatchProcessor
+    from .manifest import ProcessingManifest
+    from .writers import open_writers
+
+    config = _build_config(args)
+    manifest = ProcessingManifest(args.manifest) if args.manifest else None
+    status_counts = Counter()
+    with open_writers(args.saida, config.output_formats) as writer:
+        if args.pipeline:
+            import asyncio
+            from .pipeline import StagedPipeline
+
+            processor = StagedPipeline(config, args.workers or None)
+            status_counts = asyncio.run(processor.run(Path(args.pasta), manifest, args.saida, writer))
+        else:
+            processor = BatchProcessor(config, args.workers or None)
+            for result in processor.iter_folder(Path(args.pasta), manifest, args.saida, writer):
+                status_counts[result.status] += 1
+
+    if args.metrics:
+        processor.run_metrics.export(args.metrics)
+
+    print(json.dumps(dict(status_counts), ensure_ascii=False))
+    return 0
+
+def _run_patients(args) -> int:
+    from .longitudinal import PatientIndex
+
+    index = PatientIndex.from_config(_build_config(args))
+    for history in index:
+        summary = index.summary(history)
+        if not args.flagged or summary["chronic"] or summary["escalating"]:
+            print(json.dumps(summary, ensure_ascii=False))
+    return 0
+
+def _run_server(args) -> int:
+    from .server import serve
+
+    serve(_build_config(args), args.host, args.port, args.socket, args.workers)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Detecção de violência em prontuários")
+    parser.add_argument("--lexicon", help="léxico em JSON (padrão: base expandida)")
+    parser.add_argument("--artifact", help="artefato compilado do léxico (criado se ausente ou desatualizado)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    text = commands.add_parser("texto", help="pontua arquivos de texto já extraído")
+    text.add_argument("paths", nargs="+")
+    text.add_argument("--include-text", action="store_true")
+    text.set_defaults(run=_run_text)
+
+    file = commands.add_parser("arquivo", help="analisa PDFs individualmente")
+    file.add_argument("paths", nargs="+")
+    file.add_argument("--include-text", action="store_true")
+    file.add_argument("--cache-dir")
+    file.add_argument("--ocr-workers", type=int, help="execuções simultâneas do tesseract por processo")
+    file.set_defaults(run=_run_file)
+
+    folder = commands.add_parser("pasta", help="processa uma pasta de PDFs em lotes")
+    folder.add_argument("pasta")
+    folder.add_argument("--saida", required=True, help="diretório de resultados")
+    folder.add_argument("--formats", default="csv,jsonl", help="formatos separados por vírgula")
+    folder.add_argument("--manifest", help="manifesto JSONL para execuções incrementais")
+    folder.add_argument("--cache-dir")
+    folder.add_argument("--ocr-workers", type=int, help="execuções simultâneas do tesseract por processo")
+    folder.add_argument("--workers", type=int, default=0)
+    folder.add_argument("--pipeline", action="store_true",
+                        help="sobrepõe leitura, extração, detecção e gravação (asyncio)")
+    folder.add_argument("--metrics", help="grava as métricas da execução (.json ou .prom)")
+    folder.add_argument("--patients", help="índice longitudinal por paciente (JSONL), atualizado a cada lote")
+    folder.add_argument("--term-counts", help="matriz documento × termo (.npz) para repontuar sem reler os "
+                                              "PDFs; execuções incrementais acrescentam à matriz existente")
+    folder.add_argument("--dedup", action="store_true",
+                        help="vincula documentos quase idênticos a outros já analisados; as detecções só são "
+                             "reaproveitadas quando o texto normalizado é idêntico, e só em série ou com "
+                             "--pipeline (com --workers, as cópias são apenas vinculadas)")
+    folder.set_defaults(run=_run_folder)
+
+    patients = commands.add_parser("pacientes", help="lista os agregados do índice longitudinal")
+    patients.add_argument("patients", help="índice longitudinal (JSONL)")
+    patients.add_argument("--flagged", action="store_true", help="apenas pacientes crônicos ou em escalada")
+    patients.set_defaults(run=_run_patients)
+
+    server = commands.add_parser("servidor", help="serviço HTTP local com léxico e workers aquecidos")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--socket", help="caminho de um socket Unix (no lugar de host/porta)")
+    server.add_argument("--workers", type=int, help="processos do pool (0 analisa na própria thread)")
+    server.add_argument("--cache-dir")
+    server.add_argument("--ocr-workers", type=int, help="execuções simultâneas do tesseract por processo")
+    server.set_defaults(run=_run_server)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    return args.run(args)
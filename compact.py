@@ -0,0 +1,265 @@
+"""
+Representações compactas de resultados para lotes grandes.
+
+Cada detecção vira uma linha de uma tabela colunar (códigos inteiros e posições),
+sem cópias das frases de contexto; os resultados viram registros com __slots__
+que não mantêm o texto do documento vivo. As métricas por etapa de cada
+documento são somadas no lote em vez de guardadas por registro. A visão em
+dataclasses de `models` continua disponível sob demanda.
+"""
+
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+from .metrics import RunMetrics
+from .models import AnalysisResult, PatientIdentifier, TextContent, ViolenceDetection, ViolencePatterns
+from .utils import enum_value
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+PATTERN_FLAGS = (
+    "chronic_violence", "escalation_pattern", "weapons_involved", "children_present",
+    "pregnancy_violence", "sexual_violence", "death_threats", "multiple_injuries",
+    "psychological_control", "economic_abuse",
+)
+
+class CodeTable:
+    """Interna strings repetidas como códigos inteiros pequenos."""
+
+    __slots__ = ("_codes", "values")
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def value(self, code: int) -> str:
+        return self.values[code]
+
+class DetectionTable:
+    """Tabela colunar de detecções; colunas expostas como arrays NumPy sem cópia."""
+
+    COLUMNS = {
+        "doc": "I",
+        "term": "I",
+        "category": "H",
+        "start": "I",
+        "end": "I",
+        "page": "H",
+        "base_weight": "f",
+        "adjusted_weight": "f",
+        "intensity": "f",
+        "confidence": "f",
+    }
+
+    def __init__(self):
+        self._columns = {name: array(typecode) for name, typecode in self.COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self._columns["doc"])
+
+    def append(self, doc: int, term: int, category: int, detection: Any):
+        columns = self._columns
+        columns["doc"].append(doc)
+        columns["term"].append(term)
+        columns["category"].append(category)
+        columns["start"].append(detection.position_start)
+        columns["end"].append(detection.position_end)
+        columns["page"].append(detection.page_number)
+        columns["base_weight"].append(detection.base_weight)
+        columns["adjusted_weight"].append(detection.adjusted_weight)
+        columns["intensity"].append(detection.intensity_multiplier)
+        columns["confidence"].append(detection.confidence_score)
+
+    def column(self, name: str):
+        """Coluna como array NumPy (visão sobre o buffer) ou, sem NumPy, como array.array"""
+        values = self._columns[name]
+        if HAS_NUMPY:
+            return np.frombuffer(values, dtype=values.typecode) if len(values) else np.array([], dtype=values.typecode)
+        return values
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {name: values[index] for name, values in self._columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.itemsize * len(values) for values in self._columns.values())
+
+class CompactResult:
+    """Resultado de um documento sem o texto nem cópias das detecções."""
+
+    __slots__ = (
+        "patient_id", "document_hash", "filename", "total_score", "base_score",
+        "contextual_bonus", "severity_code", "status_code", "method_code", "quality_code",
+        "page_count", "char_count", "processing_time_ms", "pattern_flags",
+        "pattern_severity_score", "document_date", "error_message", "lexicon_version",
+        "duplicate_of", "duplicate_similarity", "row_start", "row_end",
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+class ResultBatch:
+    """Lote de resultados compactos compartilhando as tabelas de códigos e de detecções."""
+
+    def __init__(self):
+        self.terms = CodeTable()
+        self.categories = CodeTable()
+        self.labels = CodeTable()  # Severidade, status, método de extração e qualidade
+        self.detections = DetectionTable()
+        self.results: List[CompactResult] = []
+        self.metrics = RunMetrics()  # Tempos e contadores somados de todos os resultados
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __iter__(self) -> Iterator[CompactResult]:
+        return iter(self.results)
+
+    def __getitem__(self, index: int) -> CompactResult:
+        return self.results[index]
+
+    def add(self, result: Any) -> CompactResult:
+        """Converte um AnalysisResult, descartando o texto, as frases de contexto e as métricas por etapa"""
+        self.metrics.add_result(result)
+        doc = len(self.results)
+        row_start = len(self.detections)
+        for detection in result.detections:
+            self.detections.append(
+                doc, self.terms.code(detection.term), self.categories.code(detection.category), detection
+            )
+
+        patterns = result.violence_patterns
+        flags = 0
+        for bit, name in enumerate(PATTERN_FLAGS):
+            if getattr(patterns, name):
+                flags |= 1 << bit
+
+        text_content = result.text_content
+        compact = CompactResult(
+            patient_id=result.patient_id.patient_id,
+            document_hash=result.patient_id.document_hash,
+            filename=result.patient_id.filename,
+            total_score=result.total_score,
+            base_score=result.base_score,
+            contextual_bonus=result.contextual_bonus,
+            severity_code=self.labels.code(enum_value(result.severity_level)),
+            status_code=self.labels.code(enum_value(result.status)),
+            method_code=self.labels.code(text_content.extraction_method),
+            quality_code=self.labels.code(enum_value(text_content.quality_level)),
+            page_count=text_content.page_count,
+            char_count=text_content.char_count,
+            processing_time_ms=result.processing_time_ms,
+            pattern_flags=flags,
+            pattern_severity_score=patterns.pattern_severity_score,
+            document_date=text_content.document_metadata.document_date,
+            error_message=result.error_message,
+            lexicon_version=getattr(result, "lexicon_version", None),
+            duplicate_of=getattr(result, "duplicate_of", None),
+            duplicate_similarity=getattr(result, "duplicate_similarity", None),
+            row_start=row_start,
+            row_end=len(self.detections),
+        )
+        self.results.append(compact)
+        return compact
+
+    def category_scores(self, index: int) -> Dict[str, float]:
+        compact = self.results[index]
+        categories = self.detections._columns["category"]
+        weights = self.detections._columns["adjusted_weight"]
+        scores: Dict[str, float] = {}
+        for row in range(compact.row_start, compact.row_end):
+            category = self.categories.value(categories[row])
+            scores[category] = scores.get(category, 0.0) + weights[row]
+        return {category: round(score, 4) for category, score in scores.items()}
+
+    def category_counts(self, index: int) -> Dict[str, int]:
+        compact = self.results[index]
+        categories = self.detections._columns["category"]
+        counts: Dict[str, int] = {}
+        for row in range(compact.row_start, compact.row_end):
+            category = self.categories.value(categories[row])
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def detection_view(self, index: int, text: Optional[str] = None,
+                       context_chars: int = 150) -> List[ViolenceDetection]:
+        """Reconstrói as detecções como dataclasses; o contexto exige o texto do documento"""
+        compact = self.results[index]
+        detections = []
+        for row in range(compact.row_start, compact.row_end):
+            values = self.detections.row(row)
+            start, end = values["start"], values["end"]
+            detections.append(ViolenceDetection(
+                term=self.terms.value(values["term"]),
+                category=self.categories.value(values["category"]),
+                base_weight=values["base_weight"],
+                adjusted_weight=values["adjusted_weight"],
+                context_phrase=text[max(0, start - context_chars):end + context_chars].strip() if text else "",
+                position_start=start,
+                position_end=end,
+                confidence_score=values["confidence"],
+                intensity_multiplier=values["intensity"],
+                page_number=values["page"],
+                document_date=compact.document_date,
+            ))
+        return detections
+
+    def to_analysis_result(self, index: int, text_content: Optional[TextContent] = None) -> AnalysisResult:
+        """Visão completa em dataclasses de um resultado do lote"""
+        compact = self.results[index]
+        labels = self.labels
+        if text_content is None:
+            text_content = TextContent(
+                text="",
+                page_count=compact.page_count,
+                extraction_method=labels.value(compact.method_code),
+                quality_level=labels.value(compact.quality_code),
+                char_count=compact.char_count,
+                word_count=0,
+            )
+        text_content.document_metadata.document_date = compact.document_date
+
+        patterns = ViolencePatterns(pattern_severity_score=compact.pattern_severity_score)
+        for bit, name in enumerate(PATTERN_FLAGS):
+            setattr(patterns, name, bool(compact.pattern_flags & (1 << bit)))
+
+        detections = self.detection_view(index, text_content.text or None)
+        return AnalysisResult(
+            patient_id=PatientIdentifier(
+                patient_id=compact.patient_id,
+                document_hash=compact.document_hash,
+                filename=compact.filename,
+            ),
+            text_content=text_content,
+            total_score=compact.total_score,
+            base_score=compact.base_score,
+            contextual_bonus=compact.contextual_bonus,
+            severity_level=labels.value(compact.severity_code),
+            detections=detections,
+            violence_patterns=patterns,
+            category_scores=self.category_scores(index),
+            category_counts=self.category_counts(index),
+            context_phrases=[d.context_phrase for d in detections if d.context_phrase],
+            processing_time_ms=compact.processing_time_ms,
+            status=labels.value(compact.status_code),
+            error_message=compact.error_message,
+            lexicon_version=compact.lexicon_version,
+            duplicate_of=compact.duplicate_of,
+            duplicate_similarity=compact.duplicate_similarity,
+        )
@@ -2,7 +2,9 @@
 Configurações e enums do sistema NUVE.
 """
 
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import List, Optional, Tuple
 
 class ProcessingStatus(Enum):
     SUCCESS = "sucesso"
@@ -30,4 +32,57 @@ class DocumentType(Enum):
     EVOLUCAO_MEDICA = "Evolução Médica"
     ANOTACOES_ENFERMAGEM = "Anotações da Enfermagem"
     MULTIPROFISSIONAL = "Multiprofissional"
-    OUTROS = "Outros"
\ No newline at end of file
+    OUTROS = "Outros"
+
+# Limites inferiores do escore total para cada nível (acima de zero e abaixo de 2: MÍNIMO)
+SEVERITY_THRESHOLDS: Tuple[Tuple[float, SeverityLevel], ...] = (
+    (2.0, SeverityLevel.LOW),
+    (6.0, SeverityLevel.MODERATE),
+    (12.0, SeverityLevel.HIGH),
+    (20.0, SeverityLevel.CRITICAL),
+)
+
+def severity_label(total_score: float) -> str:
+    """Nível de severidade (valor de SeverityLevel) para um escore total"""
+    if total_score <= 0:
+        return SeverityLevel.NONE.value
+    level = SeverityLevel.MINIMAL
+    for threshold, threshold_level in SEVERITY_THRESHOLDS:
+        if total_score >= threshold:
+            level = threshold_level
+    return level.value
+
+@dataclass
+class ProcessingConfig:
+    ocr_threshold: int = 100
+    ocr_page_cache_entries: int = 4096  # Páginas já reconhecidas mantidas em memória por processo
+    ocr_workers: int = 2  # Execuções simultâneas do tesseract por extrator
+    ocr_triage_dpi: int = 150  # Primeira passada, rápida, em todas as páginas
+    ocr_dpi: int = 300  # Refação das páginas com confiança baixa na triagem
+    ocr_min_confidence: float = 80.0  # Confiança média (0-100) para aceitar o OCR da triagem
+    ocr_blank_ink_ratio: float = 0.001  # Abaixo desta fração de pixels escuros, a página é considerada em branco
+    max_file_size_mb: int = 50
+    context_window_chars: int = 150
+    min_text_quality_chars: int = 30
+    anonymize_identifiers: bool = True
+    secure_temp_processing: bool = True
+    log_sensitive_data: bool = False
+    batch_size: int = 10
+    enable_parallel_processing: bool = False
+    cache_compiled_patterns: bool = True
+    output_formats: List[str] = field(default_factory=lambda: ['csv', 'json'])
+    include_context_phrases: bool = True
+    max_phrases_per_document: int = 25
+    enable_pattern_analysis: bool = True
+    extraction_cache_dir: Optional[str] = None
+    extraction_cache_max_mb: int = 2048
+    lexicon_path: Optional[str] = None  # Léxico em JSON; por padrão, a base expandida
+    lexicon_artifact_path: Optional[str] = None
+    patient_index_path: Optional[str] = None  # Índice longitudinal por paciente (JSONL)
+    term_counts_path: Optional[str] = None  # Matriz documento × termo (.npz), acrescida a cada execução
+    chronic_min_episodes: int = 3
+    chronic_min_days: int = 90
+    escalation_min_slope: float = 0.5  # Aumento mínimo do escore a cada 30 dias
+    enable_near_duplicates: bool = False  # Vincula textos quase idênticos; reaproveita detecções dos idênticos
+    near_duplicate_threshold: float = 0.9  # Jaccard estimado mínimo
+    near_duplicate_max_entries: int = 50000
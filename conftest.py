@@ -0,0 +1,25 @@
+import pytest
+
+from src.models import AnalysisResult, PatientIdentifier, TextContent, ViolencePatterns
+
+@pytest.fixture
+def make_result():
+    """Monta um AnalysisResult bem-sucedido a partir do texto e das detecções; `fields` substitui campos"""
+    def make(name="doc", text="texto", detections=(), **fields):
+        detections = list(detections)
+        category_scores, category_counts = {}, {}
+        for detection in detections:
+            category_scores[detection.category] = category_scores.get(detection.category, 0.0) + detection.adjusted_weight
+            category_counts[detection.category] = category_counts.get(detection.category, 0) + 1
+        total_score = sum(category_scores.values())
+        values = dict(
+            patient_id=PatientIdentifier("p1", f"hash-{name}", f"{name}.pdf"),
+            text_content=TextContent(text, 1, "fitz", "boa", len(text), len(text.split())),
+            total_score=total_score, base_score=total_score, contextual_bonus=0.0, severity_level="BAIXO",
+            detections=detections, violence_patterns=ViolencePatterns(),
+            category_scores=category_scores, category_counts=category_counts, context_phrases=[],
+            processing_time_ms=3, status="sucesso",
+        )
+        values.update(fields)
+        return AnalysisResult(**values)
+    return make
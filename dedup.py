@@ -0,0 +1,123 @@
+"""
+Índice de quase-duplicatas (MinHash sobre shingles de palavras, com LSH em bandas).
+
+Evoluções copiadas e coladas entre notas diárias geram textos quase idênticos.
+O índice encontra, entre os documentos já analisados, o mais parecido cuja
+similaridade de Jaccard estimada passa do limiar; quem usa o índice decide o
+que fazer com ele (o analisador só reaproveita detecções quando o texto
+normalizado é idêntico, e nos demais casos analisa de novo e registra o vínculo).
+
+A assinatura usa uma única função de hash por shingle ("one permutation
+hashing"): cada shingle cai em um de `num_bins` compartimentos e cada
+compartimento guarda o menor hash visto, o que mantém o custo em O(palavras).
+"""
+
+from hashlib import blake2b
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+Signature = Tuple[int, ...]
+T = TypeVar("T")
+
+_EMPTY = (1 << 64) - 1  # Compartimento sem nenhum shingle
+
+def minhash_signature(text: str, num_bins: int = 64, shingle_size: int = 5) -> Signature:
+    """Assinatura do texto (já normalizado) a partir de shingles de `shingle_size` palavras"""
+    words = text.split()
+    if len(words) < shingle_size:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+    bins = [_EMPTY] * num_bins
+    for shingle in shingles:
+        value = int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        index = value % num_bins
+        if value < bins[index]:
+            bins[index] = value
+    return tuple(bins)
+
+def estimate_similarity(a: Signature, b: Signature) -> float:
+    """Jaccard estimado: fração dos compartimentos não vazios em que as assinaturas coincidem"""
+    filled = equal = 0
+    for x, y in zip(a, b):
+        if x == _EMPTY and y == _EMPTY:
+            continue
+        filled += 1
+        equal += x == y
+    return equal / filled if filled else 0.0
+
+class NearDuplicateIndex(Generic[T]):
+    """
+    Assinaturas de documentos já analisados com um valor associado a cada um.
+
+    As assinaturas são divididas em `bands` bandas; documentos que coincidem em
+    alguma banda viram candidatos e a similaridade estimada decide o reaproveitamento.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_bins: int = 64, bands: int = 16,
+                 shingle_size: int = 5, max_entries: Optional[int] = None):
+        if num_bins % bands:
+            raise ValueError("num_bins deve ser múltiplo de bands")
+        self.threshold = threshold
+        self.num_bins = num_bins
+        self.bands = bands
+        self.rows = num_bins // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.signatures: Dict[str, Signature] = {}
+        self.values: Dict[str, T] = {}
+        self._buckets: List[Dict[Signature, List[str]]] = [{} for _ in range(bands)]
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def signature(self, text: str) -> Signature:
+        return minhash_signature(text, self.num_bins, self.shingle_size)
+
+    def _band_keys(self, signature: Signature):
+        for band in range(self.bands):
+            key = signature[band * self.rows:(band + 1) * self.rows]
+            if any(value != _EMPTY for value in key):
+                yield band, key
+
+    def query(self, signature: Signature) -> Optional[Tuple[str, float]]:
+        """Documento já indexado mais parecido, se a similaridade atingir o limiar"""
+        best: Optional[Tuple[str, float]] = None
+        seen = set()
+        for band, key in self._band_keys(signature):
+            for candidate in self._buckets[band].get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = estimate_similarity(signature, self.signatures[candidate])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (candidate, similarity)
+        if best is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best
+
+    def add(self, key: str, signature: Signature, value: T):
+        if key in self.signatures:
+            return
+        if self.max_entries is not None and len(self.signatures) >= self.max_entries:
+            self._remove(next(iter(self.signatures)))  # Descarta o mais antigo
+        self.signatures[key] = signature
+        self.values[key] = value
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def _remove(self, key: str):
+        signature = self.signatures.pop(key)
+        self.values.pop(key, None)
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band][band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def get(self, key: str) -> Optional[T]:
+        return self.values.get(key)
@@ -2,21 +2,69 @@
 Detector de violência em textos médicos usando léxico hierárquico.
 """
 
+from itertools import islice
+from multiprocessing import Pool
+
+from .artifact import load_artifact
 from .lexicon import get_lexicon
+from .matcher import PatternCue, TermMatcher
+
+_worker_detector = None
+
+def _init_worker(artifact_path=None):
+    """Compila (ou carrega do artefato) o léxico uma única vez em cada processo do pool"""
+    global _worker_detector
+    _worker_detector = ViolenceDetector(artifact_path)
+
+def _analyze_document(document):
+    doc_id, text = document
+    return doc_id, _worker_detector.analyze(text)
 
 class ViolenceDetector:
-    def __init__(self):
-        self.lexicon = get_lexicon()
-    
+    def __init__(self, artifact_path=None):
+        self.artifact_path = artifact_path
+        if artifact_path is None:
+            self.lexicon = get_lexicon()
+            self.matcher = TermMatcher.from_lexicon(self.lexicon)
+        else:
+            artifact = load_artifact(artifact_path)
+            self.lexicon = artifact.lexicon
+            self.matcher = artifact.matcher
+
     def analyze(self, text):
-        text_lower = text.lower()
         results = []
-        for category, info in self.lexicon.items():
-            for term in info["terms"]:
-                if term.lower() in text_lower:
-                    results.append({
-                        "term": term,
-                        "category": category,
-                        "weight": info["weight"]
-                    })
-        return results
\ No newline at end of file
+        for match in self.matcher.find_all(text):
+            for payload in match.payload:
+                if isinstance(payload, PatternCue):
+                    continue  # Artefato do léxico expandido, com indicadores no mesmo autômato
+                term, category, weight = payload
+                results.append({
+                    "term": term,
+                    "category": category,
+                    "weight": weight,
+                    "start": match.start,
+                    "end": match.end
+                })
+        return results
+
+    def analyze_many(self, documents, workers=0, chunksize=32):
+        """
+        Analisa um iterável de (doc_id, texto) produzindo (doc_id, resultados) sob demanda.
+
+        Com workers > 1 os documentos são distribuídos entre processos, consumindo a
+        entrada em janelas limitadas e preservando a ordem original.
+        """
+        if workers <= 1:
+            analyze = self.analyze
+            for doc_id, text in documents:
+                yield doc_id, analyze(text)
+            return
+
+        documents = iter(documents)
+        window_size = workers * chunksize * 4
+        with Pool(workers, initializer=_init_worker, initargs=(self.artifact_path,)) as pool:
+            while True:
+                window = list(islice(documents, window_size))
+                if not window:
+                    break
+                yield from pool.imap(_analyze_document, window, chunksize)
@@ -0,0 +1,613 @@
+"""
+Léxico expandido do motor completo: termos, negação, intensidade contextual e padrões.
+"""
+
+import json
+import re
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .artifact import load_or_build
+from .config import ProcessingConfig
+from .lexicon import load_lexicon_json
+from .matcher import PatternCue, TermMatcher
+from .models import StageMetrics, ViolenceDetection, ViolencePatterns
+from .normalize import NormalizedText, ensure_normalized, fold_text
+from .utils import hash_text
+
+# Alcance (em caracteres do texto normalizado) das regras contextuais em torno de cada detecção
+CONTEXT_WINDOW_CHARS = 200
+
+# Acréscimo ao multiplicador de intensidade por família de regra contextual
+CONTEXT_BONUS = {"intensifying_contexts": 0.5, "medical_severity": 0.7}
+
+class NegationIndex(NamedTuple):
+    cue_starts: List[int]
+    min_scope_ends: List[int]
+    cue_matches: int = 0  # Ocorrências das pistas avaliadas (com ou sem alcance)
+
+class ContextRule(NamedTuple):
+    """Sequência de grupos de termos; cada grupo começa até gaps[i] caracteres após o anterior"""
+    name: str
+    family: str
+    groups: Tuple[Tuple[str, ...], ...]
+    gaps: Tuple[int, ...]
+
+class ContextIndex(NamedTuple):
+    """Ocorrências de cada regra no documento: inícios ordenados e o menor fim a partir de cada um"""
+    starts: List[List[int]]
+    min_ends: List[List[int]]
+
+class DocumentScan(NamedTuple):
+    hits: List[Tuple[str, str, int, int]]
+    flags: Set[str]
+    context_index: ContextIndex
+
+class ExpandedViolenceLexicon:
+    """Base lexical expandida com 1500+ termos para detecção de violência médica"""
+
+    def __init__(self, lexicon_path: Optional[str] = None, artifact_path: Optional[str] = None,
+                 compile_matcher: bool = True):
+        """
+        Carrega as definições e compila o autômato (ou o carrega do artefato). Com
+        compile_matcher=False, só as definições e a versão ficam disponíveis, sem o custo
+        da compilação (ex.: para gravar o artefato ou consultar a versão).
+        """
+        if lexicon_path:
+            self.categories = load_lexicon_json(lexicon_path)
+        else:
+            self.categories = self._load_expanded_violence_lexicon()
+        self.negation_patterns = self._compile_negation_patterns()
+        self.negation_scope = re.compile(
+            r'[\s\w]{0,80}?\b(?:viol|agred|espanc|machuc|bat|surr|ameac|mal.?trat)'
+        )
+        self.pattern_indicators = self._load_pattern_indicators()
+        self.context_rules = self._compile_contextual_patterns()
+        self.version = self._compute_version()
+        self.matcher: Optional[TermMatcher] = None
+        if compile_matcher:
+            self._compile_all_patterns(artifact_path)
+
+    @classmethod
+    def from_config(cls, config: ProcessingConfig, compile_matcher: bool = True) -> 'ExpandedViolenceLexicon':
+        return cls(config.lexicon_path, config.lexicon_artifact_path, compile_matcher)
+
+    @classmethod
+    def version_for(cls, config: ProcessingConfig) -> str:
+        """Versão do motor configurado (a mesma dos resultados e do artefato), sem compilar o autômato"""
+        return cls.from_config(config, compile_matcher=False).version
+
+    def _load_expanded_violence_lexicon(self) -> Dict[str, Dict[str, Any]]:
+        """Carrega base lexical expandida com categorias especializadas"""
+        return {
+            "medical_formal": {
+                "weight": 2.8,
+                "terms": [
+                    "trauma contundente", "trauma por força contusa", "lesão contundente",
+                    "trauma cranioencefálico", "TCE", "traumatismo craniano", "trauma facial",
+                    "trauma cervical", "trauma torácico", "trauma abdominal", "politraumatismo",
+                    "hematoma subdural", "hematoma epidural", "hematoma intracraniano",
+                    "hematoma retroauricular", "hematoma periorbitário", "hematoma occipital",
+                    "equimose periorbital", "hematoma periorbital", "olho roxo", "olho negro",
+                    "equimoses múltiplas", "equimoses em diferentes estágios", "equimoses bilaterais",
+                    "laceração cutânea", "laceração facial", "laceração profunda",
+                    "laceração do couro cabeludo", "laceração labial", "laceração genital",
+                    "ferimento corto-contuso", "ferimento inciso", "ferimento perfurante",
+                    "ferimento por arma de fogo", "ferimento por arma branca", "lesão por projétil",
+                    "fratura de mandíbula", "fratura maxilar", "fratura facial", "fratura nasal",
+                    "fratura de órbita", "fratura zigomática", "fratura do arco zigomático",
+                    "fratura de costela", "fraturas múltiplas", "fratura espiral",
+                    "queimadura intencional", "queimadura por cigarro", "queimadura circunscrita",
+                    "queimadura por líquido quente", "queimadura por ferro", "queimadura em luva",
+                    "escoriações múltiplas", "escoriações lineares", "escoriações ungueais",
+                    "marcas de mordida humana", "marcas de dedos", "marcas de mão",
+                    "marcas de corda", "marcas de estrangulamento", "marcas de amarração",
+                    "petéquias no pescoço", "equimoses cervicais", "sulco de enforcamento",
+                    "lesões de defesa", "ferimentos defensivos", "trauma não acidental",
+                    "violência sexual", "estupro", "abuso sexual", "trauma genital",
+                    "laceração vaginal", "laceração anal", "lesão himenal", "hematoma genital",
+                    "negligência grave", "desnutrição proteico-calórica", "abandono de incapaz",
+                    "desidratação severa", "má higiene corporal", "lesões por decúbito",
+                    "transtorno de estresse pós-traumático", "TEPT", "depressão reativa",
+                    "ansiedade pós-traumática", "dissociação", "flashbacks",
+                    "ideação suicida", "tentativa de suicídio", "automutilação", "autoextermínio",
+                    "comportamento autodestrutivo", "tentativa de autolesão",
+                    "síndrome do bebê sacudido", "trauma craniano não acidental",
+                    "hemorragia retiniana", "hematoma subdural em criança"
+                ]
+            },
+            "legal_police": {
+                "weight": 2.5,
+                "terms": [
+                    "agressão física", "agressão corporal", "violência física",
+                    "lesão corporal", "lesão corporal leve", "lesão corporal grave",
+                    "lesão corporal gravíssima", "vias de fato", "violência doméstica",
+                    "ameaça", "ameaça de morte", "intimidação", "ameaça grave",
+                    "ameaça com arma", "ameaça de espancamento", "intimidação psicológica",
+                    "chantagem", "extorsão", "coação", "constrangimento ilegal",
+                    "cárcere privado", "sequestro", "sequestro relâmpago",
+                    "privação de liberdade", "confinamento forçado", "aprisionamento",
+                    "estupro", "estupro de vulnerável", "atentado violento ao pudor",
+                    "assédio sexual", "abuso sexual", "exploração sexual",
+                    "violência sexual", "estupro conjugal", "sexo forçado",
+                    "homicídio", "tentativa de homicídio", "feminicídio",
+                    "tentativa de feminicídio", "latrocínio", "assassinato",
+                    "arma branca", "arma de fogo", "objeto contundente",
+                    "faca", "revólver", "pistola", "martelo",
+                    "bastão", "cassetete", "pedra", "tijolo",
+                    "espancamento", "surra", "paulada", "facada", "tiro",
+                    "enforcamento", "estrangulamento", "sufocamento", "asfixia",
+                    "boletim de ocorrência", "B.O.", "inquérito policial",
+                    "termo circunstanciado", "flagrante delito", "prisão em flagrante",
+                    "medida protetiva de urgência", "ordem de proteção",
+                    "exame de corpo de delito", "laudo pericial", "perícia criminal"
+                ]
+            },
+            "maria_penha_domestic": {
+                "weight": 2.3,
+                "terms": [
+                    "violência doméstica", "violência intrafamiliar", "violência conjugal",
+                    "violência de gênero", "violência contra mulher", "maus-tratos domésticos",
+                    "violência no lar", "agressão doméstica", "abuso doméstico",
+                    "feminicídio", "tentativa de feminicídio", "crime passional",
+                    "ciclo da violência", "ciclo de abuso", "escalada da violência",
+                    "violência repetitiva", "padrão de agressão", "histórico de violência",
+                    "relacionamento abusivo", "namoro violento", "parceiro abusivo",
+                    "companheiro violento", "marido agressor", "ex-parceiro violento",
+                    "violência física doméstica", "violência psicológica", "violência moral",
+                    "violência sexual conjugal", "violência patrimonial", "violência econômica",
+                    "controle coercitivo", "dominação psicológica", "ciúmes patológicos",
+                    "possessividade excessiva", "controle obsessivo", "comportamento controlador",
+                    "isolamento social forçado", "proibição de trabalhar", "proibição de sair",
+                    "proibição de estudar", "afastamento da família", "isolamento de amigos",
+                    "monitoramento digital", "controle de celular", "cyberstalking",
+                    "violência virtual", "stalking digital", "perseguição online",
+                    "humilhação constante", "gaslighting", "chantagem emocional",
+                    "manipulação psicológica", "terrorismo psicológico", "tortura psicológica",
+                    "destruição de objetos pessoais", "controle financeiro absoluto",
+                    "privação de recursos", "destruição de documentos", "delegacia da mulher",
+                    "casa abrigo", "medidas protetivas", "centro de referência"
+                ]
+            },
+            "healthcare_nursing": {
+                "weight": 2.0,
+                "terms": [
+                    "paciente relata violência", "usuário informa agressão", "refere maus-tratos",
+                    "história de violência", "episódios de violência", "relato de agressão",
+                    "menciona espancamento", "conta sobre agressão", "narra violência",
+                    "história pregressa de violência", "episódios anteriores de violência",
+                    "antecedentes de maus-tratos", "histórico de agressões",
+                    "violência recorrente", "agressões repetidas", "maus-tratos crônicos",
+                    "sinais evidentes de violência", "indícios de maus-tratos",
+                    "suspeita de violência doméstica", "lesões compatíveis com agressão",
+                    "ferimentos sugestivos", "padrão de lesões", "lesões não acidentais",
+                    "hematomas múltiplos", "equimoses generalizadas", "roxos pelo corpo",
+                    "marcas visíveis", "ferimentos em cicatrização", "lesões recentes",
+                    "queimaduras circunscritas", "marca de cigarro", "queimadura suspeita",
+                    "escoriações lineares", "arranhões defensivos", "marcas de unhas",
+                    "dinâmica familiar conturbada", "relacionamento conjugal conflituoso",
+                    "ambiente familiar violento", "tensão familiar evidente",
+                    "filhos presenciam violência", "crianças traumatizadas",
+                    "menores expostos à violência", "impacto psicológico nas crianças",
+                    "comportamento de submissão", "evita contato visual", "hipervigilância",
+                    "medo excessivo", "ansiedade extrema", "comportamento evasivo",
+                    "tremores generalizados", "sudorese profusa", "taquicardia",
+                    "notificação compulsória", "ficha de notificação de violência",
+                    "comunicação ao conselho tutelar", "relatório de suspeita"
+                ]
+            },
+            "colloquial_popular": {
+                "weight": 1.8,
+                "terms": [
+                    "surra", "porrada", "pancada", "sova", "cacetada", "paulada",
+                    "bordoada", "tapão", "sopapo", "bicuda", "coice", "pescoção",
+                    "soco", "murro", "tapa", "bofetada", "cascudo", "chute", "pontapé",
+                    "joelhada", "cabeçada", "cotovelada", "pisão", "empurrão", "beliscão",
+                    "bateu na mulher", "agrediu a esposa", "espancou a companheira",
+                    "deu uma surra", "quebrou na porrada", "meteu a mão",
+                    "me bateu", "apanhei dele", "levei surra", "me deu porrada",
+                    "me agrediu", "me espancou", "bateu em mim", "me machucou",
+                    "ameaçou me matar", "disse que me mata", "prometeu me acabar",
+                    "falou que ia me quebrar", "ameaçou me dar uma surra",
+                    "muito ciumento", "não deixa sair", "controla tudo", "mexe no celular",
+                    "não deixa trabalhar", "vigia sempre", "segue para todo lado",
+                    "me forçou", "me obrigou", "não aceitou não", "forçou a barra",
+                    "briga de casal", "confusão em casa", "quebra-pau em casa",
+                    "barraco em casa", "discussão feia", "briga violenta",
+                    "bebe e fica violento", "viciado agressivo", "noiado violento",
+                    "tacou objeto", "jogou coisa", "atirou na parede",
+                    "ficou todo roxo", "marcou o rosto", "deixou marca"
+                ]
+            },
+            "orthographic_variations": {
+                "weight": 1.5,
+                "terms": [
+                    # Variações só de acento/caixa são cobertas pela normalização do texto
+                    "agressão", "agreção", "agresão", "agrediu", "agridiu",
+                    "agredindo", "agridindo", "agressor", "agresor", "agressivo", "agresivo",
+                    "violência", "violensia", "violensa", "violento",
+                    "espancamento", "spancamento", "espancou", "espankou", "espancada",
+                    "machucou", "machukou", "machucu", "machucado", "machucada",
+                    "bateu", "batu", "batendo", "bateno", "bater", "batê",
+                    "ameaçou", "ameaço", "ameaçando", "ameaçano", "ameaça", "ameasa",
+                    "judiou", "judiô", "judiar", "judiá", "maltratou", "maltrató"
+                ]
+            },
+            "psychological_abuse": {
+                "weight": 1.9,
+                "terms": [
+                    "manipulação psicológica", "chantagem emocional", "gaslighting",
+                    "lavagem cerebral", "distorção da realidade", "confusão mental induzida",
+                    "humilhação constante", "desmoralização", "diminuição sistemática",
+                    "isolamento social", "afastamento forçado", "separação de familiares",
+                    "controle mental", "dominação psicológica", "subjugação emocional"
+                ]
+            },
+            "child_specific": {
+                "weight": 2.7,
+                "terms": [
+                    "maus-tratos infantis", "abuso infantil", "negligência infantil",
+                    "violência contra criança", "agressão a menor", "maltrato infantil",
+                    "síndrome do bebê sacudido", "trauma craniano não acidental em criança",
+                    "lesões não acidentais em menor", "negligência de cuidados básicos",
+                    "privação de alimentos", "falta de higiene", "abandono de incapaz"
+                ]
+            }
+        }
+
+    def _compile_negation_patterns(self) -> List[re.Pattern]:
+        """Compila as pistas de negação expandidas (sobre texto normalizado)"""
+        negation_terms = [
+            "não", "nao", "jamais", "nunca", "nega", "negou", "descarta",
+            "afasta", "exclui", "ausente", "sem", "inexistente", "improvável",
+            "sem evidências", "sem indícios", "sem sinais", "descartado"
+        ]
+
+        return [
+            re.compile(rf'\b{re.escape(term)}\b')
+            for term in dict.fromkeys(fold_text(term) for term in negation_terms)
+        ]
+
+    def _load_pattern_indicators(self) -> Dict[str, Dict[str, Any]]:
+        """Indicadores de cada campo de ViolencePatterns e o peso somado ao escore do documento"""
+        return {
+            "chronic_violence": {
+                "weight": 1.2,
+                "terms": [
+                    "sempre", "todo dia", "todos os dias", "constantemente", "rotina", "frequentemente",
+                    "há anos", "por anos", "durante anos", "há vários anos"
+                ]
+            },
+            "weapons_involved": {
+                "weight": 1.8,
+                "terms": [
+                    "faca", "facas", "facada", "revólver", "pistola", "arma", "armas", "armado",
+                    "armada", "martelo", "martelada"
+                ]
+            },
+            "children_present": {
+                "weight": 1.5,
+                "terms": [
+                    "na frente das crianças", "na frente dos filhos", "na frente do filho",
+                    "na frente da filha", "criança viu", "filho assistiu", "filha assistiu",
+                    "filhos presenciaram"
+                ]
+            },
+            "pregnancy_violence": {
+                "weight": 2.2,
+                "terms": ["grávida", "gestante", "gestantes", "chutou barriga", "chutou a barriga"]
+            },
+            "sexual_violence": {
+                "weight": 2.5,
+                "terms": [
+                    "estupro", "estuprada", "estuprou", "abuso sexual", "violência sexual",
+                    "forçou", "obrigou"
+                ]
+            },
+            "death_threats": {
+                "weight": 2.0,
+                "terms": [
+                    "vou te matar", "vai morrer", "ameaçou de morte", "ameaça de morte",
+                    "ameaçou matar", "te mato"
+                ]
+            },
+            "escalation_pattern": {
+                "weight": 1.6,
+                "terms": [
+                    "cada vez pior", "cada vez mais violento", "cada vez mais agressivo",
+                    "cada vez mais frequentes", "escalada da violência", "agressões mais frequentes",
+                    "agressões mais graves", "piora das agressões", "ficando mais violento"
+                ]
+            },
+            "multiple_injuries": {
+                "weight": 1.4,
+                "terms": [
+                    "lesões múltiplas", "múltiplas lesões", "várias lesões", "diversas lesões",
+                    "equimoses múltiplas", "múltiplas equimoses", "escoriações múltiplas",
+                    "fraturas múltiplas", "politraumatismo", "politraumatizada", "politraumatizado",
+                    "equimoses em diferentes estágios", "lesões em diferentes estágios"
+                ]
+            },
+            "psychological_control": {
+                "weight": 1.5,
+                "terms": [
+                    "não deixa sair", "não a deixa sair", "proíbe de sair", "proibida de sair",
+                    "proíbe de ver", "controla o celular", "controla as roupas", "isolamento social",
+                    "afastamento forçado", "ciúme excessivo", "ciúmes excessivos", "controle mental",
+                    "humilhação constante"
+                ]
+            },
+            "economic_abuse": {
+                "weight": 1.3,
+                "terms": [
+                    "controla o dinheiro", "controle financeiro", "dependência financeira",
+                    "violência patrimonial", "retém documentos", "reteve os documentos",
+                    "destruiu os documentos", "tomou o salário", "toma o salário", "pegou o cartão",
+                    "proíbe de trabalhar", "proibida de trabalhar", "não deixa trabalhar"
+                ]
+            }
+        }
+
+    def _compile_contextual_patterns(self) -> List[ContextRule]:
+        """Regras contextuais expandidas; termos com "*" casam como prefixo (ex.: "agred*")"""
+        aggression = ("agred*", "bat*", "violent*")
+        return [
+            ContextRule("habitual", "intensifying_contexts",
+                        (("sempre", "todo dia", "tododia", "constantemente", "frequentemente", "diariamente",
+                          "rotineiramente"), aggression + ("maltrat*",)), (50,)),
+            ContextRule("criancas", "intensifying_contexts",
+                        (("na frente", "nafrente", "presença", "vista"),
+                         ("criança", "crianças", "filho", "filhos", "menor", "menores"), aggression), (30, 50)),
+            ContextRule("gestacao", "intensifying_contexts",
+                        (("grávida", "gestante", "gestação"), aggression + ("chut*", "espanc*")), (50,)),
+            ContextRule("arma", "intensifying_contexts",
+                        (("com", "usando", "ameaçou com", "ameaçoucom", "empunhando"),
+                         ("faca", "revólver", "pistola", "arma", "martelo")), (30,)),
+            ContextRule("lesao_grave", "medical_severity",
+                        (("fratura", "sangramento", "hemorragia", "trauma"), aggression), (30,)),
+            ContextRule("procedimento", "medical_severity",
+                        (("cirurgia", "sutura", "pontos"), aggression), (50,)),
+        ]
+
+    def pattern_cues(self) -> List[Tuple[str, PatternCue]]:
+        """Indicadores e grupos das regras contextuais, compilados no mesmo autômato do léxico"""
+        cues = [
+            (term, PatternCue("flag", flag))
+            for flag, info in self.pattern_indicators.items()
+            for term in info["terms"]
+        ]
+        cues += [
+            (term, PatternCue("context", rule.name, position))
+            for rule in self.context_rules
+            for position, group in enumerate(rule.groups)
+            for term in group
+        ]
+        return cues
+
+    def _compute_version(self) -> str:
+        """
+        Hash curto do léxico e dos padrões, para rastrear quais resultados ele produziu;
+        é também a versão registrada no artefato compilado
+        """
+        definition = {
+            'categories': self.categories,
+            'negation': [pattern.pattern for pattern in self.negation_patterns] + [self.negation_scope.pattern],
+            'indicators': self.pattern_indicators,
+            'contextual': [list(rule) for rule in self.context_rules]
+        }
+        return hash_text(json.dumps(definition, sort_keys=True, ensure_ascii=False))[:12]
+
+    def _compile_all_patterns(self, artifact_path: Optional[str] = None):
+        """Compila todas as categorias em um único autômato multipadrão (ou o carrega do artefato)"""
+        if artifact_path is None:
+            self.matcher = TermMatcher.from_lexicon(self.categories, self.pattern_cues())
+        else:
+            self.matcher = load_or_build(self.categories, artifact_path, self.pattern_cues(), self.version).matcher
+
+    def _scan(self, buffer: str) -> DocumentScan:
+        """
+        Varredura única do texto normalizado: ocorrências do léxico (termo, categoria, início, fim),
+        indicadores de padrão presentes e o índice de ocorrências das regras contextuais.
+        """
+        hits = []
+        last_end: Dict[str, int] = {}
+        flags: Set[str] = set()
+        occurrences = {rule.name: [[] for _ in rule.groups] for rule in self.context_rules}
+
+        # Ocorrências vêm ordenadas por início e, no mesmo início, da mais longa para a mais curta
+        for match in self.matcher.find_all_normalized(buffer):
+            for payload in match.payload:
+                if isinstance(payload, PatternCue):
+                    if payload.kind == "flag":
+                        flags.add(payload.name)
+                    else:
+                        occurrences[payload.name][payload.group].append((match.start, match.end))
+                    continue
+                term, category, _ = payload
+                if match.start < last_end.get(category, 0):
+                    continue  # Contida em ocorrência mais longa da mesma categoria
+                last_end[category] = match.end
+                hits.append((term, category, match.start, match.end))
+
+        return DocumentScan(hits, flags, self._build_context_index(occurrences))
+
+    def _scan_terms(self, buffer: str) -> List[Tuple[str, str, int, int]]:
+        """Ocorrências do léxico no texto normalizado: (termo, categoria, início, fim)"""
+        return self._scan(buffer).hits
+
+    def _build_context_index(self, occurrences: Dict[str, List[List[Tuple[int, int]]]]) -> ContextIndex:
+        """Ocorrências completas de cada regra (início do primeiro grupo, menor fim possível do último)"""
+        all_starts, all_min_ends = [], []
+        for rule in self.context_rules:
+            groups = occurrences[rule.name]
+
+            # Do último grupo para o primeiro: menor fim alcançável a partir de cada ocorrência
+            best_ends: List[Optional[int]] = [end for _, end in groups[-1]]
+            for position in range(len(groups) - 2, -1, -1):
+                following_starts = [start for start, _ in groups[position + 1]]
+                gap = rule.gaps[position]
+                current = []
+                for _, end in groups[position]:
+                    first = bisect_left(following_starts, end)
+                    last = bisect_right(following_starts, end + gap)
+                    current.append(min((e for e in best_ends[first:last] if e is not None), default=None))
+                best_ends = current
+
+            spans = sorted(
+                (start, end) for (start, _), end in zip(groups[0], best_ends) if end is not None
+            )
+            min_ends = [end for _, end in spans]
+            for i in range(len(min_ends) - 2, -1, -1):
+                min_ends[i] = min(min_ends[i], min_ends[i + 1])
+            all_starts.append([start for start, _ in spans])
+            all_min_ends.append(min_ends)
+
+        return ContextIndex(starts=all_starts, min_ends=all_min_ends)
+
+    def find_term_matches(self, text: Union[str, NormalizedText]) -> List[Tuple[str, str, int, int]]:
+        """Ocorrências de todas as categorias com posições do texto original"""
+        normalized = ensure_normalized(text)
+        return [
+            (term, category, *normalized.to_original(start, end))
+            for term, category, start, end in self._scan_terms(normalized.text)
+        ]
+
+    def find_detections(self, text: Union[str, NormalizedText], context_chars: int = 150,
+                        negated_terms: Optional[List[Tuple[str, str]]] = None,
+                        metrics: Optional[StageMetrics] = None,
+                        patterns: Optional[ViolencePatterns] = None) -> List[ViolenceDetection]:
+        """
+        Gera as detecções do documento, recortando o contexto apenas das ocorrências mantidas.
+        Se negated_terms for informado, recebe (termo, categoria) das ocorrências negadas;
+        se patterns for informado, recebe os indicadores da mesma varredura;
+        se metrics for informado, recebe os tempos de termos, negação, contexto e padrões.
+        """
+        normalized = ensure_normalized(text)
+        buffer = normalized.text
+        detections = []
+        clock = time.perf_counter
+
+        started = clock()
+        scan = self._scan(buffer)
+        hits = scan.hits
+        scan_seconds = clock() - started
+
+        started = clock()
+        negation_index = self.build_negation_index(buffer)
+        negation_seconds = clock() - started
+        context_seconds = 0.0
+        negated = 0
+
+        for term, category, start, end in hits:
+            started = clock()
+            is_negated = self.detect_negation_context(buffer, start, end, negation_index)
+            negation_seconds += clock() - started
+            if is_negated:
+                negated += 1
+                if negated_terms is not None:
+                    negated_terms.append((term, category))
+                continue
+
+            original_start, original_end = normalized.to_original(start, end)
+            weight = self.categories[category]['weight']
+            detection = ViolenceDetection(
+                term=term,
+                category=category,
+                base_weight=weight,
+                adjusted_weight=weight,
+                context_phrase=normalized.original[
+                    max(0, original_start - context_chars):original_end + context_chars
+                ].strip(),
+                position_start=original_start,
+                position_end=original_end
+            )
+            started = clock()
+            detection.intensity_multiplier = self.context_intensity(
+                scan.context_index, max(0, start - CONTEXT_WINDOW_CHARS), end + CONTEXT_WINDOW_CHARS
+            )
+            context_seconds += clock() - started
+            detection.adjusted_weight = weight * detection.intensity_multiplier
+            detections.append(detection)
+
+        started = clock()
+        if patterns is not None:
+            self._apply_pattern_flags(patterns, scan.flags)
+        patterns_seconds = clock() - started
+
+        if metrics is not None:
+            metrics.add_time("terms", scan_seconds)
+            metrics.add_time("negation", negation_seconds)
+            metrics.add_time("context", context_seconds)
+            if patterns is not None:
+                metrics.add_time("patterns", patterns_seconds)
+            metrics.count("term_hits", len(hits))
+            metrics.count("negated_hits", negated)
+            metrics.count("negation_cues", len(negation_index.cue_starts))
+            metrics.count("context_spans", sum(len(starts) for starts in scan.context_index.starts))
+            metrics.count("negation_cue_matches", negation_index.cue_matches)
+        return detections
+
+    def build_negation_index(self, text: str) -> NegationIndex:
+        """Localiza uma única vez as pistas de negação do texto normalizado e o alcance de cada uma"""
+        cues = []
+        cue_matches = 0
+        for cue_pattern in self.negation_patterns:
+            for cue in cue_pattern.finditer(text):
+                cue_matches += 1
+                scope = self.negation_scope.match(text, cue.end())
+                if scope:
+                    cues.append((cue.start(), scope.end()))
+        cues.sort()
+
+        # Menor fim de alcance entre as pistas a partir de cada posição do índice
+        min_scope_ends = [scope_end for _, scope_end in cues]
+        for i in range(len(min_scope_ends) - 2, -1, -1):
+            min_scope_ends[i] = min(min_scope_ends[i], min_scope_ends[i + 1])
+
+        return NegationIndex(
+            cue_starts=[cue_start for cue_start, _ in cues],
+            min_scope_ends=min_scope_ends,
+            cue_matches=cue_matches
+        )
+
+    def detect_negation_context(self, text: str, match_start: int, match_end: int,
+                                negation_index: Optional[NegationIndex] = None) -> bool:
+        """Detecta contexto de negação nos 150 caracteres que antecedem a ocorrência"""
+        if negation_index is None:
+            negation_index = self.build_negation_index(text)
+
+        context_start = max(0, match_start - 150)
+        i = bisect_left(negation_index.cue_starts, context_start)
+        return i < len(negation_index.cue_starts) and negation_index.min_scope_ends[i] <= match_end
+
+    def context_intensity(self, context_index: ContextIndex, start: int, end: int) -> float:
+        """Multiplicador das regras com alguma ocorrência inteiramente em [start, end) do texto normalizado"""
+        intensity_multiplier = 1.0
+        for rule, starts, min_ends in zip(self.context_rules, context_index.starts, context_index.min_ends):
+            i = bisect_left(starts, start)
+            if i < len(starts) and min_ends[i] <= end:
+                intensity_multiplier += CONTEXT_BONUS[rule.family]
+        return max(0.1, min(5.0, intensity_multiplier))
+
+    def analyze_contextual_intensity(self, text: Union[str, NormalizedText], detection: ViolenceDetection,
+                                     context_index: Optional[ContextIndex] = None) -> float:
+        """Analisa intensidade contextual expandida (sem context_index, varre o documento inteiro)"""
+        normalized = ensure_normalized(text)
+        if context_index is None:
+            context_index = self._scan(normalized.text).context_index
+        start = max(0, normalized.to_normalized(detection.position_start) - CONTEXT_WINDOW_CHARS)
+        end = normalized.to_normalized(detection.position_end) + CONTEXT_WINDOW_CHARS
+        return self.context_intensity(context_index, start, end)
+
+    def _apply_pattern_flags(self, patterns: ViolencePatterns, flags: Set[str]):
+        for flag, info in self.pattern_indicators.items():
+            if flag in flags:
+                setattr(patterns, flag, True)
+                patterns.pattern_severity_score += info['weight']
+
+    def detect_violence_patterns(self, text: Union[str, NormalizedText]) -> ViolencePatterns:
+        """Detecta padrões específicos de violência expandidos (uma varredura do documento)"""
+        patterns = ViolencePatterns()
+        self._apply_pattern_flags(patterns, self._scan(ensure_normalized(text).text).flags)
+        return patterns
@@ -0,0 +1,622 @@
+"""
+Extração de texto de PDFs página a página (PyMuPDF, pdfplumber e OCR).
+
+As bibliotecas de PDF e OCR são importadas apenas na primeira extração, de
+modo que pontuar texto já extraído não paga o custo de carregá-las.
+"""
+
+import importlib
+import logging
+import os
+import re
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .cache import ExtractionCache
+from .config import DocumentType, ProcessingConfig, ProcessingStatus, QualityLevel
+from .models import DocumentMetadata, PageInfo, StageMetrics, TextContent
+from .utils import hash_bytes, hash_text
+
+_backends: Dict[str, Any] = {}
+
+def _load_backend(module_name: str) -> Any:
+    """Importa um backend opcional na primeira utilização (None se não estiver instalado)"""
+    if module_name not in _backends:
+        try:
+            _backends[module_name] = importlib.import_module(module_name)
+        except ImportError:
+            _backends[module_name] = None
+    return _backends[module_name]
+
+class ExtractionError(Exception):
+    """Falha de extração associada ao status de processamento correspondente"""
+
+    def __init__(self, message: str, status: ProcessingStatus = ProcessingStatus.PROCESSING_ERROR):
+        super().__init__(message)
+        self.status = status
+
+class _OcrJob(NamedTuple):
+    page_number: int
+    key: str
+    dpi: int
+    triage: Optional[Dict[str, Any]]  # Resultado da triagem, quando este é o reconhecimento em alta resolução
+    recognized: Future
+
+def _ink_ratio(page_image: Any) -> float:
+    """Fração de pixels escuros de uma página em tons de cinza (perto de zero: página em branco)"""
+    histogram = page_image.histogram()
+    return sum(histogram[:128]) / max(sum(histogram), 1)
+
+def _text_from_ocr_data(data: Dict[str, List[Any]]) -> Tuple[str, float]:
+    """
+    Texto e confiança média (0-100, ponderada pelo tamanho das palavras) a partir da
+    saída de pytesseract.image_to_data; parágrafos separados por linha em branco
+    """
+    paragraphs: List[List[List[str]]] = []  # Parágrafos -> linhas -> palavras
+    current_paragraph = current_line = None
+    weighted = characters = 0.0
+    for word, confidence, block, paragraph, line in zip(
+            data['text'], data['conf'], data['block_num'], data['par_num'], data['line_num']):
+        word = (word or "").strip()
+        confidence = float(confidence)
+        if not word or confidence < 0:
+            continue
+        if (block, paragraph) != current_paragraph:
+            paragraphs.append([])
+            current_paragraph, current_line = (block, paragraph), None
+        if line != current_line:
+            paragraphs[-1].append([])
+            current_line = line
+        paragraphs[-1][-1].append(word)
+        weighted += confidence * len(word)
+        characters += len(word)
+    text = "\n\n".join("\n".join(" ".join(words) for words in paragraph) for paragraph in paragraphs)
+    return text, (weighted / characters if characters else 0.0)
+
+_QUALITY_LEVELS = (QualityLevel.EXCELLENT, QualityLevel.GOOD, QualityLevel.FAIR, QualityLevel.POOR)
+
+def _quality_rank(value: float, thresholds: Tuple[float, float, float]) -> int:
+    """Posição em _QUALITY_LEVELS do primeiro limiar atingido (o último nível se nenhum for)"""
+    for rank, threshold in enumerate(thresholds):
+        if value >= threshold:
+            return rank
+    return len(thresholds)
+
+def _recognize_page(pytesseract: Any, page_image: Any, lang: str) -> Tuple[str, float]:
+    data = pytesseract.image_to_data(page_image, lang=lang, output_type=pytesseract.Output.DICT)
+    return _text_from_ocr_data(data)
+
+def text_content_to_dict(text_content: TextContent) -> Dict[str, Any]:
+    """Converte TextContent em dicionário serializável em JSON"""
+    return asdict(text_content)
+
+def text_content_from_dict(data: Dict[str, Any]) -> TextContent:
+    """Reconstrói TextContent a partir de text_content_to_dict"""
+    return TextContent(
+        text=data['text'],
+        page_count=data['page_count'],
+        extraction_method=data['extraction_method'],
+        quality_level=data['quality_level'],
+        char_count=data['char_count'],
+        word_count=data['word_count'],
+        metadata=data['metadata'],
+        pages_info=[PageInfo(**page) for page in data['pages_info']],
+        document_metadata=DocumentMetadata(**data['document_metadata']),
+        page_starts=data['page_starts']
+    )
+
+class DocumentClassifier:
+    """Classifica o tipo de documento pelas expressões do cabeçalho"""
+
+    def __init__(self):
+        self.type_patterns = {
+            DocumentType.EVOLUCAO_MEDICA: re.compile(r'evolu[çc][ãa]o\s+m[ée]dica', re.IGNORECASE),
+            DocumentType.ANOTACOES_ENFERMAGEM: re.compile(r'anota[çc][õo]es\s+d[ae]\s+enfermagem', re.IGNORECASE),
+            DocumentType.MULTIPROFISSIONAL: re.compile(r'multiprofissional', re.IGNORECASE),
+        }
+
+    def classify(self, text: str) -> DocumentType:
+        header = text[:2000]
+        for document_type, pattern in self.type_patterns.items():
+            if pattern.search(header):
+                return document_type
+        return DocumentType.OUTROS
+
+class DocumentMetadataExtractor:
+    """Extrai data, tipo, serviço e código do paciente do documento"""
+
+    def __init__(self):
+        self.classifier = DocumentClassifier()
+        self.date_pattern = re.compile(r'\b(\d{2}/\d{2}/\d{4})\b')
+        self.service_pattern = re.compile(r'(?:servi[çc]o|cl[íi]nica)\s*:\s*([^\n]{3,60})', re.IGNORECASE)
+        # RGHC, número do prontuário ou código do paciente no cabeçalho (ex.: "RGHC: 1234567-A")
+        self.patient_code_pattern = re.compile(
+            r'\b(?:RG\s*HC|prontu[áa]rio|c[óo]d(?:igo|\.)?\s+(?:do\s+)?paciente)\s*(?:n[º°o]?\.?\s*)?[:#]?\s*'
+            r'(\d[\dA-Z.\-/]{3,19})\b',
+            re.IGNORECASE
+        )
+
+    def extract_metadata(self, text: str, pages_info: List[PageInfo]) -> DocumentMetadata:
+        date_match = self.date_pattern.search(text)
+        service_match = self.service_pattern.search(text)
+        return DocumentMetadata(
+            document_date=date_match.group(1) if date_match else None,
+            document_type=self.classifier.classify(text).value,
+            service=service_match.group(1).strip() if service_match else None
+        )
+
+    def extract_patient_code(self, text: str) -> Optional[str]:
+        """Código do paciente sem pontuação, ou None se o documento não traz nenhum"""
+        match = self.patient_code_pattern.search(text)
+        return re.sub(r'[.\-/]', '', match.group(1)).upper() if match else None
+
+class EnhancedTextExtractor:
+    """Extrator de texto incrementado com informações de página e metadados"""
+
+    # Incrementar sempre que a extração mudar, invalidando o cache de extração
+    VERSION = "2.5"
+    OCR_LANGUAGE = "por"
+
+    def __init__(self, config: ProcessingConfig):
+        self.config = config
+        self.logger = logging.getLogger("EnhancedTextExtractor")
+        self.document_classifier = DocumentClassifier()
+        self.metadata_extractor = DocumentMetadataExtractor()
+        self.cache = None
+        self._methods: Optional[List[Tuple[str, Any]]] = None
+        self._page_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # OCR por chave da página
+        self._ocr_executor: Optional[ThreadPoolExecutor] = None
+        if config.extraction_cache_dir:
+            self.cache = ExtractionCache(config.extraction_cache_dir, config.extraction_cache_max_mb)
+
+    def extract_from_pdf(self, pdf_path: Path, metrics: Optional[StageMetrics] = None) -> TextContent:
+        """Extrai texto, reaproveitando o cache quando o mesmo PDF já foi extraído"""
+        metrics = metrics if metrics is not None else StageMetrics()
+
+        # Validar arquivo
+        self._validate_input_file(pdf_path)
+        metrics.count("bytes_read", pdf_path.stat().st_size)
+
+        if self.cache is None:
+            return self._extract_pages(pdf_path, metrics)
+
+        cache_key = ExtractionCache.make_key(pdf_path, self.VERSION, {
+            'ocr_threshold': self.config.ocr_threshold,
+            'min_text_quality_chars': self.config.min_text_quality_chars,
+            'ocr': [self.config.ocr_triage_dpi, self.config.ocr_dpi,
+                    self.config.ocr_min_confidence, self.config.ocr_blank_ink_ratio],
+            'methods': [method_name for method_name, _ in self._extraction_methods()]
+        })
+        with metrics.timed("cache"):
+            cached = self.cache.get(cache_key)
+        if cached is not None:
+            metrics.count("cache_hits")
+            self.logger.debug("Texto de %s recuperado do cache", pdf_path.name)
+            return text_content_from_dict(cached)
+        metrics.count("cache_misses")
+
+        text_content = self._extract_pages(pdf_path, metrics)
+        with metrics.timed("cache"):
+            self.cache.put(cache_key, text_content_to_dict(text_content))
+        return text_content
+
+    def _extraction_methods(self) -> List[Tuple[str, Any]]:
+        """Métodos disponíveis, do mais rápido para o mais lento; cada um recebe apenas as páginas pendentes"""
+        if self._methods is None:
+            self._methods = []
+            if _load_backend("fitz") is not None:
+                self._methods.append(("fitz", self._extract_with_fitz))
+            if _load_backend("pdfplumber") is not None:
+                self._methods.append(("pdfplumber", self._extract_with_pdfplumber))
+            if all(_load_backend(name) is not None for name in ("pytesseract", "pdf2image", "PIL.Image")):
+                self._methods.append(("ocr", self._extract_with_ocr))
+        return self._methods
+
+    def _extract_pages(self, pdf_path: Path, metrics: Optional[StageMetrics] = None) -> TextContent:
+        """Extrai texto página a página, recorrendo a métodos mais lentos só nas páginas sem texto"""
+        metrics = metrics if metrics is not None else StageMetrics()
+
+        extraction_methods = self._extraction_methods()
+        if not extraction_methods:
+            raise ExtractionError("Nenhuma biblioteca de PDF disponível")
+
+        pages: Dict[int, PageInfo] = {}
+        short_pages: Dict[int, PageInfo] = {}
+        pending: Optional[List[int]] = None  # None enquanto o número de páginas é desconhecido
+        page_count = 0
+        errors: Dict[str, str] = {}
+
+        for method_name, extract_method in extraction_methods:
+            try:
+                self.logger.debug("%s: %s em %s páginas", pdf_path.name, method_name,
+                                  'todas as' if pending is None else len(pending))
+                metrics.count(f"extraction_attempts_{method_name}")
+                with metrics.timed(f"extraction_{method_name}"):
+                    page_count, extracted_pages = extract_method(pdf_path, pending)
+            except Exception as e:
+                errors[method_name] = str(e)
+                metrics.count(f"extraction_failures_{method_name}")
+                self.logger.debug("%s: %s falhou: %s", pdf_path.name, method_name, e)
+                continue
+            metrics.count(f"pages_{method_name}", len(extracted_pages))
+            if method_name == "ocr":
+                for page_info in extracted_pages:
+                    page_metadata = page_info.page_metadata
+                    metrics.count("ocr_page_cache_hits", int(page_metadata['ocr_cached']))
+                    metrics.count("ocr_blank_pages", int(page_metadata['page_class'] == 'em_branco'))
+                    metrics.count("ocr_high_dpi_pages", int(
+                        not page_metadata['ocr_cached'] and page_metadata['ocr_dpi'] > self.config.ocr_triage_dpi
+                    ))
+
+            if pending is None:
+                pending = list(range(1, page_count + 1))
+
+            for page_info in extracted_pages:
+                page_text = page_info.page_text.strip()
+                if len(page_text) >= self.config.ocr_threshold:
+                    pages[page_info.page_number] = page_info
+                elif len(page_text) > 10:
+                    previous = short_pages.get(page_info.page_number)
+                    if previous is None or len(page_text) > len(previous.page_text.strip()):
+                        short_pages[page_info.page_number] = page_info
+
+            pending = [page_number for page_number in pending if page_number not in pages]
+            if not pending:
+                break
+
+        # Páginas curtas ficam com o melhor texto obtido entre os métodos tentados
+        for page_number in pending or []:
+            if page_number in short_pages:
+                pages[page_number] = short_pages[page_number]
+
+        if not pages and len(errors) == len(extraction_methods):
+            raise ExtractionError(
+                f"Não foi possível ler {pdf_path.name}: {errors}", ProcessingStatus.PDF_CORRUPTED
+            )
+
+        pages_info = [pages[page_number] for page_number in sorted(pages)]
+        text, page_starts = self._assemble_pages(pages_info)
+
+        if not self._is_sufficient_text(text):
+            status = ProcessingStatus.OCR_FAILED if 'ocr' in errors else ProcessingStatus.INSUFFICIENT_TEXT
+            raise ExtractionError(f"Texto insuficiente em {pdf_path.name}", status)
+
+        pages_by_method: Dict[str, List[int]] = defaultdict(list)
+        for page_info in pages_info:
+            pages_by_method[page_info.page_metadata['extraction_method']].append(page_info.page_number)
+        extraction_method = "+".join(
+            method_name for method_name, _ in extraction_methods if method_name in pages_by_method
+        )
+
+        metadata = {
+            "method": extraction_method,
+            "page_count": page_count,
+            "pages_processed": [page_info.page_number for page_info in pages_info],
+            "pages_by_method": dict(pages_by_method),
+            "method_errors": errors
+        }
+        ocr_confidence = self._ocr_confidence(pages_info)
+        if ocr_confidence is not None:
+            metadata["ocr_confidence"] = round(ocr_confidence, 1)
+
+        # Extrair metadados do documento
+        doc_metadata = self.metadata_extractor.extract_metadata(text, pages_info)
+
+        return TextContent(
+            text=text,
+            page_count=page_count,
+            extraction_method=extraction_method,
+            quality_level=self._assess_text_quality(text, ocr_confidence).value,
+            char_count=len(text),
+            word_count=len(text.split()),
+            metadata=metadata,
+            pages_info=pages_info,
+            document_metadata=doc_metadata,
+            page_starts=page_starts
+        )
+
+    def from_text(self, text: str) -> TextContent:
+        """TextContent de um texto já extraído (sem PDF), com os mesmos metadados do documento"""
+        text = self._clean_text(text)
+        return TextContent(
+            text=text,
+            page_count=1,
+            extraction_method="texto",
+            quality_level=self._assess_text_quality(text).value,
+            char_count=len(text),
+            word_count=len(text.split()),
+            document_metadata=self.metadata_extractor.extract_metadata(text, [])
+        )
+
+    def _assemble_pages(self, pages_info: List[PageInfo]) -> Tuple[str, List[int]]:
+        """Junta as páginas em um único buffer, registrando o intervalo de cada uma"""
+        parts = []
+        page_starts = []
+        position = 0
+
+        for page_info in pages_info:
+            ocr_flag = ' (OCR)' if page_info.page_metadata['extraction_method'] == 'ocr' else ''
+            header = f"\n--- PÁGINA {page_info.page_number}{ocr_flag} ---\n"
+            body = self._clean_text(page_info.page_text)
+
+            page_info.text_start = position + len(header)
+            page_info.text_end = page_info.text_start + len(body)
+            page_info.page_text = ""  # O texto da página passa a ser um recorte do buffer
+            page_starts.append(page_info.text_start)
+
+            parts.extend((header, body, "\n"))
+            position = page_info.text_end + 1
+
+        return "".join(parts), page_starts
+
+    def _validate_input_file(self, file_path: Path):
+        """Valida arquivo de entrada"""
+        if not file_path.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        file_size_mb = file_path.stat().st_size / (1024 * 1024)
+        if file_size_mb > self.config.max_file_size_mb:
+            raise ExtractionError(f"Arquivo muito grande: {file_size_mb:.2f}MB", ProcessingStatus.SECURITY_ERROR)
+
+        if file_path.suffix.lower() != '.pdf':
+            raise ExtractionError(f"Tipo de arquivo não suportado: {file_path.suffix}", ProcessingStatus.SECURITY_ERROR)
+
+    def _extract_with_fitz(self, pdf_path: Path,
+                           page_numbers: Optional[List[int]]) -> Tuple[int, List[PageInfo]]:
+        """Extração da camada de texto com PyMuPDF (método mais rápido)"""
+        pages_info = []
+
+        doc = _load_backend("fitz").open(pdf_path)
+        try:
+            page_count = len(doc)
+            for page_number in page_numbers or range(1, page_count + 1):
+                try:
+                    page = doc.load_page(page_number - 1)
+                    pages_info.append(PageInfo(
+                        page_number=page_number,
+                        page_text=page.get_text() or "",
+                        page_metadata={
+                            'extraction_method': 'fitz',
+                            'rect': tuple(page.rect),
+                            'rotation': page.rotation
+                        }
+                    ))
+                except Exception:
+                    continue
+        finally:
+            doc.close()
+
+        return page_count, pages_info
+
+    def _extract_with_pdfplumber(self, pdf_path: Path,
+                                 page_numbers: Optional[List[int]]) -> Tuple[int, List[PageInfo]]:
+        """Extração com pdfplumber apenas das páginas solicitadas"""
+        pages_info = []
+
+        with _load_backend("pdfplumber").open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+            for page_number in page_numbers or range(1, page_count + 1):
+                try:
+                    page = pdf.pages[page_number - 1]
+                    pages_info.append(PageInfo(
+                        page_number=page_number,
+                        page_text=page.extract_text() or "",
+                        page_metadata={
+                            'extraction_method': 'pdfplumber',
+                            'width': page.width,
+                            'height': page.height,
+                            'rotation': getattr(page, 'rotation', 0)
+                        }
+                    ))
+                except Exception:
+                    continue
+
+        return page_count, pages_info
+
+    def _extract_with_ocr(self, pdf_path: Path,
+                          page_numbers: Optional[List[int]]) -> Tuple[int, List[PageInfo]]:
+        """
+        OCR apenas das páginas sem camada de texto aproveitável, com triagem em baixa resolução.
+
+        Cada página é rasterizada em tons de cinza a ocr_triage_dpi: páginas sem tinta são
+        descartadas, as demais passam por um OCR rápido e só as de confiança abaixo de
+        ocr_min_confidence são refeitas a ocr_dpi. O tesseract roda no pool enquanto as
+        próximas páginas são rasterizadas; no máximo 2 × ocr_workers imagens ficam em memória.
+        """
+        pages_info = []
+        fitz = _load_backend("fitz")
+        pytesseract = _load_backend("pytesseract")
+        executor = self._ocr_pool()
+        window = 2 * max(1, self.config.ocr_workers)
+        in_flight: "deque[_OcrJob]" = deque()
+        waiting: Dict[str, List[int]] = {}  # Chave em reconhecimento -> outras páginas com os mesmos pixels
+
+        def submit(page_number: int, key: str, page_image: Any, dpi: int, triage: Optional[Dict[str, Any]]):
+            in_flight.append(_OcrJob(page_number, key, dpi, triage, executor.submit(
+                _recognize_page, pytesseract, page_image, self.OCR_LANGUAGE
+            )))
+
+        def finish(job: _OcrJob):
+            try:
+                page_text, confidence = job.recognized.result()
+            except Exception:
+                if job.triage is None:
+                    waiting.pop(job.key, None)
+                    return
+                result = job.triage  # Falha na alta resolução: fica o texto da triagem
+            else:
+                result = {'text': page_text, 'confidence': round(confidence, 1), 'dpi': job.dpi}
+                if job.triage is None:
+                    result['page_class'] = 'impresso' if confidence >= self.config.ocr_min_confidence else 'baixa_confianca'
+                    if result['page_class'] != 'impresso' and self.config.ocr_dpi > job.dpi:
+                        try:
+                            page_image = self._render_page(pdf_path, doc, job.page_number, self.config.ocr_dpi)
+                        except Exception:
+                            page_image = None
+                        if page_image is not None:
+                            submit(job.page_number, job.key, page_image, self.config.ocr_dpi, result)
+                            return
+                else:
+                    result['page_class'] = job.triage['page_class']
+                    if confidence < job.triage['confidence']:
+                        result = job.triage  # A alta resolução não melhorou o reconhecimento
+            self._remember_page(job.key, result, persist=True)
+            pages_info.append(self._ocr_page_info(job.page_number, result, cached=False))
+            for page_number in waiting.pop(job.key, ()):
+                pages_info.append(self._ocr_page_info(page_number, result, cached=True))
+
+        try:
+            doc = fitz.open(pdf_path) if fitz is not None else None
+            try:
+                if doc is not None:
+                    page_count = len(doc)
+                else:
+                    page_count = _load_backend("pdf2image").pdfinfo_from_path(str(pdf_path))["Pages"]
+                for page_number in page_numbers or range(1, page_count + 1):
+                    try:
+                        page_image = self._render_page(pdf_path, doc, page_number, self.config.ocr_triage_dpi)
+                    except Exception:
+                        continue
+                    if _ink_ratio(page_image) < self.config.ocr_blank_ink_ratio:
+                        pages_info.append(self._ocr_page_info(page_number, {
+                            'text': '', 'confidence': None, 'dpi': self.config.ocr_triage_dpi,
+                            'page_class': 'em_branco'
+                        }, cached=False))
+                        continue
+
+                    key = self._page_cache_key(page_image)
+                    cached = self._cached_page(key)
+                    if cached is not None:
+                        self._remember_page(key, cached)
+                        pages_info.append(self._ocr_page_info(page_number, cached, cached=True))
+                        continue
+                    if key in waiting:
+                        waiting[key].append(page_number)  # Página idêntica a outra ainda em reconhecimento
+                        continue
+
+                    waiting[key] = []
+                    submit(page_number, key, page_image, self.config.ocr_triage_dpi, None)
+                    del page_image
+                    while len(in_flight) >= window:
+                        finish(in_flight.popleft())
+                while in_flight:
+                    finish(in_flight.popleft())
+            finally:
+                for job in in_flight:
+                    job.recognized.cancel()
+                if doc is not None:
+                    doc.close()
+        except Exception as e:
+            raise ExtractionError(f"Erro OCR: {e}", ProcessingStatus.OCR_FAILED)
+
+        pages_info.sort(key=lambda page_info: page_info.page_number)
+        return page_count, pages_info
+
+    def _ocr_pool(self) -> ThreadPoolExecutor:
+        """
+        Pool de threads que aguardam o tesseract (cada chamada é um subprocesso, fora do GIL).
+        Com várias execuções simultâneas, cada tesseract fica com uma única thread do OpenMP.
+        """
+        if self._ocr_executor is None:
+            workers = max(1, self.config.ocr_workers)
+            if workers > 1:
+                os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+            self._ocr_executor = ThreadPoolExecutor(workers, thread_name_prefix="ocr")
+        return self._ocr_executor
+
+    @staticmethod
+    def _ocr_page_info(page_number: int, result: Dict[str, Any], cached: bool) -> PageInfo:
+        return PageInfo(
+            page_number=page_number,
+            page_text=result['text'] or "",
+            page_metadata={
+                'extraction_method': 'ocr',
+                'ocr_method': 'pytesseract',
+                'ocr_confidence': result['confidence'],
+                'ocr_dpi': result['dpi'],
+                'page_class': result['page_class'],
+                'ocr_cached': cached
+            }
+        )
+
+    def _page_cache_key(self, page_image: Any) -> str:
+        """
+        Chave pelos pixels da triagem: a mesma página em qualquer PDF do acervo tem a mesma
+        chave, e um acerto dispensa também a rasterização em alta resolução
+        """
+        pixels = hash_bytes(page_image.tobytes())
+        settings = f"{self.config.ocr_dpi}:{self.config.ocr_min_confidence}"
+        return hash_text(
+            f"ocr_page:{pixels}:{page_image.mode}:{page_image.size}:{settings}:{self.OCR_LANGUAGE}:{self.VERSION}"
+        )
+
+    def _cached_page(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        OCR de uma página idêntica já reconhecida, neste processo ou no cache de
+        extração em disco (compartilhado entre workers e execuções)
+        """
+        result = self._page_results.get(key)
+        if result is None and self.cache is not None:
+            result = self.cache.get(key)
+        return result
+
+    def _remember_page(self, key: str, result: Dict[str, Any], persist: bool = False):
+        if persist and self.cache is not None:
+            self.cache.put(key, result)
+        self._page_results[key] = result
+        self._page_results.move_to_end(key)
+        while len(self._page_results) > self.config.ocr_page_cache_entries:
+            self._page_results.popitem(last=False)
+
+    def _render_page(self, pdf_path: Path, doc: Optional[Any], page_number: int, dpi: int) -> Any:
+        """Rasteriza uma única página em tons de cinza, reaproveitando o documento PyMuPDF aberto"""
+        if doc is not None:
+            fitz = _load_backend("fitz")
+            pixmap = doc.load_page(page_number - 1).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+            return _load_backend("PIL.Image").frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+
+        return _load_backend("pdf2image").convert_from_path(
+            pdf_path, dpi=dpi, first_page=page_number, last_page=page_number, grayscale=True
+        )[0]
+
+    def _is_sufficient_text(self, text: str) -> bool:
+        """Verifica se o texto é suficiente"""
+        if not text:
+            return False
+        return len(text.strip()) >= self.config.min_text_quality_chars
+
+    @staticmethod
+    def _ocr_confidence(pages_info: List[PageInfo]) -> Optional[float]:
+        """
+        Confiança média do OCR (0-100) ponderada pelo tamanho de cada página no buffer
+        (chamar depois de _assemble_pages, que esvazia page_text)
+        """
+        weighted = characters = 0.0
+        for page_info in pages_info:
+            confidence = page_info.page_metadata.get('ocr_confidence')
+            if confidence is not None:
+                length = page_info.text_end - page_info.text_start
+                weighted += confidence * length
+                characters += length
+        return weighted / characters if characters else None
+
+    def _assess_text_quality(self, text: str, ocr_confidence: Optional[float] = None) -> QualityLevel:
+        """
+        Avalia a qualidade pela proporção de caracteres legíveis e, havendo páginas
+        com OCR, pela confiança do reconhecimento (prevalece o pior dos dois)
+        """
+        readable = sum(1 for ch in text if ch.isalnum() or ch.isspace() or ch in '.,;:-/()')
+        ratio = readable / max(len(text), 1)
+
+        level = _quality_rank(ratio, (0.95, 0.85, 0.70))
+        if ocr_confidence is not None:
+            level = max(level, _quality_rank(ocr_confidence, (90, 80, 65)))
+        return _QUALITY_LEVELS[level]
+
+    def _clean_text(self, text: str) -> str:
+        """Remove caracteres de controle e linhas em branco repetidas"""
+        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', text)
+        return re.sub(r'\n{3,}', '\n\n', text).strip()
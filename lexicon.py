@@ -2,6 +2,8 @@
 Léxico hierárquico para detecção de violência (base pública).
 """
 
+import json
+
 VIOLENCE_LEXICON = {
     "medical_formal": {
         "weight": 2.8,
@@ -26,4 +28,13 @@ def get_lexicon():
 
 def get_category_weights():
     """Retorna os pesos por categoria"""
-    return {cat: info["weight"] for cat, info in VIOLENCE_LEXICON.items()}
\ No newline at end of file
+    return {cat: info["weight"] for cat, info in VIOLENCE_LEXICON.items()}
+
+def load_lexicon_json(path):
+    """Carrega um léxico em JSON no mesmo formato de `get_lexicon()`"""
+    with open(path, encoding="utf-8") as file:
+        lexicon = json.load(file)
+    for category, info in lexicon.items():
+        if "weight" not in info or "terms" not in info:
+            raise ValueError(f"Categoria sem 'weight' ou 'terms' no léxico: {category}")
+    return lexicon
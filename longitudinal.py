@@ -0,0 +1,244 @@
+"""
+Índice longitudinal por paciente (identificador anonimizado × data do documento).
+
+Cada AnalysisResult novo é incorporado a agregados por paciente (episódios,
+histórico por categoria e tendência do escore no tempo) em O(1); cronicidade e
+escalada são avaliadas sobre esses agregados, sem reler o histórico. O índice
+é persistido em JSON Lines, como o manifesto: cada atualização anexa o estado
+mais recente do paciente e a última linha de cada paciente prevalece. Quando as
+linhas superadas passam das vigentes, o arquivo é reescrito só com as vigentes.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .config import ProcessingConfig, ProcessingStatus
+
+# Origem das datas na regressão do escore (mantém os valores pequenos)
+_EPOCH = date(2000, 1, 1).toordinal()
+
+# O flush compacta o arquivo quando ele passaria a ter mais que este múltiplo do número de pacientes
+_COMPACT_RATIO = 2
+
+def parse_document_date(value: Optional[str]) -> Optional[date]:
+    """Converte a data do documento (dd/mm/aaaa, como extraída dos metadados) em date"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
+@dataclass
+class PatientHistory:
+    patient_id: str
+    documents: int = 0
+    undated_documents: int = 0
+    episodes: int = 0
+    first_episode: Optional[str] = None
+    last_episode: Optional[str] = None
+    max_score: float = 0.0
+    category_counts: Dict[str, int] = field(default_factory=dict)
+    category_scores: Dict[str, float] = field(default_factory=dict)
+    episode_scores: Dict[str, float] = field(default_factory=dict)  # data ISO -> maior escore do dia
+    document_hashes: List[str] = field(default_factory=list)
+    # Somas da regressão linear escore × dia dos episódios
+    sum_t: float = 0.0
+    sum_s: float = 0.0
+    sum_tt: float = 0.0
+    sum_ts: float = 0.0
+
+    @property
+    def last_score(self) -> float:
+        return self.episode_scores.get(self.last_episode, 0.0) if self.last_episode else 0.0
+
+    @property
+    def mean_score(self) -> float:
+        return self.sum_s / self.episodes if self.episodes else 0.0
+
+    @property
+    def span_days(self) -> int:
+        if not self.episodes:
+            return 0
+        return (date.fromisoformat(self.last_episode) - date.fromisoformat(self.first_episode)).days
+
+    @property
+    def score_slope(self) -> float:
+        """Variação do escore por 30 dias (mínimos quadrados sobre os episódios)"""
+        n = self.episodes
+        denominator = n * self.sum_tt - self.sum_t ** 2
+        if n < 2 or denominator <= 0:
+            return 0.0
+        return (n * self.sum_ts - self.sum_t * self.sum_s) / denominator * 30
+
+    def add_episode(self, episode_date: date, score: float):
+        """Incorpora o escore de um dia; vários documentos no mesmo dia contam como um episódio"""
+        key = episode_date.isoformat()
+        t = float(episode_date.toordinal() - _EPOCH)
+        previous = self.episode_scores.get(key)
+        if previous is None:
+            self.episodes += 1
+            self.sum_t += t
+            self.sum_tt += t * t
+            self.first_episode = min(key, self.first_episode or key)
+            self.last_episode = max(key, self.last_episode or key)
+            previous = 0.0
+        elif score <= previous:
+            return
+        self.episode_scores[key] = score
+        self.sum_s += score - previous
+        self.sum_ts += t * (score - previous)
+
+class PatientIndex:
+    """
+    Agregados longitudinais de todos os pacientes, mantidos em memória e anexados ao
+    arquivo a cada `flush` (uma escrita por lote de resultados).
+    """
+
+    def __init__(self, index_path, min_episodes: int = 3, chronic_min_days: int = 90,
+                 escalation_min_slope: float = 0.5):
+        self.index_path = Path(index_path)
+        self.min_episodes = min_episodes
+        self.chronic_min_days = chronic_min_days
+        self.escalation_min_slope = escalation_min_slope
+        self.patients: Dict[str, PatientHistory] = {}
+        self._known_documents: Set[Tuple[str, str]] = set()  # (paciente, hash do documento)
+        self._dirty = set()
+        self._lines = 0  # Linhas no arquivo, incluindo estados superados
+        self._load()
+
+    @classmethod
+    def from_config(cls, config: ProcessingConfig) -> 'PatientIndex':
+        return cls(config.patient_index_path, config.chronic_min_episodes,
+                   config.chronic_min_days, config.escalation_min_slope)
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as file:
+            for line in file:
+                self._lines += 1
+                try:
+                    history = PatientHistory(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # Linha truncada por uma interrupção durante a escrita
+                self.patients[history.patient_id] = history
+        for history in self.patients.values():
+            self._known_documents.update((history.patient_id, document_hash)
+                                         for document_hash in history.document_hashes)
+
+    def __len__(self) -> int:
+        return len(self.patients)
+
+    def __iter__(self) -> Iterator[PatientHistory]:
+        return iter(self.patients.values())
+
+    def get(self, patient_id: str) -> Optional[PatientHistory]:
+        return self.patients.get(patient_id)
+
+    def is_chronic(self, history: PatientHistory) -> bool:
+        return history.episodes >= self.min_episodes and history.span_days >= self.chronic_min_days
+
+    def is_escalating(self, history: PatientHistory) -> bool:
+        return (
+            history.episodes >= self.min_episodes
+            and history.score_slope >= self.escalation_min_slope
+            and history.last_score > history.mean_score
+        )
+
+    def add_result(self, result: Any) -> Optional[PatientHistory]:
+        """
+        Incorpora um resultado ao histórico do paciente e marca em violence_patterns a
+        cronicidade e a escalada do histórico (o escore do documento não muda).
+        Documentos já incorporados ao histórico do mesmo paciente (mesmo hash) são ignorados.
+        """
+        if result.status != ProcessingStatus.SUCCESS.value:
+            return None
+        patient = result.patient_id
+        document = (patient.patient_id, patient.document_hash)
+        if document in self._known_documents:
+            return self.patients.get(patient.patient_id)
+
+        history = self.patients.get(patient.patient_id)
+        if history is None:
+            history = self.patients[patient.patient_id] = PatientHistory(patient.patient_id)
+        history.documents += 1
+        history.document_hashes.append(patient.document_hash)
+        self._known_documents.add(document)
+
+        for category, count in result.category_counts.items():
+            history.category_counts[category] = history.category_counts.get(category, 0) + count
+        for category, score in result.category_scores.items():
+            history.category_scores[category] = round(history.category_scores.get(category, 0.0) + score, 4)
+        history.max_score = max(history.max_score, result.total_score)
+
+        document_date = parse_document_date(result.text_content.document_metadata.document_date)
+        if document_date is None:
+            history.undated_documents += 1
+        elif result.total_score > 0:
+            history.add_episode(document_date, result.total_score)
+        self._dirty.add(history.patient_id)
+
+        patterns = result.violence_patterns
+        patterns.chronic_violence = patterns.chronic_violence or self.is_chronic(history)
+        patterns.escalation_pattern = patterns.escalation_pattern or self.is_escalating(history)
+        return history
+
+    def add_results(self, results: Iterable[Any]):
+        for result in results:
+            self.add_result(result)
+        self.flush()
+
+    def flush(self):
+        """
+        Anexa o estado atual dos pacientes alterados desde o último flush, ou compacta o
+        arquivo se as linhas superadas passariam a dominar (custo amortizado linear)
+        """
+        if not self._dirty:
+            return
+        if self._lines + len(self._dirty) > _COMPACT_RATIO * len(self.patients):
+            self.compact()
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "a", encoding="utf-8") as file:
+            for patient_id in sorted(self._dirty):
+                file.write(json.dumps(asdict(self.patients[patient_id]), ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._lines += len(self._dirty)
+        self._dirty.clear()
+
+    def compact(self):
+        """Reescreve o índice mantendo apenas o estado mais recente de cada paciente"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for history in self.patients.values():
+                file.write(json.dumps(asdict(history), ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.index_path)
+        self._lines = len(self.patients)
+        self._dirty.clear()
+
+    def summary(self, history: PatientHistory) -> Dict[str, Any]:
+        """Agregados e sinalizadores do paciente, sem o histórico detalhado"""
+        return {
+            "patient_id": history.patient_id,
+            "documents": history.documents,
+            "episodes": history.episodes,
+            "first_episode": history.first_episode,
+            "last_episode": history.last_episode,
+            "span_days": history.span_days,
+            "max_score": history.max_score,
+            "last_score": history.last_score,
+            "mean_score": round(history.mean_score, 2),
+            "score_slope_30d": round(history.score_slope, 3),
+            "category_counts": history.category_counts,
+            "chronic": self.is_chronic(history),
+            "escalating": self.is_escalating(history),
+        }
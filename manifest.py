@@ -0,0 +1,112 @@
+"""
+Manifesto de processamento para execuções incrementais e retomáveis.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .utils import hash_file
+
+@dataclass
+class ManifestEntry:
+    path: str
+    size: int
+    mtime: float
+    content_hash: str
+    lexicon_version: str
+    status: str
+    output_location: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class ProcessingManifest:
+    """
+    Registro em JSON Lines dos arquivos já processados.
+
+    Cada arquivo concluído é anexado e gravado imediatamente, de modo que uma
+    execução interrompida pode ser retomada exatamente do ponto em que parou.
+    Ao fim de cada execução o arquivo é compactado, descartando as entradas superadas.
+    """
+
+    def __init__(self, manifest_path, completed_statuses: Iterable[str] = ("sucesso",)):
+        self.manifest_path = Path(manifest_path)
+        self.completed_statuses = set(completed_statuses)
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._lines = 0  # Linhas no arquivo, incluindo entradas superadas
+        self._load()
+
+    def _load(self):
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, encoding="utf-8") as file:
+            for line in file:
+                self._lines += 1
+                try:
+                    entry = ManifestEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # Linha truncada por uma interrupção durante a escrita
+                self.entries[entry.path] = entry
+
+    @staticmethod
+    def _key(file_path) -> str:
+        return str(Path(file_path).resolve())
+
+    def needs_processing(self, file_path, lexicon_version: str) -> bool:
+        """Indica se o arquivo é novo, mudou, falhou ou foi pontuado com outro léxico"""
+        entry = self.entries.get(self._key(file_path))
+        if entry is None or entry.status not in self.completed_statuses:
+            return True
+        if entry.lexicon_version != lexicon_version:
+            return True
+
+        stat = os.stat(file_path)
+        if stat.st_size == entry.size and stat.st_mtime == entry.mtime:
+            return False
+
+        # Tamanho ou data mudaram (ex.: nova cópia do Drive); confirma pelo conteúdo
+        if stat.st_size == entry.size and hash_file(file_path) == entry.content_hash:
+            self._append(ManifestEntry(**{**asdict(entry), "mtime": stat.st_mtime}))
+            return False
+        return True
+
+    def record(self, file_path, status: str, lexicon_version: str,
+               output_location: Optional[str] = None, content_hash: Optional[str] = None) -> ManifestEntry:
+        """Registra o resultado do processamento de um arquivo"""
+        stat = os.stat(file_path)
+        entry = ManifestEntry(
+            path=self._key(file_path),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            content_hash=content_hash or hash_file(file_path),
+            lexicon_version=lexicon_version,
+            status=status,
+            output_location=output_location,
+            updated_at=datetime.now().isoformat(timespec="seconds")
+        )
+        self._append(entry)
+        return entry
+
+    def _append(self, entry: ManifestEntry):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._lines += 1
+        self.entries[entry.path] = entry
+
+    def compact(self):
+        """Reescreve o manifesto mantendo apenas a entrada mais recente de cada arquivo"""
+        if self._lines <= len(self.entries):
+            return  # Nenhuma entrada superada
+        temp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for entry in self.entries.values():
+                file.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.manifest_path)
+        self._lines = len(self.entries)
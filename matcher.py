@@ -0,0 +1,157 @@
+"""
+Motor de casamento multipadrão (Aho-Corasick) para o léxico de violência.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple, Union
+
+from .normalize import NormalizedText, ensure_normalized, normalize_text
+
+
+class TermMatch(NamedTuple):
+    term: str
+    start: int
+    end: int
+    payload: Tuple[Any, ...]
+
+
+class PatternCue(NamedTuple):
+    """Payload de pistas auxiliares (indicadores e regras de contexto) que não são termos do léxico"""
+    kind: str
+    name: str
+    group: int = 0
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class TermMatcher:
+    """
+    Autômato compilado uma única vez que encontra todos os termos em uma passada.
+
+    Termos terminados em "*" são prefixos: casam com palavras inteiras que começam
+    por eles (ex.: "agred*" em "agredida") e a ocorrência vai até o fim da palavra.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self._patterns: List[str] = []
+        self._payloads: List[List[Any]] = []
+        self._pattern_ids: Dict[Tuple[str, bool], int] = {}
+        self._prefixes: Set[int] = set()
+
+        for term, payload in terms:
+            self._add_term(term, payload)
+        self._build_failure_links()
+
+    @classmethod
+    def from_lexicon(cls, lexicon: Dict[str, Dict[str, Any]],
+                     cues: Iterable[Tuple[str, PatternCue]] = ()) -> "TermMatcher":
+        """
+        Compila o autômato a partir de um léxico no formato de `get_lexicon()`; as pistas
+        auxiliares (cues) entram no mesmo autômato e são encontradas na mesma passada.
+        """
+        terms = [
+            (term, (term, category, info["weight"]))
+            for category, info in lexicon.items()
+            for term in info["terms"]
+        ]
+        return cls(terms + list(cues))
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add_term(self, term: str, payload: Any):
+        key = normalize_text(term).text.strip()
+        is_prefix = key.endswith("*")
+        key = key.rstrip("*")
+        if not key:
+            return
+
+        pattern_id = self._pattern_ids.get((key, is_prefix))
+        if pattern_id is None:
+            state = 0
+            for ch in key:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                    self._goto[state][ch] = next_state
+                state = next_state
+
+            pattern_id = len(self._patterns)
+            self._patterns.append(key)
+            self._payloads.append([])
+            self._pattern_ids[key, is_prefix] = pattern_id
+            self._outputs[state].append(pattern_id)
+            if is_prefix:
+                self._prefixes.add(pattern_id)
+
+        self._payloads[pattern_id].append(payload)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state].extend(self._outputs[self._fail[next_state]])
+
+    def _at_boundary(self, text: str, start: int, end: int) -> bool:
+        """Exige fronteira de palavra quando o termo começa/termina com letra ou dígito"""
+        if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(text[end - 1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def find_all_normalized(self, text: str) -> List[TermMatch]:
+        """
+        Retorna todas as ocorrências (inclusive sobrepostas) em um texto já normalizado,
+        ordenadas por posição, com posições relativas ao próprio texto normalizado.
+        """
+        goto, fail, outputs, prefixes = self._goto, self._fail, self._outputs, self._prefixes
+        matches = []
+        state = 0
+
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for pattern_id in outputs[state]:
+                end = index + 1
+                start = end - len(self._patterns[pattern_id])
+                if pattern_id in prefixes:
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    while end < len(text) and _is_word_char(text[end]):
+                        end += 1
+                elif not self._at_boundary(text, start, end):
+                    continue
+                matches.append(TermMatch(
+                    term=self._patterns[pattern_id],
+                    start=start,
+                    end=end,
+                    payload=tuple(self._payloads[pattern_id])
+                ))
+
+        matches.sort(key=lambda match: (match.start, -match.end))
+        return matches
+
+    def find_all(self, text: Union[str, NormalizedText]) -> List[TermMatch]:
+        """Normaliza o texto uma vez e retorna as ocorrências com posições do texto original"""
+        normalized = ensure_normalized(text)
+        matches = []
+        for match in self.find_all_normalized(normalized.text):
+            start, end = normalized.to_original(match.start, match.end)
+            matches.append(match._replace(start=start, end=end))
+        return matches
@@ -0,0 +1,72 @@
+"""
+Agregação por execução das métricas de cada documento, com exportação em JSON
+ou no formato de texto do Prometheus.
+"""
+
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .utils import enum_value
+
+class RunMetrics:
+    """Soma os tempos por etapa e os contadores dos resultados de uma execução."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.documents = 0
+        self.statuses: Counter = Counter()
+        self.timings_ms: Dict[str, float] = {}
+        self.counters: Counter = Counter()
+        self.processing_time_ms = 0
+
+    def add_time(self, stage: str, seconds: float):
+        """Tempo de etapas da execução que não pertencem a um documento (leitura, gravação)"""
+        self.timings_ms[stage] = self.timings_ms.get(stage, 0.0) + seconds * 1000
+
+    def add_result(self, result: Any):
+        self.documents += 1
+        self.statuses[enum_value(result.status)] += 1
+        self.processing_time_ms += result.processing_time_ms
+        metrics = getattr(result, "metrics", None)
+        if metrics is None:
+            return
+        for stage, milliseconds in metrics.timings_ms.items():
+            self.timings_ms[stage] = self.timings_ms.get(stage, 0.0) + milliseconds
+        self.counters.update(metrics.counters)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "documents": self.documents,
+            "statuses": dict(self.statuses),
+            "processing_time_ms": self.processing_time_ms,
+            "timings_ms": {stage: round(ms, 3) for stage, ms in sorted(self.timings_ms.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "nuve") -> str:
+        """Métricas no formato de exposição em texto do Prometheus"""
+        lines = [
+            f"# TYPE {prefix}_documents_total counter",
+            *(f'{prefix}_documents_total{{status="{status}"}} {count}' for status, count in sorted(self.statuses.items())),
+            f"# TYPE {prefix}_stage_seconds_total counter",
+            *(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {ms / 1000:.6f}'
+              for stage, ms in sorted(self.timings_ms.items())),
+            f"# TYPE {prefix}_events_total counter",
+            *(f'{prefix}_events_total{{event="{name}"}} {count}' for name, count in sorted(self.counters.items())),
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, fmt: Optional[str] = None):
+        """Grava em JSON ou, para arquivos .prom (ou fmt="prometheus"), no formato do Prometheus"""
+        path = Path(path)
+        fmt = fmt or ("prometheus" if path.suffix == ".prom" else "json")
+        content = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        path.write_text(content, encoding="utf-8")
@@ -2,8 +2,11 @@
 Modelos de dados do sistema NUVE.
 """
 
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 
 @dataclass
 class PatientIdentifier:
@@ -20,13 +23,15 @@ class PatientIdentifier:
 @dataclass
 class PageInfo:
     page_number: int
-    page_text: str
+    page_text: str  # Só até a montagem do documento; depois use TextContent.get_page_text
     page_metadata: Dict[str, Any] = field(default_factory=dict)
+    text_start: int = 0
+    text_end: int = 0
 
 @dataclass
 class DocumentMetadata:
     document_date: Optional[str] = None
-    document_type: str = "OUTROS"
+    document_type: str = "Outros"
     creation_date: Optional[str] = None
     author: Optional[str] = None
     service: Optional[str] = None
@@ -42,6 +47,19 @@ class TextContent:
     metadata: Dict[str, Any] = field(default_factory=dict)
     pages_info: List[PageInfo] = field(default_factory=list)
     document_metadata: DocumentMetadata = field(default_factory=DocumentMetadata)
+    page_starts: List[int] = field(default_factory=list)
+
+    def get_page_text(self, page_number: int) -> str:
+        """Recorte do texto do documento correspondente à página"""
+        for page_info in self.pages_info:
+            if page_info.page_number == page_number:
+                return self.text[page_info.text_start:page_info.text_end]
+        return ""
+
+    def page_number_at(self, position: int) -> int:
+        """Número da página que contém a posição do texto (0 antes da primeira página)"""
+        index = bisect_right(self.page_starts, position) - 1
+        return self.pages_info[index].page_number if index >= 0 else 0
 
 @dataclass
 class ViolenceDetection:
@@ -73,6 +91,26 @@ class ViolencePatterns:
     economic_abuse: bool = False
     pattern_severity_score: float = 0.0
 
+@dataclass
+class StageMetrics:
+    """Tempos por etapa (ms) e contadores de um documento"""
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def add_time(self, stage: str, seconds: float):
+        self.timings_ms[stage] = self.timings_ms.get(stage, 0.0) + seconds * 1000
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+
 @dataclass
 class AnalysisResult:
     patient_id: PatientIdentifier
@@ -88,4 +126,9 @@ class AnalysisResult:
     context_phrases: List[str]
     processing_time_ms: int
     status: str
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    negated_terms: List[Tuple[str, str]] = field(default_factory=list)
+    lexicon_version: Optional[str] = None
+    metrics: StageMetrics = field(default_factory=StageMetrics)
+    duplicate_of: Optional[str] = None  # Hash do documento quase idêntico já analisado
+    duplicate_similarity: Optional[float] = None
\ No newline at end of file
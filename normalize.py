@@ -0,0 +1,75 @@
+"""
+Normalização única de textos (caixa, acentuação e espaços) com mapa de posições.
+"""
+
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, Tuple, Union
+
+_FOLD_CACHE: Dict[str, str] = {}
+
+def _fold_char(ch: str) -> str:
+    folded = _FOLD_CACHE.get(ch)
+    if folded is None:
+        decomposed = unicodedata.normalize("NFD", ch)
+        folded = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+        _FOLD_CACHE[ch] = folded
+    return folded
+
+def fold_text(text: str) -> str:
+    """Remove acentos e aplica casefold, sem alterar espaços (uso em termos e padrões)."""
+    return "".join(_fold_char(ch) for ch in text)
+
+class NormalizedText:
+    """Texto normalizado junto com o mapa de cada posição normalizada para a original."""
+
+    __slots__ = ("original", "text", "offsets")
+
+    def __init__(self, original: str, text: str, offsets: array):
+        self.original = original
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Converte um intervalo do texto normalizado para o texto original"""
+        if start >= end:
+            position = self.offsets[start] if start < len(self.offsets) else len(self.original)
+            return position, position
+        return self.offsets[start], self.offsets[end - 1] + 1
+
+    def to_normalized(self, position: int) -> int:
+        """Converte uma posição do texto original para o texto normalizado"""
+        return bisect_left(self.offsets, position)
+
+def normalize_text(text: str) -> NormalizedText:
+    """Normaliza o documento uma única vez: casefold, sem acentos e espaços colapsados."""
+    chars = []
+    offsets = array("I")
+    previous_space = False
+
+    for index, ch in enumerate(text):
+        if ch.isspace():
+            if previous_space:
+                continue
+            previous_space = True
+            chars.append(" ")
+            offsets.append(index)
+            continue
+
+        previous_space = False
+        folded = _fold_char(ch)
+        chars.append(folded)
+        if len(folded) == 1:
+            offsets.append(index)
+        else:
+            offsets.extend([index] * len(folded))
+
+    return NormalizedText(text, "".join(chars), offsets)
+
+def ensure_normalized(text: Union[str, NormalizedText]) -> NormalizedText:
+    """Reaproveita um texto já normalizado ou normaliza o texto bruto"""
+    return text if isinstance(text, NormalizedText) else normalize_text(text)
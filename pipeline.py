@@ -0,0 +1,251 @@
+"""
+Pipeline assíncrono em etapas: leitura, extração, detecção e gravação.
+
+As etapas são ligadas por filas limitadas: a leitura (E/S do Drive) avança
+enquanto os processos extraem e pontuam outros arquivos, e uma etapa lenta
+segura as anteriores em vez de acumular documentos na memória.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple
+
+from .analyzer import ReusableResult, ViolenceAnalyzer
+from .config import ProcessingConfig, ProcessingStatus
+from .dedup import NearDuplicateIndex, Signature, minhash_signature
+from .expanded_lexicon import ExpandedViolenceLexicon
+from .extractor import ExtractionError
+from .longitudinal import PatientIndex
+from .manifest import ProcessingManifest
+from .metrics import RunMetrics
+from .models import AnalysisResult, StageMetrics, TextContent
+from .normalize import normalize_text
+from .utils import hash_file, hash_text
+from .writers import ResultWriter
+
+if TYPE_CHECKING:
+    from .scoring import TermCountMatrixBuilder
+
+_worker_analyzer: Optional[ViolenceAnalyzer] = None
+
+def _init_pipeline_worker(config: ProcessingConfig):
+    """Compila o léxico uma única vez em cada processo do pool"""
+    global _worker_analyzer
+    _worker_analyzer = ViolenceAnalyzer(config)
+
+def _extract_in_worker(pdf_path: Path, signature_settings: Optional[Tuple[int, int]] = None
+                       ) -> Tuple[Optional[TextContent], Optional[Tuple[str, str]], float, StageMetrics,
+                                  Optional[Tuple[Signature, str]]]:
+    """
+    Extrai o texto; a falha volta como (status, mensagem), que atravessa o pool sem perder o status.
+    Com signature_settings (num_bins, shingle_size), calcula também a assinatura MinHash e o
+    hash do texto normalizado.
+    """
+    started = time.perf_counter()
+    metrics = StageMetrics()
+    try:
+        with metrics.timed("extraction"):
+            text_content = _worker_analyzer.extractor.extract_from_pdf(pdf_path, metrics)
+    except Exception as e:
+        status = e.status if isinstance(e, ExtractionError) else ProcessingStatus.PROCESSING_ERROR
+        return None, (status.value, str(e)), time.perf_counter() - started, metrics, None
+
+    fingerprint = None
+    if signature_settings is not None:
+        with metrics.timed("dedup"):
+            normalized = normalize_text(text_content.text).text
+            fingerprint = (minhash_signature(normalized, *signature_settings), hash_text(normalized))
+    return text_content, None, time.perf_counter() - started, metrics, fingerprint
+
+def _score_in_worker(pdf_path: Path, text_content: Optional[TextContent], error: Optional[Tuple[str, str]],
+                     extraction_seconds: float, metrics: StageMetrics,
+                     reusable: bool = False) -> Tuple[AnalysisResult, Optional[ReusableResult]]:
+    """Pontua o texto; com reusable, devolve também a entrada do índice de quase-duplicatas"""
+    started = time.perf_counter() - extraction_seconds
+    if error is not None:
+        status, message = error
+        error = ExtractionError(message, ProcessingStatus(status))
+        return _worker_analyzer.failed_result(pdf_path, error, started, metrics), None
+    result = _worker_analyzer.analyze_extracted(pdf_path, text_content, started, metrics)
+    if not reusable or result.status != ProcessingStatus.SUCCESS.value:
+        return result, None
+    return result, ViolenceAnalyzer.reusable_entry(result, normalize_text(text_content.text))
+
+class StagedPipeline:
+    """
+    Processa uma pasta de PDFs com as etapas sobrepostas.
+
+    Os resultados saem na ordem em que ficam prontos (não na ordem dos arquivos),
+    a cada lote gravado e registrado no manifesto. O índice de quase-duplicatas fica
+    no processo principal, para valer entre todos os workers; as detecções só são
+    reaproveitadas quando o texto normalizado é idêntico.
+    """
+
+    def __init__(self, config: ProcessingConfig, max_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        self.config = config
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.max_workers * 2
+        self.logger = logging.getLogger("StagedPipeline")
+        self.run_metrics = RunMetrics()
+        self.patient_index = PatientIndex.from_config(config) if config.patient_index_path else None
+        self.term_counts: Optional["TermCountMatrixBuilder"] = None
+        if config.term_counts_path:
+            from .scoring import TermCountMatrixBuilder  # NumPy só é carregado por quem grava a matriz
+            self.term_counts = TermCountMatrixBuilder(ExpandedViolenceLexicon.version_for(config))
+        self.duplicates: Optional[NearDuplicateIndex[ReusableResult]] = None
+        if config.enable_near_duplicates:
+            self.duplicates = NearDuplicateIndex(config.near_duplicate_threshold,
+                                                 max_entries=config.near_duplicate_max_entries)
+
+    async def run(self, folder_path: Path, manifest: Optional[ProcessingManifest] = None,
+                  output_location: Optional[str] = None,
+                  writer: Optional[ResultWriter] = None) -> Counter:
+        """Processa a pasta inteira e retorna a contagem de resultados por status"""
+        status_counts = Counter()
+        async for result in self.iter_folder(folder_path, manifest, output_location, writer):
+            status_counts[result.status] += 1
+        return status_counts
+
+    async def iter_folder(self, folder_path: Path, manifest: Optional[ProcessingManifest] = None,
+                          output_location: Optional[str] = None,
+                          writer: Optional[ResultWriter] = None) -> AsyncIterator[AnalysisResult]:
+        loop = asyncio.get_running_loop()
+        lexicon_version = None
+        if manifest is not None:
+            lexicon_version = ExpandedViolenceLexicon.version_for(self.config)
+
+        read_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        extracted_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        scored_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        worker_config = replace(self.config, enable_near_duplicates=False)
+        pool = ProcessPoolExecutor(self.max_workers, initializer=_init_pipeline_worker,
+                                   initargs=(worker_config,))
+        signature_settings = None
+        if self.duplicates is not None:
+            signature_settings = (self.duplicates.num_bins, self.duplicates.shingle_size)
+            reuser = ViolenceAnalyzer(worker_config)
+
+        async def read():
+            """Descobre os arquivos e os lê por inteiro (hash do conteúdo), aquecendo o cache do Drive"""
+            pdf_paths = await asyncio.to_thread(
+                lambda: sorted(p for p in Path(folder_path).iterdir() if p.suffix.lower() == '.pdf')
+            )
+            for pdf_path in pdf_paths:
+                if manifest is not None and not await asyncio.to_thread(
+                        manifest.needs_processing, pdf_path, lexicon_version):
+                    continue
+                started = time.perf_counter()
+                try:
+                    content_hash = await asyncio.to_thread(hash_file, pdf_path)
+                except OSError:
+                    content_hash = None  # A extração registra a falha
+                self.run_metrics.add_time("read", time.perf_counter() - started)
+                await read_queue.put((pdf_path, content_hash))
+            for _ in range(self.max_workers):
+                await read_queue.put(None)
+
+        async def extract():
+            while (item := await read_queue.get()) is not None:
+                pdf_path, content_hash = item
+                outcome = await loop.run_in_executor(pool, _extract_in_worker, pdf_path, signature_settings)
+                await extracted_queue.put((pdf_path, content_hash, outcome))
+            await extracted_queue.put(None)
+
+        async def score():
+            while (item := await extracted_queue.get()) is not None:
+                pdf_path, content_hash, (text_content, error, seconds, metrics, fingerprint) = item
+                match = original = None
+                if fingerprint is not None:
+                    match = self.duplicates.query(fingerprint[0])
+                    original = self.duplicates.get(match[0]) if match is not None else None
+                if original is not None and original.text_digest == fingerprint[1]:
+                    result = reuser.reuse_extracted(pdf_path, text_content, original, match[1],
+                                                    time.perf_counter() - seconds, metrics)
+                else:
+                    result, entry = await loop.run_in_executor(
+                        pool, _score_in_worker, pdf_path, text_content, error, seconds, metrics,
+                        fingerprint is not None
+                    )
+                    if entry is not None:
+                        if match is not None:
+                            ViolenceAnalyzer.mark_near_duplicate(result, *match)
+                        self.duplicates.add(result.patient_id.document_hash, fingerprint[0], entry)
+                await scored_queue.put((pdf_path, content_hash, result))
+            await scored_queue.put(None)
+
+        stage_tasks = [asyncio.create_task(read())]
+        stage_tasks += [asyncio.create_task(extract()) for _ in range(self.max_workers)]
+        stage_tasks += [asyncio.create_task(score()) for _ in range(self.max_workers)]
+        stages = asyncio.gather(*stage_tasks)
+
+        try:
+            batch: List[Tuple[Path, Optional[str], AnalysisResult]] = []
+            finished_scorers = 0
+            while finished_scorers < self.max_workers:
+                item = await self._next(scored_queue, stages)
+                if item is None:
+                    finished_scorers += 1
+                    continue
+                batch.append(item)
+                if len(batch) >= self.config.batch_size:
+                    for result in await self._commit_batch(batch, manifest, lexicon_version, output_location, writer):
+                        yield result
+                    batch = []
+            if batch:
+                for result in await self._commit_batch(batch, manifest, lexicon_version, output_location, writer):
+                    yield result
+            await stages
+            if manifest is not None:
+                await asyncio.to_thread(manifest.compact)
+            if self.term_counts is not None:
+                await asyncio.to_thread(self.term_counts.save, self.config.term_counts_path)
+        finally:
+            stages.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    async def _next(queue: asyncio.Queue, stages: asyncio.Future):
+        """Próximo item da fila, propagando a exceção se alguma etapa falhar"""
+        get = asyncio.ensure_future(queue.get())
+        await asyncio.wait({get, stages}, return_when=asyncio.FIRST_COMPLETED)
+        if not get.done() and stages.exception() is not None:
+            get.cancel()
+            stages.result()
+        return await get
+
+    async def _commit_batch(self, batch: List[Tuple[Path, Optional[str], AnalysisResult]],
+                            manifest: Optional[ProcessingManifest], lexicon_version: Optional[str],
+                            output_location: Optional[str], writer: Optional[ResultWriter]) -> List[AnalysisResult]:
+        """Grava o lote e só então o registra no manifesto, fora do laço de eventos"""
+        results = [result for _, _, result in batch]
+        for pdf_path, _, result in batch:
+            if result.status != ProcessingStatus.SUCCESS.value:
+                self.logger.warning(f"{pdf_path.name}: {result.status} - {result.error_message}")
+        started = time.perf_counter()
+        if self.patient_index is not None:
+            for result in results:
+                self.patient_index.add_result(result)
+        if self.term_counts is not None:
+            for result in results:
+                if result.status == ProcessingStatus.SUCCESS.value:
+                    self.term_counts.add_result(result)
+        if writer is not None:
+            await asyncio.to_thread(writer.write_batch, results)
+        if self.patient_index is not None:
+            await asyncio.to_thread(self.patient_index.flush)
+        if manifest is not None:
+            for pdf_path, content_hash, result in batch:
+                await asyncio.to_thread(
+                    manifest.record, pdf_path, result.status, lexicon_version, output_location, content_hash
+                )
+        self.run_metrics.add_time("write", time.perf_counter() - started)
+        for result in results:
+            self.run_metrics.add_result(result)
+        return results
@@ -0,0 +1,238 @@
+"""
+Matriz esparsa documento × termo e repontuação vetorizada sem reler os textos.
+
+Cada varredura guarda, por documento e termo, o número de ocorrências, a soma
+dos multiplicadores de intensidade e o número de ocorrências negadas. Com isso
+`category_scores`, `total_score` e `severity_level` de todo o corpus podem ser
+recalculados para novos pesos de categoria em uma única operação matricial.
+Execuções incrementais acrescentam seus documentos à matriz já gravada.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import SEVERITY_THRESHOLDS, SeverityLevel
+
+def severity_labels(total_scores: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de `src.config.severity_label`"""
+    labels = np.array(
+        [SeverityLevel.NONE.value, SeverityLevel.MINIMAL.value]
+        + [level.value for _, level in SEVERITY_THRESHOLDS],
+        dtype=object
+    )
+    thresholds = np.array([threshold for threshold, _ in SEVERITY_THRESHOLDS])
+    index = np.searchsorted(thresholds, total_scores, side="right") + 1
+    index[total_scores <= 0] = 0
+    return labels[index]
+
+class TermCountMatrixBuilder:
+    """Acumula as entradas da matriz durante uma varredura."""
+
+    def __init__(self, lexicon_version: str = ""):
+        self.lexicon_version = lexicon_version
+        self.doc_ids: List[str] = []
+        self.pattern_scores: List[float] = []
+        self.terms: Dict[Tuple[str, str], int] = {}
+        self._entries: List[Tuple[int, int, float, int, int]] = []
+
+    def _term_code(self, term: str, category: str) -> int:
+        return self.terms.setdefault((term, category), len(self.terms))
+
+    def add_document(self, doc_id: str, detections: Iterable[Any],
+                     negated_terms: Iterable[Tuple[str, str]] = (), pattern_severity_score: float = 0.0):
+        doc = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.pattern_scores.append(pattern_severity_score)
+
+        cells: Dict[int, List[float]] = {}
+        for detection in detections:
+            cell = cells.setdefault(self._term_code(detection.term, detection.category), [0.0, 0, 0])
+            cell[0] += detection.intensity_multiplier
+            cell[1] += 1
+        for term, category in negated_terms:
+            cell = cells.setdefault(self._term_code(term, category), [0.0, 0, 0])
+            cell[2] += 1
+
+        for term_code, (intensity_sum, count, negated) in cells.items():
+            self._entries.append((doc, term_code, intensity_sum, count, negated))
+
+    def add_result(self, result: Any):
+        """Acrescenta um AnalysisResult, identificado pelo hash do documento"""
+        self.add_document(
+            result.patient_id.document_hash,
+            result.detections,
+            getattr(result, "negated_terms", ()),
+            result.violence_patterns.pattern_severity_score
+        )
+
+    def save(self, path) -> "TermCountMatrix":
+        """
+        Grava a matriz em `path` (.npz) de forma atômica. Se já há uma matriz do mesmo léxico no
+        caminho (execução incremental), os documentos desta varredura substituem ou se somam aos dela.
+        """
+        matrix = self.build()
+        path = Path(path)
+        if path.exists():
+            previous = TermCountMatrix.load(path)
+            if previous.lexicon_version == matrix.lexicon_version:
+                matrix = TermCountMatrix.concatenate([previous.without_documents(self.doc_ids), matrix])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp.npz")
+        matrix.save(temp_path)
+        os.replace(temp_path, path)
+        return matrix
+
+    def build(self) -> "TermCountMatrix":
+        terms, categories, term_category = _vocabulary_arrays(self.terms)
+        entries = np.array(self._entries, dtype=np.float64).reshape(-1, 5)
+        return TermCountMatrix(
+            doc_ids=np.array(self.doc_ids, dtype=object),
+            terms=terms,
+            categories=categories,
+            term_category=term_category,
+            doc=entries[:, 0].astype(np.int32),
+            term=entries[:, 1].astype(np.int32),
+            intensity_sum=entries[:, 2],
+            count=entries[:, 3].astype(np.int32),
+            negated=entries[:, 4].astype(np.int32),
+            pattern_scores=np.array(self.pattern_scores, dtype=np.float64),
+            lexicon_version=self.lexicon_version
+        )
+
+def _vocabulary_arrays(vocabulary: Dict[Tuple[str, str], int]):
+    """Termos, categorias e categoria de cada termo a partir de {(termo, categoria): código}"""
+    terms = sorted(vocabulary, key=vocabulary.get)
+    categories = sorted({category for _, category in terms})
+    category_codes = {category: code for code, category in enumerate(categories)}
+    return (
+        np.array([term for term, _ in terms], dtype=object),
+        np.array(categories, dtype=object),
+        np.array([category_codes[category] for _, category in terms], dtype=np.int32)
+    )
+
+class TermCountMatrix:
+    """Matriz esparsa (formato de coordenadas) persistida em .npz."""
+
+    def __init__(self, doc_ids, terms, categories, term_category, doc, term,
+                 intensity_sum, count, negated, pattern_scores, lexicon_version: str = ""):
+        self.doc_ids = doc_ids
+        self.terms = terms
+        self.categories = categories
+        self.term_category = term_category
+        self.doc = doc
+        self.term = term
+        self.intensity_sum = intensity_sum
+        self.count = count
+        self.negated = negated
+        self.pattern_scores = pattern_scores
+        self.lexicon_version = lexicon_version
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.doc_ids), len(self.terms)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            doc_ids=self.doc_ids.astype(str), terms=self.terms.astype(str),
+            categories=self.categories.astype(str), term_category=self.term_category,
+            doc=self.doc, term=self.term, intensity_sum=self.intensity_sum,
+            count=self.count, negated=self.negated, pattern_scores=self.pattern_scores,
+            lexicon_version=np.array(self.lexicon_version)
+        )
+
+    @classmethod
+    def load(cls, path) -> "TermCountMatrix":
+        with np.load(path) as data:
+            return cls(
+                doc_ids=data["doc_ids"].astype(object), terms=data["terms"].astype(object),
+                categories=data["categories"].astype(object), term_category=data["term_category"],
+                doc=data["doc"], term=data["term"], intensity_sum=data["intensity_sum"],
+                count=data["count"], negated=data["negated"], pattern_scores=data["pattern_scores"],
+                lexicon_version=str(data["lexicon_version"])
+            )
+
+    def without_documents(self, doc_ids: Iterable[str]) -> "TermCountMatrix":
+        """Cópia sem os documentos indicados (ex.: reprocessados em uma execução incremental)"""
+        keep = ~np.isin(self.doc_ids.astype(str), np.array(list(doc_ids), dtype=str))
+        new_doc = np.cumsum(keep) - 1
+        entries = keep[self.doc]
+        return TermCountMatrix(
+            doc_ids=self.doc_ids[keep], terms=self.terms, categories=self.categories,
+            term_category=self.term_category, doc=new_doc[self.doc[entries]].astype(np.int32),
+            term=self.term[entries], intensity_sum=self.intensity_sum[entries], count=self.count[entries],
+            negated=self.negated[entries], pattern_scores=self.pattern_scores[keep],
+            lexicon_version=self.lexicon_version
+        )
+
+    @classmethod
+    def concatenate(cls, matrices: Sequence["TermCountMatrix"]) -> "TermCountMatrix":
+        """Junta matrizes de execuções diferentes, unificando os vocabulários"""
+        vocabulary: Dict[Tuple[str, str], int] = {}
+        docs, terms = [], []
+        doc_offset = 0
+
+        for matrix in matrices:
+            remap = np.array([
+                vocabulary.setdefault((term, matrix.categories[category]), len(vocabulary))
+                for term, category in zip(matrix.terms, matrix.term_category)
+            ], dtype=np.int32)
+            docs.append(matrix.doc + doc_offset)
+            terms.append(remap[matrix.term] if len(remap) else matrix.term)
+            doc_offset += len(matrix.doc_ids)
+
+        vocabulary_terms, categories, term_category = _vocabulary_arrays(vocabulary)
+        return cls(
+            doc_ids=np.concatenate([matrix.doc_ids for matrix in matrices]),
+            terms=vocabulary_terms,
+            categories=categories,
+            term_category=term_category,
+            doc=np.concatenate(docs).astype(np.int32),
+            term=np.concatenate(terms).astype(np.int32),
+            intensity_sum=np.concatenate([matrix.intensity_sum for matrix in matrices]),
+            count=np.concatenate([matrix.count for matrix in matrices]),
+            negated=np.concatenate([matrix.negated for matrix in matrices]),
+            pattern_scores=np.concatenate([matrix.pattern_scores for matrix in matrices]),
+            lexicon_version=matrices[0].lexicon_version
+        )
+
+    def rescore(self, category_weights: Dict[str, float], include_negated: bool = False,
+                pattern_scores: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Recalcula os escores de todo o corpus para novos pesos de categoria.
+
+        Retorna arrays alinhados a `doc_ids`: category_scores (documentos × categorias,
+        na ordem de `categories`), base_score, total_score e severity_level.
+        Com include_negated, ocorrências negadas também pontuam (multiplicador 1).
+        """
+        n_docs, n_categories = len(self.doc_ids), len(self.categories)
+        weights = np.array([category_weights.get(category, 0.0) for category in self.categories])
+        entry_category = self.term_category[self.term]
+        entry_weight = weights[entry_category]
+
+        adjusted = entry_weight * self.intensity_sum
+        counts = self.count.astype(np.float64)
+        if include_negated:
+            adjusted = adjusted + entry_weight * self.negated
+            counts = counts + self.negated
+
+        cell = self.doc.astype(np.int64) * n_categories + entry_category
+        category_scores = np.bincount(cell, weights=adjusted, minlength=n_docs * n_categories)
+        category_scores = category_scores.reshape(n_docs, n_categories)
+        base_score = np.bincount(self.doc, weights=entry_weight * counts, minlength=n_docs)
+
+        if pattern_scores is None:
+            pattern_scores = self.pattern_scores
+        total_score = category_scores.sum(axis=1) + pattern_scores
+
+        return {
+            "doc_ids": self.doc_ids,
+            "categories": self.categories,
+            "category_scores": category_scores,
+            "base_score": base_score,
+            "total_score": total_score,
+            "severity_level": severity_labels(total_score),
+        }
@@ -0,0 +1,250 @@
+"""
+Serviço local de detecção sempre aquecido (HTTP em porta TCP ou socket Unix).
+
+O léxico é compilado e os processos do pool são iniciados uma única vez; os
+pedidos concorrentes são agrupados em lotes antes de seguir para o pool, de
+modo que a latência de cada pedido é só o tempo de análise.
+
+    POST /analisar   {"text": "...", "name": "nota.txt"}      -> AnalysisResult
+    POST /lote       {"texts": [{"text": "...", "name": ...}]} -> [AnalysisResult]
+    POST /pdf?name=prontuario.pdf  (corpo: bytes do PDF)      -> AnalysisResult
+    GET  /saude  |  GET /metricas (Prometheus)
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .analyzer import ViolenceAnalyzer
+from .config import ProcessingConfig
+from .metrics import RunMetrics
+from .models import AnalysisResult
+from .writers import result_to_dict
+
+# Pedido: ("text", texto, nome) ou ("pdf", bytes, nome)
+Job = Tuple[str, Any, str]
+
+_worker_analyzer: Optional[ViolenceAnalyzer] = None
+
+def _init_service_worker(config: ProcessingConfig):
+    """Compila o léxico uma única vez em cada processo do pool"""
+    global _worker_analyzer
+    _worker_analyzer = ViolenceAnalyzer(config)
+
+def _run_job(analyzer: ViolenceAnalyzer, job: Job) -> AnalysisResult:
+    kind, payload, name = job
+    if kind == "text":
+        return analyzer.analyze_raw_text(payload, name)
+
+    # Os extratores trabalham sobre caminhos; o PDF recebido vai para um diretório temporário
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = Path(workdir) / (Path(name).name or "documento.pdf")
+        if pdf_path.suffix.lower() != ".pdf":
+            pdf_path = pdf_path.with_suffix(".pdf")
+        pdf_path.write_bytes(payload)
+        return analyzer.analyze_file(pdf_path)
+
+def _run_jobs_in_worker(jobs: List[Job]) -> List[AnalysisResult]:
+    return [_run_job(_worker_analyzer, job) for job in jobs]
+
+def _warm_worker(_):
+    return os.getpid()
+
+class DetectionService:
+    """
+    Fila única de pedidos com agrupamento automático.
+
+    Um pedido espera no máximo `batch_window` segundos por outros; o lote resultante
+    é dividido entre os processos do pool (ou analisado na própria thread com workers=0).
+    """
+
+    def __init__(self, config: ProcessingConfig, workers: Optional[int] = None,
+                 max_batch: int = 64, batch_window: float = 0.005):
+        self.config = config
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.logger = logging.getLogger("DetectionService")
+        self.run_metrics = RunMetrics()
+        self._metrics_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[Job, Future]]]" = queue.Queue()
+
+        self.analyzer = ViolenceAnalyzer(config)
+        self.pool = None
+        if self.workers > 0:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_service_worker, initargs=(config,))
+            list(self.pool.map(_warm_worker, range(self.workers)))  # Inicia e aquece todos os processos
+        self._batcher = threading.Thread(target=self._batch_loop, name="batcher", daemon=True)
+        self._batcher.start()
+
+    @property
+    def lexicon_version(self) -> str:
+        return self.analyzer.lexicon.version
+
+    def submit(self, job: Job) -> Future:
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def analyze(self, jobs: List[Job], timeout: Optional[float] = None) -> List[AnalysisResult]:
+        futures = [self.submit(job) for job in jobs]
+        return [future.result(timeout) for future in futures]
+
+    def _batch_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            try:
+                while len(batch) < self.max_batch:
+                    item = self._queue.get(timeout=self.batch_window)
+                    if item is None:
+                        self._queue.put(None)  # Encerra depois de despachar o lote atual
+                        break
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[Job, Future]]):
+        if self.pool is None:
+            self._resolve(batch, lambda: [_run_job(self.analyzer, job) for job, _ in batch])
+            return
+
+        # Um bloco por processo: o lote atravessa o pool com poucas serializações
+        size = -(-len(batch) // self.workers)
+        for start in range(0, len(batch), size):
+            chunk = batch[start:start + size]
+            task = self.pool.submit(_run_jobs_in_worker, [job for job, _ in chunk])
+            task.add_done_callback(lambda task, chunk=chunk: self._resolve(chunk, task.result))
+
+    def _resolve(self, chunk: List[Tuple[Job, Future]], get_results):
+        try:
+            results = get_results()
+        except Exception as e:
+            for _, future in chunk:
+                future.set_exception(e)
+            return
+        with self._metrics_lock:
+            for result in results:
+                self.run_metrics.add_result(result)
+        for (_, future), result in zip(chunk, results):
+            future.set_result(result)
+
+    def close(self):
+        self._queue.put(None)
+        self._batcher.join()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "NUVE"
+    service: DetectionService
+
+    def log_message(self, format, *args):
+        self.service.logger.debug(format, *args)
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/saude":
+            self._send_json(200, {"status": "ok", "lexicon_version": self.service.lexicon_version,
+                                  "workers": self.service.workers})
+        elif path == "/metricas":
+            body = self.service.run_metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": f"Rota desconhecida: {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == "/pdf":
+                jobs = [("pdf", self._read_body(), query.get("name", ["documento.pdf"])[0])]
+                include_text = query.get("include_text", ["0"])[0] == "1"
+            else:
+                request = json.loads(self._read_body() or b"{}")
+                include_text = bool(request.get("include_text"))
+                if url.path == "/analisar":
+                    jobs = [("text", request["text"], request.get("name", "texto"))]
+                elif url.path == "/lote":
+                    jobs = [("text", item["text"], item.get("name", f"texto_{i}"))
+                            for i, item in enumerate(request["texts"])]
+                else:
+                    self._send_json(404, {"error": f"Rota desconhecida: {url.path}"})
+                    return
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Pedido inválido: {e}"})
+            return
+
+        try:
+            results = self.service.analyze(jobs)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        payload = [result_to_dict(result, include_text) for result in results]
+        self._send_json(200, payload if url.path == "/lote" else payload[0])
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    """HTTP sobre socket Unix (sem porta exposta na rede)"""
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+def make_server(service: DetectionService, host: str = "127.0.0.1", port: int = 8765,
+                socket_path: Optional[str] = None) -> ThreadingHTTPServer:
+    """Servidor HTTP ligado ao serviço; com socket_path usa um socket Unix no lugar da porta"""
+    handler = type("RequestHandler", (_RequestHandler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(config: ProcessingConfig, host: str = "127.0.0.1", port: int = 8765,
+          socket_path: Optional[str] = None, workers: Optional[int] = None):
+    service = DetectionService(config, workers)
+    server = make_server(service, host, port, socket_path)
+    service.logger.info("Serviço pronto em %s (léxico %s)", socket_path or f"http://{host}:{server.server_port}",
+                        service.lexicon_version)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
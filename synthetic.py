@@ -0,0 +1,134 @@
+"""
+Gerador determinístico de prontuários sintéticos (texto e PDF) para benchmarks.
+
+Frases clínicas neutras são intercaladas com termos do léxico, negações e
+padrões contextuais em densidades controladas; a mesma semente gera sempre os
+mesmos documentos. Os PDFs (camada de texto ou página digitalizada) exigem PyMuPDF.
+"""
+
+import random
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .normalize import fold_text
+
+FILLER_SENTENCES = [
+    "Paciente de {idade} anos, {sexo}, admitida no pronto-socorro às {hora}.",
+    "Refere dor em {local} há {dias} dias, sem febre.",
+    "Sinais vitais: PA {pa} mmHg, FC {fc} bpm, afebril.",
+    "Ao exame, lúcida e orientada, corada e hidratada.",
+    "Ausculta pulmonar com murmúrio vesicular presente bilateralmente.",
+    "Abdome flácido, indolor à palpação, sem visceromegalias.",
+    "Conduta: analgesia, observação e reavaliação em {horas} horas.",
+    "Solicitados hemograma, eletrólitos e radiografia de {local}.",
+    "Acompanhada por familiar, que auxilia na anamnese.",
+    "Orientada quanto aos sinais de alarme e retorno ao serviço.",
+]
+
+TERM_SENTENCES = [
+    "Ao exame, apresenta {term} em {local}.",
+    "Relata {term} ocorrido na residência.",
+    "Equipe registra {term} durante o atendimento.",
+]
+
+NEGATED_SENTENCES = [
+    "Nega ter sofrido {term}.",
+    "Paciente nega {term} no período.",
+]
+
+CONTEXT_SENTENCES = [
+    "Refere que o companheiro sempre a agride quando bebe.",
+    "Relata que foi agredida na frente dos filhos.",
+    "Gestante de {semanas} semanas, refere ter sido agredida com chutes.",
+    "Apresenta fratura de {local} após ser agredida.",
+    "Companheiro ameaçou de morte e disse vou te matar.",
+    "Agressor empunhando faca durante a discussão.",
+]
+
+LOCAIS = ["membro superior direito", "face", "região cervical", "tórax", "abdome", "joelho esquerdo"]
+
+# Radicais que a negação reconhece após a pista (ver ExpandedViolenceLexicon.negation_scope)
+NEGATABLE_STEM = re.compile(r'\b(?:viol|agred|espanc|machuc|bat|surr|ameac|mal.?trat)')
+
+@dataclass
+class SyntheticNote:
+    text: str
+    planted_terms: List[Tuple[str, str]] = field(default_factory=list)
+    negated_terms: List[Tuple[str, str]] = field(default_factory=list)
+    context_sentences: int = 0
+
+class SyntheticNoteGenerator:
+    """Gera notas clínicas em português com termos plantados em densidades controladas."""
+
+    def __init__(self, lexicon: Dict[str, Dict[str, Any]], seed: int = 0):
+        self.random = random.Random(seed)
+        self.terms = [(term, category) for category, info in lexicon.items() for term in info["terms"]]
+        self.negatable_terms = [
+            (term, category) for term, category in self.terms if NEGATABLE_STEM.match(fold_text(term))
+        ] or self.terms
+
+    def _fill(self, template: str, **values) -> str:
+        rng = self.random
+        return template.format(
+            idade=rng.randint(14, 90), sexo=rng.choice(["feminino", "masculino"]),
+            hora=f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}", local=rng.choice(LOCAIS),
+            dias=rng.randint(1, 30), pa=f"{rng.randint(90, 160)}x{rng.randint(60, 100)}",
+            fc=rng.randint(55, 120), horas=rng.choice([2, 4, 6, 12]), semanas=rng.randint(8, 38),
+            **values
+        )
+
+    def note(self, n_chars: int, term_rate: float = 0.15, negation_rate: float = 0.05,
+             context_rate: float = 0.05) -> SyntheticNote:
+        """
+        Nota com cerca de n_chars caracteres; cada frase é um termo plantado, um termo
+        negado ou um padrão contextual com as probabilidades indicadas.
+        """
+        rng = self.random
+        note = SyntheticNote(text="")
+        day = rng.randint(1, 28)
+        parts = [f"EVOLUÇÃO MÉDICA - {day:02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2024)}\n"]
+        size = len(parts[0])
+
+        while size < n_chars:
+            draw = rng.random()
+            if draw < term_rate:
+                term, category = rng.choice(self.terms)
+                sentence = self._fill(rng.choice(TERM_SENTENCES), term=term)
+                note.planted_terms.append((term, category))
+            elif draw < term_rate + negation_rate:
+                term, category = rng.choice(self.negatable_terms)
+                sentence = self._fill(rng.choice(NEGATED_SENTENCES), term=term)
+                note.negated_terms.append((term, category))
+            elif draw < term_rate + negation_rate + context_rate:
+                sentence = self._fill(rng.choice(CONTEXT_SENTENCES))
+                note.context_sentences += 1
+            else:
+                sentence = self._fill(rng.choice(FILLER_SENTENCES))
+            parts.append(sentence + ("\n" if rng.random() < 0.2 else " "))
+            size += len(parts[-1])
+
+        note.text = "".join(parts)
+        return note
+
+def write_pdf(text: str, path, scanned: bool = False, chars_per_page: int = 3000, dpi: int = 150) -> Path:
+    """
+    Grava o texto em PDF A4 com PyMuPDF; com scanned=True cada página vira apenas
+    uma imagem (sem camada de texto), como um prontuário digitalizado.
+    """
+    import fitz
+
+    path = Path(path)
+    doc = fitz.open()
+    for start in range(0, max(len(text), 1), chars_per_page):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), text[start:start + chars_per_page], fontsize=9)
+        if scanned:
+            pixmap = page.get_pixmap(dpi=dpi)
+            doc.delete_page(-1)
+            image_page = doc.new_page()
+            image_page.insert_image(image_page.rect, pixmap=pixmap)
+    doc.save(path)
+    doc.close()
+    return path
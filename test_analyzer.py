@@ -0,0 +1,130 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src import extractor as extractor_module
+from src.analyzer import BatchProcessor, ViolenceAnalyzer
+from src.cli import main
+from src.config import ProcessingConfig
+from src.expanded_lexicon import ExpandedViolenceLexicon
+from src.scoring import TermCountMatrix
+from src.synthetic import SyntheticNoteGenerator
+
+NOTE = "Evolução Médica 12/03/2024. Paciente relata agressão física pelo marido, com hematoma periorbital."
+
+def test_analyze_raw_text_scores_without_pdf_backends():
+    result = ViolenceAnalyzer(ProcessingConfig()).analyze_raw_text(NOTE, "nota.txt")
+    assert result.status == "sucesso"
+    assert {d.term for d in result.detections} >= {"agressão física", "hematoma periorbital"}
+    assert result.text_content.document_metadata.document_date == "12/03/2024"
+    assert result.lexicon_version == ExpandedViolenceLexicon.version_for(ProcessingConfig())
+
+def test_patterns_and_context_come_from_one_scan():
+    lexicon = ViolenceAnalyzer(ProcessingConfig()).lexicon
+    assert lexicon.detect_violence_patterns("Danos no armário. Paciente de 30 anos.").pattern_severity_score == 0
+
+    text = "Gestante, foi espancada pelo companheiro. Ele controla o dinheiro e as agressões estão cada vez piores."
+    result = ViolenceAnalyzer(ProcessingConfig()).analyze_raw_text(text)
+    patterns = result.violence_patterns
+    assert patterns.pregnancy_violence and patterns.economic_abuse and not patterns.weapons_involved
+    assert max(d.intensity_multiplier for d in result.detections) == 1.5
+
+def test_cli_text_outputs_json(tmp_path, capsys):
+    note = tmp_path / "nota.txt"
+    note.write_text(NOTE, encoding="utf-8")
+    assert main(["texto", str(note)]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["status"] == "sucesso"
+    assert result["text_content"]["text"] is None
+
+def test_cli_import_does_not_load_heavy_backends():
+    code = (
+        "import sys, src.cli, src.analyzer; "
+        "print(sorted(m for m in ('fitz', 'pdfplumber', 'pytesseract', 'pdf2image', 'pandas', 'numpy') "
+        "if m in sys.modules))"
+    )
+    cwd = Path(__file__).absolute().parent.parent
+    output = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
+
+class TextFileFitz:
+    """PyMuPDF que lê "PDFs" de texto puro (páginas separadas por \\f) e registra o processo que abriu"""
+
+    def __init__(self, pids_path: Path):
+        self.pids_path = pids_path
+
+    def open(self, path):
+        with open(self.pids_path, "a") as file:
+            file.write(f"{os.getpid()}\n")
+        time.sleep(0.1)  # Mantém o primeiro worker ocupado para que o outro receba arquivos
+        text = Path(path).read_text(encoding="utf-8")
+        if not text.startswith("Evolução"):
+            raise RuntimeError("arquivo corrompido")
+        return _TextDocument(text.split("\f"))
+
+class _TextDocument(list):
+    def load_page(self, index):
+        text = self[index]
+        return type("Page", (), {"get_text": lambda page: text, "rect": (0, 0, 595, 842), "rotation": 0})()
+
+    def close(self):
+        pass
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="os workers herdam o backend falso apenas com fork")
+def test_batch_processor_fans_out_keeps_order_and_reports_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractor_module, "_backends", {
+        "fitz": TextFileFitz(tmp_path / "pids"), "pdfplumber": None,
+        "pytesseract": None, "pdf2image": None, "PIL.Image": None,
+    })
+    generator = SyntheticNoteGenerator(ExpandedViolenceLexicon().categories, seed=3)
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+    for i in range(6):
+        text = "Evolução Médica\n" + generator.note(1500).text + "\f" + generator.note(1500).text
+        (folder / f"doc{i}.pdf").write_text("ilegível" if i == 4 else text, encoding="utf-8")
+
+    config = ProcessingConfig(enable_parallel_processing=True, term_counts_path=str(tmp_path / "termos.npz"))
+    processor = BatchProcessor(config, max_workers=2)
+    results = processor.process_folder(folder)
+
+    assert [r.patient_id.filename for r in results] == [f"doc{i}.pdf" for i in range(6)]
+    assert [r.status for r in results] == ["sucesso"] * 4 + ["pdf_corrompido", "sucesso"]
+    assert "arquivo corrompido" in results[4].error_message
+    assert all(r.detections and r.text_content.page_count == 2 for r in results if r.status == "sucesso")
+    worker_pids = set((tmp_path / "pids").read_text().split())
+    assert len(worker_pids) == 2 and str(os.getpid()) not in worker_pids
+    # A matriz documento × termo é gravada ao fim da pasta, só com os documentos bem-sucedidos
+    matrix = TermCountMatrix.load(config.term_counts_path)
+    assert list(matrix.doc_ids) == [r.patient_id.document_hash for r in results if r.status == "sucesso"]
+
+    serial = BatchProcessor(ProcessingConfig(), max_workers=1).process_folder(folder)
+    assert [r.total_score for r in serial] == [r.total_score for r in results]
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="os workers herdam o backend falso apenas com fork")
+def test_batch_processor_links_copies_across_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractor_module, "_backends", {
+        "fitz": TextFileFitz(tmp_path / "pids"), "pdfplumber": None,
+        "pytesseract": None, "pdf2image": None, "PIL.Image": None,
+    })
+    generator = SyntheticNoteGenerator(ExpandedViolenceLexicon().categories, seed=5)
+    notes = ["Evolução Médica\n" + generator.note(1500).text for _ in range(3)]
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+    # Lotes de dois arquivos por worker: a cópia de doc0 vai para o outro worker
+    for i, text in enumerate([notes[0], notes[1], notes[0], notes[2]]):
+        (folder / f"doc{i}.pdf").write_text(text, encoding="utf-8")
+
+    config = ProcessingConfig(enable_parallel_processing=True, enable_near_duplicates=True)
+    results = BatchProcessor(config, max_workers=2).process_folder(folder)
+
+    assert len(set((tmp_path / "pids").read_text().split())) == 2
+    assert [r.duplicate_of for r in results] == [None, None, results[0].patient_id.document_hash, None]
+    assert results[2].duplicate_similarity == 1.0 and results[2].total_score == results[0].total_score
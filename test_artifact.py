@@ -0,0 +1,39 @@
+import json
+
+from src.analyzer import ViolenceAnalyzer
+from src.artifact import build_artifact, lexicon_version, load_artifact, load_or_build, main
+from src.config import ProcessingConfig
+from src.detector import ViolenceDetector
+from src.lexicon import get_lexicon
+
+def test_artifact_round_trip_and_rebuild(tmp_path):
+    lexicon_path = tmp_path / "violence_terms.json"
+    lexicon_path.write_text(json.dumps(get_lexicon(), ensure_ascii=False), encoding="utf-8")
+    artifact_path = tmp_path / "lexicon.artifact"
+
+    built = build_artifact(get_lexicon(), artifact_path)
+    loaded = load_artifact(artifact_path)
+    assert loaded.version == built.version == lexicon_version(get_lexicon())
+    assert load_artifact(artifact_path) is loaded
+
+    text = "Paciente sofreu trauma contundente e lesão corporal."
+    assert ViolenceDetector(artifact_path).analyze(text) == ViolenceDetector().analyze(text)
+
+    changed = {**get_lexicon(), "extra": {"weight": 1.0, "terms": ["empurrão"]}}
+    rebuilt = load_or_build(changed, artifact_path)
+    assert rebuilt.version != built.version
+    assert load_artifact(artifact_path).version == rebuilt.version
+
+def test_cli_built_artifact_is_loaded_by_the_engine_without_rebuild(tmp_path):
+    lexicon_path = tmp_path / "violence_terms.json"
+    lexicon_path.write_text(json.dumps(get_lexicon(), ensure_ascii=False), encoding="utf-8")
+    artifact_path = tmp_path / "lexicon.artifact"
+    main([str(lexicon_path), str(artifact_path)])
+    built_at = artifact_path.stat().st_mtime_ns
+
+    config = ProcessingConfig(lexicon_path=str(lexicon_path), lexicon_artifact_path=str(artifact_path))
+    result = ViolenceAnalyzer(config).analyze_raw_text("Paciente sofreu trauma contundente e lesão corporal.")
+
+    assert artifact_path.stat().st_mtime_ns == built_at
+    assert result.lexicon_version == load_artifact(artifact_path).version
+    assert result.detections
@@ -0,0 +1,26 @@
+import os
+
+from src.cache import ExtractionCache
+
+def test_cache_roundtrip(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4 conteudo")
+    cache = ExtractionCache(tmp_path / "cache")
+    key = ExtractionCache.make_key(pdf, "2.1", {"ocr_threshold": 100})
+
+    assert cache.get(key) is None
+    cache.put(key, {"text": "violência", "pages": [1, 2]})
+    assert cache.get(key) == {"text": "violência", "pages": [1, 2]}
+    assert key != ExtractionCache.make_key(pdf, "2.2", {"ocr_threshold": 100})
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(tmp_path, max_size_mb=0)
+    cache.max_size_bytes = 1000
+    payload = {"text": os.urandom(600).hex()}
+
+    cache.put("a" * 64, payload)
+    os.utime(cache._path_for("a" * 64), (1, 1))
+    cache.put("b" * 64, payload)
+
+    assert cache.get("a" * 64) is None
+    assert cache.get("b" * 64) == payload
@@ -0,0 +1,28 @@
+from src.compact import ResultBatch
+from src.models import StageMetrics, TextContent, ViolenceDetection, ViolencePatterns
+
+def test_result_batch_roundtrip(make_result):
+    text = "Paciente refere soco e fratura nasal."
+    detections = [
+        ViolenceDetection("soco", "colloquial_popular", 1.8, 1.8, "", 16, 20, page_number=1),
+        ViolenceDetection("fratura nasal", "medical_formal", 2.8, 2.8, "", 23, 36, page_number=1),
+    ]
+    batch = ResultBatch()
+    for rows in (detections, detections[:1]):
+        result = make_result(text=text, detections=rows, violence_patterns=ViolencePatterns(weapons_involved=True))
+        result.metrics = StageMetrics({"terms": 2.0}, {"term_hits": len(rows)})
+        batch.add(result)
+
+    assert len(batch.detections) == 3
+    assert list(batch.detections.column("doc")) == [0, 0, 1]
+    assert len(batch.categories) == 2
+
+    view = batch.to_analysis_result(0, TextContent(text, 1, "fitz", "boa", len(text), 6))
+    assert [d.term for d in view.detections] == ["soco", "fratura nasal"]
+    assert view.detections[1].context_phrase == text
+    assert view.category_counts == {"colloquial_popular": 1, "medical_formal": 1}
+    assert view.category_scores == {"colloquial_popular": 1.8, "medical_formal": 2.8}
+    assert view.violence_patterns.weapons_involved and not view.violence_patterns.chronic_violence
+    assert batch.to_analysis_result(1).status == "sucesso"
+    # As métricas por etapa ficam somadas no lote, não em cada registro
+    assert batch.metrics.counters == {"term_hits": 3} and batch.metrics.timings_ms == {"terms": 4.0}
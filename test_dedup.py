@@ -0,0 +1,57 @@
+from src.analyzer import ViolenceAnalyzer
+from src.config import ProcessingConfig
+from src.dedup import NearDuplicateIndex
+from src.expanded_lexicon import ExpandedViolenceLexicon
+from src.synthetic import SyntheticNoteGenerator
+
+BASE = "Evolução Médica 02/05/2024. " + SyntheticNoteGenerator(ExpandedViolenceLexicon().categories).note(3000).text
+
+def test_index_finds_near_duplicates_only():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("a", index.signature(BASE), "original")
+    assert index.query(index.signature(BASE + " Reavaliar amanhã."))[0] == "a"
+    assert index.query(index.signature("Paciente com dor lombar crônica, sem outras queixas.")) is None
+
+def _fields(result):
+    return [(d.term, d.position_start, d.position_end, d.context_phrase, d.page_number, d.adjusted_weight)
+            for d in result.detections]
+
+def test_analyzer_reuses_detections_only_for_identical_normalized_text():
+    analyzer = ViolenceAnalyzer(ProcessingConfig(enable_near_duplicates=True))
+    original = analyzer.analyze_raw_text(BASE, "nota1.txt")
+    # Mesma nota com espaços e caixa diferentes: mesmo texto normalizado, posições deslocadas
+    text = "  " + BASE.replace(". ", ".   ").upper()
+    copy = analyzer.analyze_raw_text(text, "nota2.txt")
+    fresh = ViolenceAnalyzer(ProcessingConfig()).analyze_raw_text(text, "nota2.txt")
+
+    assert original.duplicate_of is None
+    assert copy.duplicate_of == original.patient_id.document_hash
+    assert copy.metrics.counters["duplicates_reused"] == 1
+    assert _fields(copy) == _fields(fresh) != _fields(original)
+    assert copy.context_phrases == fresh.context_phrases
+    assert copy.total_score == fresh.total_score
+
+def test_near_duplicates_are_reanalyzed_and_linked():
+    analyzer = ViolenceAnalyzer(ProcessingConfig(enable_near_duplicates=True))
+    original = analyzer.analyze_raw_text(BASE, "nota1.txt")
+    copy = analyzer.analyze_raw_text(BASE.replace("02/05/2024", "03/05/2024"), "nota2.txt")
+
+    assert copy.duplicate_of == original.patient_id.document_hash
+    assert "duplicates_reused" not in copy.metrics.counters
+    assert copy.metrics.counters["near_duplicates"] == 1
+    assert copy.total_score == original.total_score
+    assert {d.document_date for d in copy.detections} == {"03/05/2024"}
+
+def test_new_disclosure_in_copied_note_is_detected():
+    clean = "Evolução Médica 02/05/2024. " + SyntheticNoteGenerator(
+        ExpandedViolenceLexicon().categories, seed=11).note(3000).text
+    addition = " Hoje relata que foi espancada pelo companheiro com fratura de mandíbula."
+    analyzer = ViolenceAnalyzer(ProcessingConfig(enable_near_duplicates=True))
+    original = analyzer.analyze_raw_text(clean, "nota1.txt")
+    copy = analyzer.analyze_raw_text(clean + addition, "nota2.txt")
+    fresh = ViolenceAnalyzer(ProcessingConfig()).analyze_raw_text(clean + addition, "nota2.txt")
+
+    assert copy.duplicate_of == original.patient_id.document_hash
+    assert copy.total_score == fresh.total_score > original.total_score
+    assert copy.severity_level == fresh.severity_level
+    assert _fields(copy) == _fields(fresh)
@@ -0,0 +1,30 @@
+import re
+
+from src.expanded_lexicon import ExpandedViolenceLexicon
+from src.normalize import normalize_text
+from src.synthetic import SyntheticNoteGenerator
+
+def test_negation_index_matches_per_hit_regex_search():
+    lexicon = ExpandedViolenceLexicon()
+    # Forma anterior: pista + alcance buscados nos 150 caracteres antes de cada ocorrência
+    per_hit_patterns = [re.compile(cue.pattern + lexicon.negation_scope.pattern) for cue in lexicon.negation_patterns]
+
+    outcomes = []
+    for seed in range(20):
+        note = SyntheticNoteGenerator(lexicon.categories, seed=seed).note(4000, negation_rate=0.1)
+        buffer = normalize_text(note.text).text
+        negation_index = lexicon.build_negation_index(buffer)
+        for _, _, start, end in lexicon.find_term_matches(buffer):
+            before = buffer[max(0, start - 150):end]
+            expected = any(pattern.search(before) for pattern in per_hit_patterns)
+            assert lexicon.detect_negation_context(buffer, start, end, negation_index) == expected, buffer[start:end]
+            outcomes.append(expected)
+
+    assert len(outcomes) > 500 and any(outcomes) and not all(outcomes)
+
+def test_longest_term_wins_within_a_category():
+    lexicon = ExpandedViolenceLexicon()
+    text = "Vítima de estupro de vulnerável e de lesão corporal leve. Dias depois, nova ameaça de morte e outra ameaça."
+    terms = [d.term for d in lexicon.find_detections(text) if d.category == "legal_police"]
+
+    assert terms == ["estupro de vulnerável", "lesão corporal leve", "ameaça de morte", "ameaça"]
@@ -0,0 +1,259 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src import extractor as extractor_module
+from src.config import ProcessingConfig, QualityLevel
+from src.extractor import EnhancedTextExtractor, _text_from_ocr_data
+
+FILLER = "paciente em acompanhamento ambulatorial, sem intercorrências no período observado"
+
+def _page_text(label: str) -> str:
+    return f"{label} {FILLER} {FILLER}"
+
+class FakePage:
+    """Página rasterizada: os pixels dependem só do texto e da resolução"""
+
+    def __init__(self, text: str, dpi: int):
+        self.text = text
+        self.dpi = dpi
+        self.mode = "L"
+        self.size = (dpi * 8, dpi * 11)
+
+    def tobytes(self) -> bytes:
+        return f"{self.text}@{self.dpi}".encode("utf-8")
+
+    def histogram(self):
+        dark = 200 if self.text else 0
+        return [dark] + [0] * 254 + [10000 - dark]
+
+class FakePdf2Image:
+    def __init__(self, documents):
+        self.documents = documents  # nome do arquivo -> texto de cada página
+        self.renders = []
+        self.recognized = 0
+        self.max_outstanding = 0
+
+    def pdfinfo_from_path(self, path):
+        return {"Pages": len(self.documents[Path(path).name])}
+
+    def convert_from_path(self, pdf_path, dpi, first_page, last_page, grayscale=False):
+        assert grayscale and first_page == last_page
+        self.renders.append((Path(pdf_path).name, first_page, dpi))
+        self.max_outstanding = max(self.max_outstanding, len(self.renders) - self.recognized)
+        return [FakePage(self.documents[Path(pdf_path).name][first_page - 1], dpi)]
+
+class FakeTesseract:
+    class Output:
+        DICT = "dict"
+
+    def __init__(self, pdf2image: FakePdf2Image, confidence=None, failing=(), delay=0.0):
+        self.pdf2image = pdf2image
+        self.confidence = confidence or {}  # dpi -> confiança; 95 por padrão
+        self.failing = set(failing)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def image_to_data(self, image, lang, output_type):
+        assert lang == "por" and output_type == self.Output.DICT
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append((image.text.split()[0], image.dpi))
+            self.pdf2image.recognized += 1
+        if image.text in self.failing:
+            raise RuntimeError("tesseract falhou")
+        words = image.text.split()
+        confidence = self.confidence.get(image.dpi, 95)
+        return {
+            'text': words, 'conf': [confidence] * len(words),
+            'block_num': [1] * len(words), 'par_num': [1] * len(words), 'line_num': [1] * len(words),
+        }
+
+@pytest.fixture
+def ocr_backend(monkeypatch, tmp_path):
+    """Instala PDFs falsos (só OCR, via pdf2image) e devolve (pdf2image, tesseract, caminho de cada PDF)"""
+    def install(documents, **tesseract_options):
+        pdf2image = FakePdf2Image(documents)
+        tesseract = FakeTesseract(pdf2image, **tesseract_options)
+        monkeypatch.setattr(extractor_module, "_backends", {
+            "fitz": None, "pdfplumber": None, "pytesseract": tesseract,
+            "pdf2image": pdf2image, "PIL.Image": object(),
+        })
+        paths = {}
+        for name in documents:
+            paths[name] = tmp_path / name
+            paths[name].write_bytes(b"%PDF-1.4")
+        return pdf2image, tesseract, paths
+    return install
+
+def test_text_from_ocr_data_keeps_lines_and_paragraphs():
+    data = {
+        'text': ["", "Paciente", "relata", "agressão", "", "Nega", "~"],
+        'conf': [-1, 96, 90, 84, -1, 92, 10],
+        'block_num': [1, 1, 1, 1, 1, 2, 2],
+        'par_num': [1, 1, 1, 1, 1, 1, 1],
+        'line_num': [0, 1, 1, 2, 2, 1, 1],
+    }
+    text, confidence = _text_from_ocr_data(data)
+    assert text == "Paciente relata\nagressão\n\nNega ~"
+    assert 80 < confidence < 95
+
+def test_ocr_confidence_lowers_quality():
+    extractor = EnhancedTextExtractor(ProcessingConfig())
+    text = "Paciente relata agressão pelo companheiro."
+    assert extractor._assess_text_quality(text) == QualityLevel.EXCELLENT
+    assert extractor._assess_text_quality(text, 84.0) == QualityLevel.GOOD
+    assert extractor._assess_text_quality(text, 40.0) == QualityLevel.POOR
+
+def test_low_ocr_confidence_reaches_quality_and_metadata(ocr_backend):
+    _, _, paths = ocr_backend({"a.pdf": [_page_text("um"), _page_text("dois")]}, confidence={150: 40, 300: 40})
+    text_content = EnhancedTextExtractor(ProcessingConfig()).extract_from_pdf(paths["a.pdf"])
+
+    assert text_content.metadata["ocr_confidence"] == 40.0
+    assert text_content.quality_level == QualityLevel.POOR.value
+    assert all(page_info.page_metadata['page_class'] == 'baixa_confianca' for page_info in text_content.pages_info)
+
+def test_triage_rerenders_only_low_confidence_pages_and_skips_blank(ocr_backend):
+    pdf2image, _, paths = ocr_backend({"a.pdf": [_page_text("um"), "", _page_text("tres")]},
+                                      confidence={150: 95, 300: 97})
+    text_content = EnhancedTextExtractor(ProcessingConfig()).extract_from_pdf(paths["a.pdf"])
+
+    assert [dpi for _, _, dpi in pdf2image.renders] == [150, 150, 150]
+    assert text_content.metadata["pages_processed"] == [1, 3]
+    assert text_content.metadata["ocr_confidence"] == 95.0
+    assert text_content.quality_level == QualityLevel.EXCELLENT.value
+
+def test_page_cache_hit_across_documents(ocr_backend):
+    _, tesseract, paths = ocr_backend({
+        "a.pdf": [_page_text("capa"), _page_text("evolucao")],
+        "b.pdf": [_page_text("capa"), _page_text("prescricao")],
+    })
+    extractor = EnhancedTextExtractor(ProcessingConfig())
+    extractor.extract_from_pdf(paths["a.pdf"])
+    text_content = extractor.extract_from_pdf(paths["b.pdf"])
+
+    assert [word for word, _ in tesseract.calls] == ["capa", "evolucao", "prescricao"]
+    assert [page_info.page_metadata['ocr_cached'] for page_info in text_content.pages_info] == [True, False]
+    assert text_content.get_page_text(1).startswith("capa")
+
+def test_page_cache_hit_within_a_document(ocr_backend):
+    _, tesseract, paths = ocr_backend({
+        "a.pdf": [_page_text("termo"), _page_text("dois"), _page_text("tres"), _page_text("termo")],
+    }, delay=0.01)
+    text_content = EnhancedTextExtractor(ProcessingConfig(ocr_workers=2)).extract_from_pdf(paths["a.pdf"])
+
+    assert sorted(word for word, _ in tesseract.calls) == ["dois", "termo", "tres"]
+    assert text_content.metadata["pages_processed"] == [1, 2, 3, 4]
+    assert text_content.get_page_text(4) == text_content.get_page_text(1)
+    assert text_content.pages_info[3].page_metadata['ocr_cached']
+
+def test_page_cache_evicts_least_recently_used(ocr_backend):
+    _, tesseract, paths = ocr_backend({"a.pdf": [_page_text("um")], "b.pdf": [_page_text("dois")]})
+    extractor = EnhancedTextExtractor(ProcessingConfig(ocr_page_cache_entries=1))
+    for name in ("a.pdf", "b.pdf", "b.pdf", "a.pdf"):
+        extractor.extract_from_pdf(paths[name])
+
+    assert [word for word, _ in tesseract.calls] == ["um", "dois", "um"]
+
+def test_ocr_window_bounds_pages_in_memory_and_keeps_order(ocr_backend):
+    labels = [f"pagina{number}" for number in range(1, 13)]
+    pdf2image, tesseract, paths = ocr_backend({"a.pdf": [_page_text(label) for label in labels]}, delay=0.01)
+    config = ProcessingConfig(ocr_workers=2)
+    text_content = EnhancedTextExtractor(config).extract_from_pdf(paths["a.pdf"])
+
+    window = 2 * config.ocr_workers
+    assert 1 < pdf2image.max_outstanding <= window
+    assert len(tesseract.calls) == len(labels)
+    assert [page_info.page_number for page_info in text_content.pages_info] == list(range(1, 13))
+    assert [text_content.get_page_text(number).split()[0] for number in range(1, 13)] == labels
+
+def test_ocr_failure_on_one_page_keeps_the_others(ocr_backend):
+    texts = [_page_text(f"pagina{number}") for number in range(1, 6)]
+    _, _, paths = ocr_backend({"a.pdf": texts}, failing={texts[2]})
+    text_content = EnhancedTextExtractor(ProcessingConfig(ocr_workers=2)).extract_from_pdf(paths["a.pdf"])
+
+    assert text_content.metadata["pages_processed"] == [1, 2, 4, 5]
+    assert text_content.get_page_text(4).startswith("pagina4")
+
+class FakeTextPage:
+    def __init__(self, text: str):
+        self.text = text
+        self.rect = (0, 0, 595, 842)
+        self.rotation = 0
+        self.width, self.height = 595, 842
+
+    def get_text(self) -> str:
+        return self.text
+
+    extract_text = get_text
+
+class FakeFitz:
+    """PyMuPDF (e o documento aberto) com a camada de texto de cada página"""
+
+    def __init__(self, pages):
+        self.pages = [FakeTextPage(text) for text in pages]
+
+    def open(self, path):
+        return self
+
+    def __len__(self):
+        return len(self.pages)
+
+    def load_page(self, index):
+        return self.pages[index]
+
+    def close(self):
+        pass
+
+class RecordingPages(list):
+    """Lista de páginas que registra quais foram lidas"""
+
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.requested = []
+
+    def __getitem__(self, index):
+        self.requested.append(index + 1)
+        return super().__getitem__(index)
+
+class FakePdfplumber:
+    def __init__(self, pages):
+        self.pages = RecordingPages(FakeTextPage(text) for text in pages)
+
+    def open(self, path):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+def test_page_fallback_offsets_and_method_per_page(monkeypatch, tmp_path):
+    short_fitz = "Nota breve: retorno em 7 dias, orientada."
+    fitz = FakeFitz([_page_text("camada"), "", short_fitz])
+    pdfplumber = FakePdfplumber(["", _page_text("plumber"), "retorno 7 dias"])
+    monkeypatch.setattr(extractor_module, "_backends", {
+        "fitz": fitz, "pdfplumber": pdfplumber, "pytesseract": None, "pdf2image": None, "PIL.Image": None,
+    })
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+
+    text_content = EnhancedTextExtractor(ProcessingConfig()).extract_from_pdf(pdf_path)
+
+    # pdfplumber só recebe as páginas que ficaram sem texto suficiente na camada do PyMuPDF
+    assert pdfplumber.pages.requested == [2, 3]
+    assert text_content.extraction_method == "fitz+pdfplumber"
+    assert text_content.metadata["pages_by_method"] == {"fitz": [1, 3], "pdfplumber": [2]}
+    # A página curta fica com o melhor texto entre os métodos
+    assert text_content.get_page_text(3) == short_fitz
+
+    assert text_content.page_starts == [page_info.text_start for page_info in text_content.pages_info]
+    for page_info, expected in zip(text_content.pages_info, (_page_text("camada"), _page_text("plumber"), short_fitz)):
+        assert text_content.text[page_info.text_start:page_info.text_end] == expected
+        assert text_content.text[:page_info.text_start].endswith(f"--- PÁGINA {page_info.page_number} ---\n")
+        assert text_content.page_number_at(page_info.text_start) == page_info.page_number
+    assert text_content.quality_level == QualityLevel.EXCELLENT.value
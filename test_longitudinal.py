@@ -0,0 +1,56 @@
+from src.analyzer import ViolenceAnalyzer
+from src.config import ProcessingConfig
+from src.longitudinal import PatientIndex
+
+NOTES = [
+    "Evolução 10/01/2024. Relata empurrão do companheiro.",
+    "Evolução 15/03/2024. Relata espancamento e hematoma periorbital.",
+    "Evolução 20/06/2024. Espancamento, fratura de mandíbula, lesão corporal grave e ameaça de morte.",
+]
+
+def test_index_folds_history_and_flags_escalation(tmp_path):
+    analyzer = ViolenceAnalyzer(ProcessingConfig())
+    results = [analyzer.analyze_raw_text(note, "paciente_a.txt") for note in NOTES]
+    assert results[0].total_score < results[1].total_score < results[2].total_score
+
+    index = PatientIndex(tmp_path / "pacientes.jsonl")
+    index.add_results(results[:2])
+    index.add_results(results[2:] + results[:1])  # Documento repetido não conta de novo
+
+    history = index.get(results[0].patient_id.patient_id)
+    assert (history.documents, history.episodes, history.span_days) == (3, 3, 162)
+    assert index.is_chronic(history) and index.is_escalating(history)
+    assert results[2].violence_patterns.chronic_violence and results[2].violence_patterns.escalation_pattern
+    assert not results[1].violence_patterns.escalation_pattern
+
+    reloaded = PatientIndex(tmp_path / "pacientes.jsonl")
+    assert reloaded.summary(reloaded.get(history.patient_id)) == index.summary(history)
+
+def test_index_file_stays_compact_and_dedups_per_patient(tmp_path):
+    analyzer = ViolenceAnalyzer(ProcessingConfig())
+    index_path = tmp_path / "pacientes.jsonl"
+    index = PatientIndex(index_path)
+    for day in range(1, 29):
+        index.add_results([analyzer.analyze_raw_text(f"Evolução {day:02d}/02/2024. Relata empurrão.", "paciente_a.txt")])
+    # O mesmo texto arquivado para outro paciente entra no histórico dele
+    index.add_results([analyzer.analyze_raw_text("Evolução 01/02/2024. Relata empurrão.", "paciente_b.txt")])
+
+    assert len(index_path.read_text().splitlines()) <= 2 * len(index)
+    assert [history.documents for history in index] == [28, 1]
+    reloaded = PatientIndex(index_path)
+    assert [reloaded.summary(history) for history in reloaded] == [index.summary(history) for history in index]
+
+def test_documents_with_different_names_share_the_patient_code(tmp_path):
+    analyzer = ViolenceAnalyzer(ProcessingConfig())
+    names = ["evolucao_jan.pdf", "pronto_socorro_mar.pdf", "ambulatorio_jun.pdf"]
+    results = [analyzer.analyze_raw_text(f"RGHC: 1234567-A\n{note}", name) for note, name in zip(NOTES, names)]
+    other = analyzer.analyze_raw_text("Evolução 10/01/2024. Relata empurrão.", "evolucao_jan.pdf")
+    assert len({result.patient_id.patient_id for result in results}) == 1
+    assert other.patient_id.patient_id != results[0].patient_id.patient_id  # Sem código, vale o nome do arquivo
+
+    index = PatientIndex(tmp_path / "pacientes.jsonl")
+    index.add_results(results + [other])
+
+    assert len(index) == 2
+    assert index.is_chronic(index.get(results[0].patient_id.patient_id))
+    assert results[2].violence_patterns.chronic_violence
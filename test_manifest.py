@@ -0,0 +1,32 @@
+import os
+
+from src.manifest import ProcessingManifest
+
+def test_manifest_skips_unchanged_and_resumes(tmp_path):
+    done = tmp_path / "a.pdf"
+    failed = tmp_path / "b.pdf"
+    pending = tmp_path / "c.pdf"
+    for path in (done, failed, pending):
+        path.write_bytes(path.name.encode())
+
+    manifest = ProcessingManifest(tmp_path / "manifest.jsonl")
+    manifest.record(done, "sucesso", "v1", output_location="out.jsonl")
+    manifest.record(failed, "erro_processamento", "v1")
+
+    reloaded = ProcessingManifest(tmp_path / "manifest.jsonl")
+    assert not reloaded.needs_processing(done, "v1")
+    assert reloaded.needs_processing(done, "v2")
+    assert reloaded.needs_processing(failed, "v1")
+    assert reloaded.needs_processing(pending, "v1")
+
+    os.utime(done, (1, 1))
+    assert not reloaded.needs_processing(done, "v1")
+    done.write_bytes(b"outro conteudo")
+    assert reloaded.needs_processing(done, "v1")
+
+    # A nova data foi anexada como outra linha; a compactação mantém uma por arquivo
+    manifest_lines = (tmp_path / "manifest.jsonl").read_text().splitlines()
+    assert len(manifest_lines) == 3
+    reloaded.compact()
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 2
+    assert ProcessingManifest(tmp_path / "manifest.jsonl").entries == reloaded.entries
@@ -0,0 +1,37 @@
+from src.detector import ViolenceDetector
+from src.matcher import TermMatcher
+
+def test_find_all_reports_offsets():
+    matcher = TermMatcher([("trauma contundente", "a"), ("trauma", "b")])
+    text = "Paciente com Trauma contundente."
+    matches = matcher.find_all(text)
+    assert [(m.term, m.start, m.end) for m in matches] == [
+        ("trauma contundente", 13, 31),
+        ("trauma", 13, 19),
+    ]
+    assert text[13:31] == "Trauma contundente"
+
+def test_find_all_respects_word_boundaries():
+    matcher = TermMatcher([("tapa", "x"), ("B.O.", "y")])
+    assert matcher.find_all("nova etapa do tratamento") == []
+    assert [m.term for m in matcher.find_all("levou um tapa; registrou B.O.")] == ["tapa", "b.o."]
+
+def test_analyze_returns_positions():
+    detector = ViolenceDetector()
+    text = "Paciente sofreu trauma contundente e lesão corporal."
+    result = detector.analyze(text)
+    assert {r["term"] for r in result} == {"trauma contundente", "lesão corporal"}
+    for r in result:
+        assert text[r["start"]:r["end"]].lower() == r["term"].lower()
+
+def test_analyze_many_matches_analyze():
+    detector = ViolenceDetector()
+    documents = [(i, f"Nota {i}: hematoma e fratura; lesão corporal.") for i in range(50)]
+    expected = [(doc_id, detector.analyze(text)) for doc_id, text in documents]
+    assert list(detector.analyze_many(iter(documents))) == expected
+    assert list(detector.analyze_many(iter(documents), workers=2, chunksize=4)) == expected
+
+def test_prefix_terms_match_whole_words():
+    matcher = TermMatcher([("agred*", "x")])
+    assert [(m.start, m.end) for m in matcher.find_all_normalized("foi agredida ontem")] == [(4, 12)]
+    assert matcher.find_all_normalized("desagredida") == []
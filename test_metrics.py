@@ -0,0 +1,27 @@
+from src.analyzer import ViolenceAnalyzer
+from src.config import ProcessingConfig
+from src.metrics import RunMetrics
+
+def test_result_metrics_aggregate_and_export(tmp_path):
+    analyzer = ViolenceAnalyzer(ProcessingConfig())
+    text = "Paciente nega espancamento. Relata que o marido sempre a agride; apresenta hematoma periorbital."
+    result = analyzer.analyze_raw_text(text)
+    assert {"normalize", "terms", "negation", "context", "patterns"} <= set(result.metrics.timings_ms)
+    assert result.metrics.counters["negated_hits"] == len(result.negated_terms) > 0
+    # Só "nega" é pista: "sem" não casa dentro de "sempre"
+    assert result.metrics.counters["negation_cue_matches"] == 1
+    assert analyzer.analyze_raw_text("Sem queixas.").metrics.counters["negation_cue_matches"] == 1
+
+    run = RunMetrics()
+    run.add_result(result)
+    run.add_result(analyzer.analyze_raw_text(text))
+    run.add_time("write", 0.002)
+    assert run.documents == 2
+    assert run.counters["term_hits"] == 2 * result.metrics.counters["term_hits"]
+
+    run.export(tmp_path / "run.prom")
+    prometheus = (tmp_path / "run.prom").read_text()
+    assert 'nuve_documents_total{status="sucesso"} 2' in prometheus
+    assert 'nuve_stage_seconds_total{stage="write"} 0.002000' in prometheus
+    run.export(tmp_path / "run.json")
+    assert '"documents": 2' in (tmp_path / "run.json").read_text()
@@ -0,0 +1,20 @@
+from src.models import PageInfo, TextContent
+
+def test_text_content_page_slices_and_lookup():
+    text = "\n--- PÁGINA 1 ---\nprimeira\n\n--- PÁGINA 3 ---\nterceira\n"
+    first = text.index("primeira")
+    third = text.index("terceira")
+    content = TextContent(
+        text=text, page_count=3, extraction_method="fitz", quality_level="boa",
+        char_count=len(text), word_count=6,
+        pages_info=[
+            PageInfo(1, "", text_start=first, text_end=first + 8),
+            PageInfo(3, "", text_start=third, text_end=third + 8),
+        ],
+        page_starts=[first, third],
+    )
+    assert content.get_page_text(3) == "terceira"
+    assert content.get_page_text(2) == ""
+    assert content.page_number_at(0) == 0
+    assert content.page_number_at(first + 2) == 1
+    assert content.page_number_at(third + 7) == 3
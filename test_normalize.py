@@ -0,0 +1,17 @@
+from src.matcher import TermMatcher
+from src.normalize import normalize_text
+
+def test_normalize_text_maps_offsets():
+    text = "Paciente  refere\n\nVIOLÊNCIA doméstica"
+    normalized = normalize_text(text)
+    assert normalized.text == "paciente refere violencia domestica"
+    start = normalized.text.index("violencia domestica")
+    original_start, original_end = normalized.to_original(start, len(normalized.text))
+    assert text[original_start:original_end] == "VIOLÊNCIA doméstica"
+    assert normalized.to_normalized(original_start) == start
+
+def test_matcher_ignores_accents_and_spacing():
+    matcher = TermMatcher([("violência doméstica", "x")])
+    text = "relata violencia \n domestica há anos"
+    [match] = matcher.find_all(text)
+    assert text[match.start:match.end] == "violencia \n domestica"
@@ -0,0 +1,32 @@
+import asyncio
+import os
+
+from src.config import ProcessingConfig
+from src.manifest import ProcessingManifest
+from src.pipeline import StagedPipeline
+from src.writers import JsonlResultWriter
+
+def test_pipeline_writes_and_records_every_file(tmp_path):
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+    for i in range(7):
+        (folder / f"doc{i}.pdf").write_bytes(b"%PDF-1.4 falso " + bytes([i]))
+    (folder / "notas.txt").write_text("ignorado")
+
+    config = ProcessingConfig(batch_size=3)
+    manifest = ProcessingManifest(tmp_path / "manifest.jsonl", completed_statuses=("erro_processamento",))
+    pipeline = StagedPipeline(config, max_workers=2, queue_size=1)
+    with JsonlResultWriter(tmp_path / "out") as writer:
+        counts = asyncio.run(pipeline.run(folder, manifest, str(tmp_path / "out"), writer))
+
+    assert sum(counts.values()) == 7
+    assert len((tmp_path / "out" / "documents.jsonl").read_text().splitlines()) == 7
+    assert len(manifest.entries) == 7
+
+    # Segunda execução: o manifesto dispensa todos os arquivos
+    assert asyncio.run(pipeline.run(folder, manifest)) == {}
+
+    # Uma nova cópia (só a data muda) é dispensada pelo conteúdo, e o manifesto termina compactado
+    os.utime(folder / "doc0.pdf", (1, 1))
+    assert asyncio.run(pipeline.run(folder, manifest)) == {}
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 7
@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.config import severity_label
+from src.models import ViolenceDetection
+from src.scoring import TermCountMatrix, TermCountMatrixBuilder
+
+def _detection(term, category, weight, intensity=1.0):
+    return ViolenceDetection(term, category, weight, weight * intensity, "", 0, 1,
+                             intensity_multiplier=intensity)
+
+def test_rescore_matches_per_document_scoring(tmp_path):
+    builder = TermCountMatrixBuilder("v1")
+    builder.add_document("a", [_detection("soco", "colloquial_popular", 1.8, 1.5),
+                               _detection("soco", "colloquial_popular", 1.8),
+                               _detection("fratura nasal", "medical_formal", 2.8)],
+                         negated_terms=[("tapa", "colloquial_popular")], pattern_severity_score=1.8)
+    builder.add_document("b", [], negated_terms=[("soco", "colloquial_popular")])
+    path = tmp_path / "counts.npz"
+    builder.build().save(path)
+    matrix = TermCountMatrix.load(path)
+
+    weights = {"colloquial_popular": 1.8, "medical_formal": 2.8}
+    scores = matrix.rescore(weights)
+    assert matrix.lexicon_version == "v1"
+    assert scores["total_score"] == pytest.approx([1.8 * 2.5 + 2.8 + 1.8, 0.0])
+    assert scores["base_score"] == pytest.approx([1.8 * 2 + 2.8, 0.0])
+    assert list(scores["severity_level"]) == [severity_label(9.1), severity_label(0.0)]
+
+    negated = matrix.rescore({"colloquial_popular": 2.0}, include_negated=True)
+    assert negated["total_score"] == pytest.approx([2.0 * 3.5 + 1.8, 2.0])
+
+    combined = TermCountMatrix.concatenate([matrix, matrix])
+    assert combined.shape == (4, 3)
+    assert combined.rescore(weights)["total_score"] == pytest.approx(np.tile(scores["total_score"], 2))
+
+def test_incremental_save_appends_and_replaces_documents(tmp_path):
+    path = tmp_path / "counts.npz"
+    first = TermCountMatrixBuilder("v1")
+    first.add_document("a", [_detection("soco", "colloquial_popular", 1.8)])
+    first.add_document("b", [_detection("tapa", "colloquial_popular", 1.5)])
+    first.save(path)
+
+    # Execução incremental: "b" foi reprocessado e "c" é novo
+    second = TermCountMatrixBuilder("v1")
+    second.add_document("b", [_detection("fratura nasal", "medical_formal", 2.8)])
+    second.add_document("c", [])
+    second.save(path)
+    matrix = TermCountMatrix.load(path)
+    assert list(matrix.doc_ids) == ["a", "b", "c"]
+    assert matrix.rescore({"colloquial_popular": 1.8, "medical_formal": 2.8})["total_score"] == pytest.approx(
+        [1.8, 2.8, 0.0])
+
+    # Com outro léxico, a matriz anterior não é comparável e é substituída
+    third = TermCountMatrixBuilder("v2")
+    third.add_document("c", [])
+    third.save(path)
+    assert list(TermCountMatrix.load(path).doc_ids) == ["c"]
+
+def test_severity_label_thresholds():
+    assert severity_label(0) == "SEM INDICAÇÃO"
+    assert severity_label(1.9) == "MÍNIMO"
+    assert severity_label(6) == "MODERADO"
+    assert severity_label(25) == "CRÍTICO"
@@ -0,0 +1,38 @@
+import json
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import ProcessingConfig
+from src.server import DetectionService, make_server
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=payload, method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def test_service_batches_concurrent_requests():
+    service = DetectionService(ProcessingConfig(), workers=0, batch_window=0.05)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        texts = [f"Paciente relata espancamento pelo companheiro ({i})." for i in range(8)]
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(
+                lambda i: _post(f"{base}/analisar", json.dumps({"text": texts[i], "name": f"nota{i}"}).encode()),
+                range(8)
+            ))
+        assert [len(result["detections"]) > 0 for result in results] == [True] * 8
+
+        batch = _post(f"{base}/lote", json.dumps({"texts": [{"text": "Sem queixas."}, {"text": texts[0]}]}).encode())
+        assert [len(result["detections"]) > 0 for result in batch] == [False, True]
+
+        assert _post(f"{base}/pdf?name=falso.pdf", b"%PDF-1.4 falso")["status"] == "erro_processamento"
+
+        with urllib.request.urlopen(f"{base}/metricas") as response:
+            assert 'nuve_documents_total{status="sucesso"} 10' in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
@@ -0,0 +1,19 @@
+from src.benchmark import run_benchmark
+from src.expanded_lexicon import ExpandedViolenceLexicon
+from src.synthetic import SyntheticNoteGenerator
+
+def test_generator_is_seeded_and_plants_detectable_terms():
+    lexicon = ExpandedViolenceLexicon()
+    note = SyntheticNoteGenerator(lexicon.categories, seed=7).note(5000)
+    assert note.text == SyntheticNoteGenerator(lexicon.categories, seed=7).note(5000).text
+    assert note.planted_terms and note.negated_terms
+
+    negated = []
+    detected = {(d.term, d.category) for d in lexicon.find_detections(note.text, negated_terms=negated)}
+    assert set(note.negated_terms) <= set(negated)
+    assert len(detected & set(note.planted_terms)) >= len(set(note.planted_terms)) // 2
+
+def test_benchmark_report_covers_stages():
+    report = run_benchmark(sizes=[1000], lexicon_scales=[1.0], repeat=1, include_pdf=False)
+    stages = {case["stage"] for case in report["cases"]}
+    assert {"compile", "terms", "negation", "context", "patterns", "output"} <= stages
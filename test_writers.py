@@ -0,0 +1,57 @@
+import csv
+import json
+
+import pytest
+
+from src.models import ViolenceDetection
+from src.writers import DETECTION_FIELDS, DOCUMENT_FIELDS, ResultWriter, open_writers
+
+def _detections(terms):
+    return [ViolenceDetection(term, "colloquial_popular", 1.8, 1.8, f"... {term} ...", 0, 4) for term in terms]
+
+def test_writers_append_batches(tmp_path, make_result):
+    with open_writers(tmp_path, ["csv", "json"]) as writer:
+        writer.write_batch([make_result("a", detections=_detections(["soco", "tapa"]))])
+    with open_writers(tmp_path, ["csv", "jsonl"]) as writer:
+        writer.write_batch([make_result("b", detections=_detections(["chute"]))])
+
+    with open(tmp_path / "documents.csv", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["filename"] for row in rows] == ["a.pdf", "b.pdf"]
+    assert list(rows[0]) == DOCUMENT_FIELDS
+
+    with open(tmp_path / "detections.jsonl", encoding="utf-8") as file:
+        detections = [json.loads(line) for line in file]
+    assert [d["term"] for d in detections] == ["soco", "tapa", "chute"]
+    assert list(detections[0]) == DETECTION_FIELDS
+
+def test_parquet_writer_rotates_files_by_rows_and_skips_empty_tables(tmp_path, make_result):
+    pytest.importorskip("pyarrow")
+    pd = pytest.importorskip("pandas")
+    from src.writers import ParquetResultWriter
+
+    with ParquetResultWriter(tmp_path, row_group_rows=2, rows_per_file=4) as writer:
+        for i in range(5):
+            writer.write_batch([make_result(f"d{i}")])  # Lotes sem detecções
+        # Quatro linhas fecham o primeiro arquivo; a quinta segue no buffer
+        assert [p.name for p in (tmp_path / "documents").iterdir()] == ["part-00000.parquet"]
+        writer.write_batch([make_result("e", detections=_detections(["soco", "tapa"]))])
+        # O arquivo aberto fica oculto aos leitores até ser fechado
+        assert sorted(p.name for p in (tmp_path / "documents").iterdir()) == [".part-00001.parquet",
+                                                                              "part-00000.parquet"]
+
+    assert sorted(p.name for p in (tmp_path / "documents").iterdir()) == ["part-00000.parquet", "part-00001.parquet"]
+    assert [p.name for p in (tmp_path / "detections").iterdir()] == ["part-00000.parquet"]
+    assert len(pd.read_parquet(tmp_path / "documents")) == 6
+    assert len(pd.read_parquet(tmp_path / "detections")) == 2
+
+def test_open_writers_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        open_writers(tmp_path, ["xlsx"])
+
+def test_result_writer_requires_write_rows(tmp_path):
+    class IncompleteWriter(ResultWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteWriter(tmp_path)
@@ -3,7 +3,24 @@ Funções auxiliares do sistema NUVE.
 """
 
 import hashlib
+from typing import Any
 
 def hash_text(text: str) -> str:
     """Gera hash SHA256 para anonimização."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
\ No newline at end of file
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_file(path, chunk_size: int = 1024 * 1024) -> str:
+    """Gera hash SHA256 do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_bytes(data: bytes) -> str:
+    """Gera hash SHA256 de um bloco de bytes (ex.: pixels de uma página renderizada)."""
+    return hashlib.sha256(data).hexdigest()
+
+def enum_value(value: Any) -> Any:
+    """Valor textual de um enum de src.config (status, severidade, qualidade) ou a própria string."""
+    return getattr(value, "value", value)
@@ -0,0 +1,286 @@
+"""
+Escritores incrementais de resultados (JSONL, CSV em blocos e Parquet).
+
+Cada lote é gravado assim que concluído, com esquema estável para as tabelas
+de documentos e de detecções: a memória não cresce com a execução e o que já
+foi gravado sobrevive a uma interrupção. O Parquet acumula as linhas em row
+groups grandes e em poucos arquivos, que só ficam visíveis depois de fechados.
+"""
+
+import abc
+import csv
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from .utils import enum_value
+
+PATTERN_FIELDS = [
+    "chronic_violence", "escalation_pattern", "weapons_involved", "children_present",
+    "pregnancy_violence", "sexual_violence", "death_threats", "multiple_injuries",
+    "psychological_control", "economic_abuse",
+]
+
+DOCUMENT_FIELDS = [
+    "document_hash", "patient_id", "filename", "status", "error_message",
+    "total_score", "base_score", "contextual_bonus", "severity_level",
+    "detection_count", "category_scores", "category_counts",
+    "page_count", "char_count", "extraction_method", "quality_level",
+    "document_type", "document_date", "processing_time_ms", "lexicon_version",
+    "duplicate_of", "duplicate_similarity",
+] + PATTERN_FIELDS + ["pattern_severity_score", "metrics"]
+
+DETECTION_FIELDS = [
+    "document_hash", "patient_id", "filename", "term", "category",
+    "base_weight", "adjusted_weight", "intensity_multiplier", "confidence_score",
+    "position_start", "position_end", "page_number", "document_date", "context_phrase",
+]
+
+def document_row(result: Any) -> Dict[str, Any]:
+    """Linha da tabela de documentos para um AnalysisResult"""
+    text_content = result.text_content
+    metadata = text_content.document_metadata
+    row = {
+        "document_hash": result.patient_id.document_hash,
+        "patient_id": result.patient_id.patient_id,
+        "filename": result.patient_id.filename,
+        "status": enum_value(result.status),
+        "error_message": result.error_message,
+        "total_score": result.total_score,
+        "base_score": result.base_score,
+        "contextual_bonus": result.contextual_bonus,
+        "severity_level": enum_value(result.severity_level),
+        "detection_count": len(result.detections),
+        "category_scores": json.dumps(result.category_scores, ensure_ascii=False),
+        "category_counts": json.dumps(result.category_counts, ensure_ascii=False),
+        "page_count": text_content.page_count,
+        "char_count": text_content.char_count,
+        "extraction_method": text_content.extraction_method,
+        "quality_level": enum_value(text_content.quality_level),
+        "document_type": enum_value(metadata.document_type),
+        "document_date": metadata.document_date,
+        "processing_time_ms": result.processing_time_ms,
+        "lexicon_version": getattr(result, "lexicon_version", None),
+        "duplicate_of": getattr(result, "duplicate_of", None),
+        "duplicate_similarity": getattr(result, "duplicate_similarity", None),
+        "pattern_severity_score": result.violence_patterns.pattern_severity_score,
+        "metrics": json.dumps(asdict(result.metrics)) if getattr(result, "metrics", None) else None,
+    }
+    for name in PATTERN_FIELDS:
+        row[name] = getattr(result.violence_patterns, name)
+    return row
+
+def detection_rows(result: Any) -> List[Dict[str, Any]]:
+    """Linhas da tabela de detecções para um AnalysisResult"""
+    return [
+        {
+            "document_hash": result.patient_id.document_hash,
+            "patient_id": result.patient_id.patient_id,
+            "filename": result.patient_id.filename,
+            "term": detection.term,
+            "category": detection.category,
+            "base_weight": detection.base_weight,
+            "adjusted_weight": detection.adjusted_weight,
+            "intensity_multiplier": detection.intensity_multiplier,
+            "confidence_score": detection.confidence_score,
+            "position_start": detection.position_start,
+            "position_end": detection.position_end,
+            "page_number": detection.page_number,
+            "document_date": detection.document_date,
+            "context_phrase": detection.context_phrase,
+        }
+        for detection in result.detections
+    ]
+
+def result_to_dict(result: Any, include_text: bool = False) -> Dict[str, Any]:
+    """AnalysisResult completo como dicionário serializável; o texto do documento é opcional"""
+    data = asdict(result)
+    if not include_text:
+        data["text_content"]["text"] = None
+    return data
+
+class ResultWriter(abc.ABC):
+    """Interface comum: write_batch a cada lote concluído e close ao final."""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def write_batch(self, results: Iterable[Any]):
+        results = list(results)
+        self._write_rows(
+            [document_row(result) for result in results],
+            [row for result in results for row in detection_rows(result)]
+        )
+
+    @abc.abstractmethod
+    def _write_rows(self, documents: List[Dict[str, Any]], detections: List[Dict[str, Any]]):
+        """Grava as linhas de documentos e de detecções de um lote"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+class JsonlResultWriter(ResultWriter):
+    """documents.jsonl e detections.jsonl, acrescentados a cada lote"""
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self._files = {
+            name: open(self.output_dir / f"{name}.jsonl", "a", encoding="utf-8")
+            for name in ("documents", "detections")
+        }
+
+    def _write_rows(self, documents, detections):
+        for name, rows in (("documents", documents), ("detections", detections)):
+            file = self._files[name]
+            file.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            file.flush()
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+
+class CsvResultWriter(ResultWriter):
+    """documents.csv e detections.csv gravados em blocos, com cabeçalho único"""
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self._files = {}
+        self._writers = {}
+        for name, fields in (("documents", DOCUMENT_FIELDS), ("detections", DETECTION_FIELDS)):
+            path = self.output_dir / f"{name}.csv"
+            write_header = not path.exists() or path.stat().st_size == 0
+            self._files[name] = open(path, "a", encoding="utf-8", newline="")
+            self._writers[name] = csv.DictWriter(self._files[name], fieldnames=fields)
+            if write_header:
+                self._writers[name].writeheader()
+
+    def _write_rows(self, documents, detections):
+        for name, rows in (("documents", documents), ("detections", detections)):
+            self._writers[name].writerows(rows)
+            self._files[name].flush()
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Conjuntos Parquet documents/ e detections/, com row groups de até `row_group_rows` linhas.
+
+    Cada tabela mantém um arquivo aberto, gravado como `.part-NNNNN.parquet` (oculto para
+    os leitores) e renomeado para `part-NNNNN.parquet` ao atingir `rows_per_file` linhas ou
+    no close; arquivos renomeados continuam legíveis mesmo se a execução cair.
+    `pandas.read_parquet("<saída>/detections")` lê o conjunto inteiro.
+    """
+
+    def __init__(self, output_dir, row_group_rows: int = 100_000, rows_per_file: int = 1_000_000):
+        super().__init__(output_dir)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self.row_group_rows = row_group_rows
+        self.rows_per_file = rows_per_file
+        string, double, int64, boolean = pa.string(), pa.float64(), pa.int64(), pa.bool_()
+        document_types = {
+            "total_score": double, "base_score": double, "contextual_bonus": double,
+            "pattern_severity_score": double, "detection_count": int64, "page_count": int64,
+            "char_count": int64, "processing_time_ms": int64, "duplicate_similarity": double,
+        }
+        document_types.update({name: boolean for name in PATTERN_FIELDS})
+        detection_types = {
+            "base_weight": double, "adjusted_weight": double, "intensity_multiplier": double,
+            "confidence_score": double, "position_start": int64, "position_end": int64,
+            "page_number": int64,
+        }
+        self._schemas = {
+            "documents": pa.schema([(name, document_types.get(name, string)) for name in DOCUMENT_FIELDS]),
+            "detections": pa.schema([(name, detection_types.get(name, string)) for name in DETECTION_FIELDS]),
+        }
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self._schemas}
+        self._writers: Dict[str, Any] = {}
+        self._file_rows = {name: 0 for name in self._schemas}
+        self._parts = {}
+        for name in self._schemas:
+            (self.output_dir / name).mkdir(exist_ok=True)
+            self._parts[name] = len(list((self.output_dir / name).glob("part-*.parquet")))
+
+    def _part_path(self, name: str, hidden: bool = False) -> Path:
+        return self.output_dir / name / f"{'.' if hidden else ''}part-{self._parts[name]:05d}.parquet"
+
+    def _write_rows(self, documents, detections):
+        for name, rows in (("documents", documents), ("detections", detections)):
+            buffer = self._buffers[name]
+            buffer.extend(rows)
+            if len(buffer) >= self.row_group_rows:
+                self._flush(name)
+
+    def _flush(self, name: str):
+        """Grava o buffer da tabela como um row group; tabelas vazias não criam arquivo"""
+        rows = self._buffers[name]
+        if not rows:
+            return
+        writer = self._writers.get(name)
+        if writer is None:
+            writer = self._pq.ParquetWriter(self._part_path(name, hidden=True), self._schemas[name])
+            self._writers[name] = writer
+        writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schemas[name]),
+                           row_group_size=len(rows))
+        self._file_rows[name] += len(rows)
+        self._buffers[name] = []
+        if self._file_rows[name] >= self.rows_per_file:
+            self._rotate(name)
+
+    def _rotate(self, name: str):
+        """Fecha o arquivo aberto da tabela e o torna visível aos leitores"""
+        writer = self._writers.pop(name, None)
+        if writer is None:
+            return
+        writer.close()
+        self._part_path(name, hidden=True).rename(self._part_path(name))
+        self._parts[name] += 1
+        self._file_rows[name] = 0
+
+    def close(self):
+        for name in self._schemas:
+            self._flush(name)
+            self._rotate(name)
+
+class MultiResultWriter(ResultWriter):
+    """Repassa cada lote a todos os formatos configurados"""
+
+    def __init__(self, writers: List[ResultWriter]):
+        self.writers = writers
+
+    def _write_rows(self, documents, detections):
+        # As linhas são montadas uma única vez para todos os formatos
+        for writer in self.writers:
+            writer._write_rows(documents, detections)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+WRITERS = {
+    "json": JsonlResultWriter,
+    "jsonl": JsonlResultWriter,
+    "csv": CsvResultWriter,
+    "parquet": ParquetResultWriter,
+}
+
+def open_writers(output_dir, output_formats: Iterable[str]) -> MultiResultWriter:
+    """Abre um escritor por formato de `ProcessingConfig.output_formats`"""
+    unknown = [fmt for fmt in output_formats if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"Formatos de saída não suportados: {unknown}")
+    writer_classes = dict.fromkeys(WRITERS[fmt] for fmt in output_formats)
+    return MultiResultWriter([writer_class(output_dir) for writer_class in writer_classes])